@@ -0,0 +1,342 @@
+"""
+Archivo del log de auditoría en segmentos comprimidos.
+
+LogAuditoria conserva solo las entradas de los últimos AUDITORIA_RETENCION_DIAS
+días. El comando archivar_auditoria mueve las anteriores, en orden de la cadena
+de hashes (ver cadena.py), a segmentos en AUDITORIA_ARCHIVO_DIR. Dentro de cada
+segmento las entradas van en orden de (fecha_eliminacion, id):
+
+    auditoria-000001.jsonl.gz   entradas del segmento, una por línea y en orden
+    auditoria-000001.json       índice: total, primera y última clave, rango de
+                                ids, modelos, usuarios y objeto_id por modelo
+                                (como rangos [inicio, fin])
+
+Un segmento no se modifica una vez escrito. Cada paso del archivado escribe el
+segmento y su índice con confirmado=False, borra esas filas de la tabla y marca
+el índice como confirmado. Las consultas ignoran los segmentos sin confirmar
+(sus entradas siguen en la tabla). Si el proceso se interrumpe a mitad de
+camino, el siguiente archivado empieza por terminar de borrar y confirmar.
+
+Consultas (/api/logs/): buscar() descarta segmentos por su índice (filtros y
+rango de claves de la página) y lee los restantes desde una caché LRU de
+segmentos descomprimidos, buscando la posición del cursor por bisección.
+"""
+
+import fcntl
+import gzip
+import json
+import os
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import timedelta
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .escritor import CAMPOS
+from .filtros import coincide
+from .models import LogAuditoria
+
+AUDITORIA_RETENCION_DIAS = getattr(settings, 'AUDITORIA_RETENCION_DIAS', 365)
+AUDITORIA_SEGMENTO = getattr(settings, 'AUDITORIA_SEGMENTO', 10_000)  # entradas por segmento
+AUDITORIA_ARCHIVO_CACHE = getattr(settings, 'AUDITORIA_ARCHIVO_CACHE', 16)  # segmentos en memoria
+
+# Se conservan también los campos de la cadena de hashes (ver cadena.py)
+CAMPOS_ARCHIVO = ('id',) + CAMPOS + ('secuencia', 'usuario_registrado', 'hash_anterior', 'hash')
+_LOTE_BORRADO = 1000
+
+
+def directorio_archivo(directorio=None):
+    """Directorio indicado o, por defecto, settings.AUDITORIA_ARCHIVO_DIR."""
+    if directorio:
+        return Path(directorio)
+    return Path(getattr(settings, 'AUDITORIA_ARCHIVO_DIR', settings.BASE_DIR / 'auditoria_archivo'))
+
+
+def clave(entrada):
+    """Clave de orden (fecha_eliminacion, id) de una entrada archivada o de una instancia."""
+    if isinstance(entrada, dict):
+        return entrada['fecha_eliminacion'], entrada['id']
+    return entrada.fecha_eliminacion, entrada.id
+
+
+def _rangos(valores):
+    """[1, 2, 3, 7, 9, 10] -> [[1, 3], [7, 7], [9, 10]] (valores ordenados y sin repetir)."""
+    rangos = []
+    for valor in valores:
+        if rangos and rangos[-1][1] == valor - 1:
+            rangos[-1][1] = valor
+        else:
+            rangos.append([valor, valor])
+    return rangos
+
+
+def _en_rangos(rangos, valor):
+    posicion = bisect_right(rangos, [valor, float('inf')]) - 1
+    return posicion >= 0 and rangos[posicion][0] <= valor <= rangos[posicion][1]
+
+
+def _clave_json(valor):
+    fecha, pk = valor
+    return parse_datetime(fecha), pk
+
+
+def _escribir_atomico(ruta, contenido):
+    """Escribe en un temporal, fsync y renombra: el archivo final nunca queda a medias."""
+    temporal = ruta.with_name(ruta.name + '.tmp')
+    with open(temporal, 'wb') as archivo:
+        archivo.write(contenido)
+        archivo.flush()
+        os.fsync(archivo.fileno())
+    os.replace(temporal, ruta)
+
+
+class Segmento:
+    """Índice de un segmento del archivo."""
+
+    def __init__(self, ruta_indice, datos):
+        self.ruta_indice = ruta_indice
+        self.datos = datos
+        self.numero = datos['numero']
+        self.ruta = ruta_indice.with_name(datos['archivo'])
+        self.total = datos['total']
+        self.primero = _clave_json(datos['primero'])
+        self.ultimo = _clave_json(datos['ultimo'])
+        self.ids = tuple(datos['ids'])
+        self.modelos = datos['modelos']
+        self.usuarios = set(datos['usuarios'])
+        self.objetos = datos['objetos']
+        self.confirmado = datos['confirmado']
+
+    def puede_contener(self, filtros):
+        """False si el índice descarta que el segmento tenga entradas para `filtros`."""
+        if 'modelo' in filtros and filtros['modelo'] not in self.modelos:
+            return False
+        if 'usuario' in filtros and filtros['usuario'] not in self.usuarios:
+            return False
+        if 'objeto' in filtros:
+            modelos = [filtros['modelo']] if 'modelo' in filtros else self.objetos
+            return any(_en_rangos(self.objetos[modelo], filtros['objeto']) for modelo in modelos)
+        return True
+
+    def entradas(self):
+        """(claves, entradas) del segmento, en orden. Lectura con caché."""
+        estado = self.ruta.stat()
+        return _leer_segmento(str(self.ruta), estado.st_mtime_ns, estado.st_size)
+
+
+def _entrada(datos):
+    datos['fecha_eliminacion'] = parse_datetime(datos['fecha_eliminacion'])
+    return datos
+
+
+@lru_cache(maxsize=AUDITORIA_ARCHIVO_CACHE)
+def _leer_segmento(ruta, mtime_ns, tamano):
+    with gzip.open(ruta, 'rt', encoding='utf-8') as archivo:
+        entradas = [_entrada(json.loads(linea)) for linea in archivo]
+    return [clave(entrada) for entrada in entradas], entradas
+
+
+# Índices leídos por ruta: {ruta: (mtime_ns, tamaño, Segmento)}
+_indices = {}
+
+
+def segmentos(directorio=None, incluir_pendientes=False):
+    """Segmentos del archivo ordenados por número (solo confirmados, salvo que se pidan todos)."""
+    directorio = directorio_archivo(directorio)
+    if not directorio.is_dir():
+        return []
+    resultado = []
+    with os.scandir(directorio) as entradas:
+        for entrada in entradas:
+            if not (entrada.name.startswith('auditoria-') and entrada.name.endswith('.json')):
+                continue
+            estado = entrada.stat()
+            ruta = Path(entrada.path)
+            guardado = _indices.get(ruta)
+            if guardado is None or guardado[:2] != (estado.st_mtime_ns, estado.st_size):
+                segmento = Segmento(ruta, json.loads(ruta.read_bytes()))
+                guardado = _indices[ruta] = (estado.st_mtime_ns, estado.st_size, segmento)
+            if incluir_pendientes or guardado[2].confirmado:
+                resultado.append(guardado[2])
+    return sorted(resultado, key=lambda segmento: segmento.numero)
+
+
+# --- Consulta -------------------------------------------------------------
+
+def buscar(filtros, despues_de=None, descendente=True, limite=50, cota=None, directorio=None):
+    """
+    Hasta `limite` entradas archivadas que cumplen `filtros` (ver filtros.criterios),
+    en orden de (fecha_eliminacion, id) descendente o ascendente, a continuación
+    de la clave `despues_de` y antes de la clave `cota` (ambas excluidas).
+    """
+    def antes(a, b):
+        return a > b if descendente else a < b
+
+    def primera(*claves):
+        claves = [c for c in claves if c is not None]
+        return (max if descendente else min)(claves) if claves else None
+
+    def ultima(*claves):
+        claves = [c for c in claves if c is not None]
+        return (min if descendente else max)(claves) if claves else None
+
+    # desde/hasta como claves: los ids empiezan en 1, así que (fecha, 0) separa por fecha
+    desde = (filtros['desde'], 0) if 'desde' in filtros else None
+    hasta = (filtros['hasta'], 0) if 'hasta' in filtros else None
+    inicio = ultima(despues_de, hasta if descendente else desde)
+    fin = primera(cota, desde if descendente else hasta)
+
+    def borde(segmento):  # primera clave del segmento en el recorrido
+        return segmento.ultimo if descendente else segmento.primero
+
+    def final(segmento):
+        return segmento.primero if descendente else segmento.ultimo
+
+    candidatos = [
+        segmento for segmento in segmentos(directorio)
+        if segmento.puede_contener(filtros)
+        and (inicio is None or antes(inicio, final(segmento)))
+        and (fin is None or antes(borde(segmento), fin))
+    ]
+    candidatos.sort(key=borde, reverse=descendente)
+
+    encontradas = []
+    for segmento in candidatos:
+        if fin is not None and not antes(borde(segmento), fin):
+            break
+        claves, entradas = segmento.entradas()
+        if descendente:
+            posicion = bisect_left(claves, inicio) if inicio is not None else len(claves)
+            posiciones = range(posicion - 1, -1, -1)
+        else:
+            posicion = bisect_right(claves, inicio) if inicio is not None else 0
+            posiciones = range(posicion, len(claves))
+        for i in posiciones:
+            if fin is not None and not antes(claves[i], fin):
+                break
+            if coincide(entradas[i], filtros):
+                encontradas.append(entradas[i])
+                if len(encontradas) >= limite:
+                    encontradas.sort(key=clave, reverse=descendente)
+                    del encontradas[limite:]
+                    # Lo que venga después de la última encontrada ya no entra en el resultado
+                    fin = clave(encontradas[-1])
+                    break
+    encontradas.sort(key=clave, reverse=descendente)
+    return encontradas
+
+
+def buscar_id(pk, directorio=None):
+    """Entrada archivada con ese id, o None."""
+    for segmento in segmentos(directorio):
+        if segmento.ids[0] <= pk <= segmento.ids[1]:
+            _, entradas = segmento.entradas()
+            for entrada in entradas:
+                if entrada['id'] == pk:
+                    return entrada
+    return None
+
+
+def instancias(entradas):
+    """Instancias de LogAuditoria (sin guardar) para serializar entradas archivadas."""
+    usuarios = {entrada['usuario_id'] for entrada in entradas} - {None}
+    usuarios = get_user_model().objects.in_bulk(usuarios) if usuarios else {}
+    logs = []
+    for entrada in entradas:
+        log = LogAuditoria(**{campo: entrada[campo] for campo in CAMPOS_ARCHIVO if campo != 'usuario_id'})
+        log.usuario = usuarios.get(entrada['usuario_id'])
+        logs.append(log)
+    return logs
+
+
+# --- Archivado ------------------------------------------------------------
+
+def _a_json(fila):
+    datos = dict(fila)
+    datos['uuid'] = str(datos['uuid'])
+    datos['fecha_eliminacion'] = datos['fecha_eliminacion'].isoformat()
+    return json.dumps(datos, ensure_ascii=False, separators=(',', ':'))
+
+
+def _escribir_segmento(directorio, numero, filas):
+    """Escribe el segmento y su índice (sin confirmar). Retorna el Segmento."""
+    nombre = f'auditoria-{numero:06d}'
+    contenido = '\n'.join(_a_json(fila) for fila in filas) + '\n'
+    _escribir_atomico(directorio / f'{nombre}.jsonl.gz', gzip.compress(contenido.encode('utf-8'), mtime=0))
+
+    objetos = {}
+    for fila in filas:
+        objetos.setdefault(fila['modelo_afectado'], set()).add(fila['objeto_id'])
+    ids = [fila['id'] for fila in filas]
+    datos = {
+        'numero': numero,
+        'archivo': f'{nombre}.jsonl.gz',
+        'total': len(filas),
+        'primero': [filas[0]['fecha_eliminacion'].isoformat(), filas[0]['id']],
+        'ultimo': [filas[-1]['fecha_eliminacion'].isoformat(), filas[-1]['id']],
+        'ids': [min(ids), max(ids)],
+        'modelos': dict(Counter(fila['modelo_afectado'] for fila in filas)),
+        'usuarios': sorted({fila['usuario_id'] for fila in filas}, key=lambda pk: (pk is not None, pk)),
+        'objetos': {modelo: _rangos(sorted(valores)) for modelo, valores in objetos.items()},
+        'confirmado': False,
+    }
+    ruta_indice = directorio / f'{nombre}.json'
+    _escribir_atomico(ruta_indice, json.dumps(datos).encode('utf-8'))
+    return Segmento(ruta_indice, datos)
+
+
+def _confirmar(segmento):
+    """Borra de la tabla las filas del segmento y lo marca como confirmado."""
+    with gzip.open(segmento.ruta, 'rt', encoding='utf-8') as archivo:
+        ids = [json.loads(linea)['id'] for linea in archivo]
+    with transaction.atomic():
+        for inicio in range(0, len(ids), _LOTE_BORRADO):
+            LogAuditoria.objects.filter(pk__in=ids[inicio:inicio + _LOTE_BORRADO]).delete()
+    datos = dict(segmento.datos, confirmado=True)
+    _escribir_atomico(segmento.ruta_indice, json.dumps(datos).encode('utf-8'))
+
+
+def archivar(dias=None, directorio=None, tamano=None):
+    """
+    Mueve al archivo las entradas con más de `dias` días (por defecto
+    AUDITORIA_RETENCION_DIAS), en segmentos de `tamano` entradas.
+    Retorna el número de entradas archivadas.
+    """
+    dias = AUDITORIA_RETENCION_DIAS if dias is None else dias
+    tamano = tamano or AUDITORIA_SEGMENTO
+    directorio = directorio_archivo(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+
+    with open(directorio / 'archivar.lock', 'a') as bloqueo:
+        # Un solo archivado a la vez: la numeración y el borrado no admiten concurrencia
+        fcntl.flock(bloqueo, fcntl.LOCK_EX)
+        existentes = segmentos(directorio, incluir_pendientes=True)
+        for segmento in existentes:
+            if not segmento.confirmado:
+                _confirmar(segmento)
+
+        numero = max((segmento.numero for segmento in existentes), default=0)
+        limite = timezone.now() - timedelta(days=dias)
+        # Se archiva un prefijo de la cadena de hashes: hasta la primera entrada
+        # (en orden de secuencia) que aún está dentro de la retención
+        antiguas = LogAuditoria.objects.filter(fecha_eliminacion__lt=limite, secuencia__isnull=False)
+        corte = LogAuditoria.objects.filter(fecha_eliminacion__gte=limite).aggregate(corte=Min('secuencia'))['corte']
+        if corte is not None:
+            antiguas = antiguas.filter(secuencia__lt=corte)
+        total = 0
+        while True:
+            filas = list(antiguas.order_by('secuencia').values(*CAMPOS_ARCHIVO)[:tamano])
+            if not filas:
+                break
+            filas.sort(key=lambda fila: (fila['fecha_eliminacion'], fila['id']))
+            numero += 1
+            _confirmar(_escribir_segmento(directorio, numero, filas))
+            total += len(filas)
+    return total
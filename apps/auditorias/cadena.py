@@ -0,0 +1,229 @@
+"""
+Cadena de hashes del log de auditoría (evidencia de manipulación).
+
+Cada entrada guarda su número de secuencia, el hash de la anterior y
+hash = sha256(hash_anterior + contenido), donde el contenido es un JSON
+canónico de sus campos (ver contenido()). Modificar, borrar o intercalar una
+entrada rompe su hash o el enlace de la siguiente.
+
+- Inserción (insertar, llamado desde escritor.insertar): en una transacción se
+  bloquea la fila de CadenaAuditoria (select_for_update), se asignan secuencia
+  y hashes al lote, se inserta con bulk_create y se avanza la cabeza. Los
+  procesos que insertan a la vez esperan su turno en ese bloqueo.
+- Puntos de control: cada AUDITORIA_PUNTO_CONTROL entradas se guardan la
+  secuencia y el hash firmados con HMAC (SECRET_KEY); la cabeza también va
+  firmada. Con acceso solo a la base de datos no se puede reescribir la cadena
+  y volver a firmar.
+- Verificación (verificar, comando verificar_auditoria): parte del último punto
+  de control ya verificado, o del último anterior a una fecha, y recalcula solo
+  las entradas posteriores. El costo depende de la actividad desde ese punto,
+  no del tamaño del historial. Con completa=True se recorre toda la tabla.
+
+El archivado (archivo.py) mueve siempre un prefijo de la cadena, con sus
+hashes: la tabla conserva un tramo continuo que se puede verificar.
+"""
+
+import hashlib
+import json
+from datetime import timezone as dt_timezone
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .models import CadenaAuditoria, LogAuditoria, PuntoControlAuditoria
+
+AUDITORIA_PUNTO_CONTROL = getattr(settings, 'AUDITORIA_PUNTO_CONTROL', 1000)  # entradas entre puntos de control
+
+GENESIS = '0' * 64
+_SAL = 'apps.auditorias.cadena'
+
+
+def contenido(log):
+    """JSON canónico de los campos que cubre el hash."""
+    return json.dumps([
+        log.secuencia,
+        str(log.uuid),
+        log.modelo_afectado,
+        log.objeto_id,
+        log.descripcion_objeto,
+        log.motivo,
+        log.usuario_registrado,
+        log.fecha_eliminacion.astimezone(dt_timezone.utc).isoformat(),
+    ], ensure_ascii=False, separators=(',', ':'))
+
+
+def calcular_hash(log, hash_anterior):
+    return hashlib.sha256((hash_anterior + contenido(log)).encode('utf-8')).hexdigest()
+
+
+def firmar(secuencia, hash_):
+    return salted_hmac(_SAL, f'{secuencia}:{hash_}', algorithm='sha256').hexdigest()
+
+
+def firma_valida(secuencia, hash_, firma):
+    return constant_time_compare(firmar(secuencia, hash_), firma)
+
+
+def _cabeza():
+    """Fila de la cabeza, bloqueada hasta el final de la transacción."""
+    cabeza, _ = CadenaAuditoria.objects.select_for_update().get_or_create(
+        pk=1, defaults={'secuencia': 0, 'hash': GENESIS, 'firma': firmar(0, GENESIS)},
+    )
+    return cabeza
+
+
+def insertar(logs):
+    """
+    Encadena e inserta `logs` (instancias sin guardar, en orden). Omite los que ya
+    existen (mismo uuid). Retorna el número de entradas insertadas.
+    """
+    with transaction.atomic():
+        cabeza = _cabeza()
+        # Con la cabeza bloqueada nadie más inserta: la comprobación no tiene carreras
+        existentes = set(
+            str(valor) for valor in
+            LogAuditoria.objects.filter(uuid__in=[log.uuid for log in logs]).values_list('uuid', flat=True)
+        )
+        nuevos = {}
+        for log in logs:
+            if str(log.uuid) not in existentes:
+                nuevos.setdefault(str(log.uuid), log)
+        logs = list(nuevos.values())
+        if not logs:
+            return 0
+
+        puntos = []
+        for log in logs:
+            cabeza.secuencia += 1
+            log.secuencia = cabeza.secuencia
+            log.hash_anterior = cabeza.hash
+            log.hash = cabeza.hash = calcular_hash(log, log.hash_anterior)
+            if log.secuencia % AUDITORIA_PUNTO_CONTROL == 0:
+                puntos.append(PuntoControlAuditoria(
+                    secuencia=log.secuencia, hash=log.hash, firma=firmar(log.secuencia, log.hash),
+                ))
+        LogAuditoria.objects.bulk_create(logs, batch_size=500)
+        PuntoControlAuditoria.objects.bulk_create(puntos)
+        cabeza.firma = firmar(cabeza.secuencia, cabeza.hash)
+        cabeza.save(update_fields=['secuencia', 'hash', 'firma'])
+    return len(logs)
+
+
+class Verificacion(NamedTuple):
+    inicio: int           # primera secuencia recalculada
+    fin: int              # secuencia de la cabeza
+    entradas: int         # entradas recalculadas
+    puntos: int           # puntos de control verificados
+    errores: list
+
+    @property
+    def correcta(self):
+        return not self.errores
+
+
+def _partida(desde, completa, primera):
+    """Punto de control desde el que empezar, o None para empezar por la primera entrada de la tabla."""
+    if completa:
+        return None
+    puntos = PuntoControlAuditoria.objects.order_by('-secuencia')
+    if desde is not None:
+        # Primera entrada (en la cadena) desde esa fecha; sin entradas, el último punto.
+        # Se leen las secuencias por el índice de fecha: con MIN(secuencia) el motor
+        # recorrería el índice de secuencia desde el principio
+        siguiente = min(
+            LogAuditoria.objects.filter(fecha_eliminacion__gte=desde, secuencia__isnull=False)
+            .order_by('fecha_eliminacion', 'id').values_list('secuencia', flat=True).iterator(),
+            default=None,
+        )
+        if siguiente is not None:
+            puntos = puntos.filter(secuencia__lt=siguiente)
+        punto = puntos.first()
+    else:
+        punto = puntos.filter(verificado_en__isnull=False).first()
+    # Si lo que sigue al punto ya se archivó, se empieza por la tabla
+    if punto is not None and primera is not None and punto.secuencia < primera - 1:
+        return None
+    return punto
+
+
+def verificar(desde=None, completa=False):
+    """
+    Recalcula la cadena hasta la cabeza y retorna una Verificacion.
+    - Por defecto, desde el último punto de control verificado.
+    - desde (datetime): desde el último punto de control anterior a las entradas de esa fecha.
+    - completa: desde la primera entrada de la tabla.
+    Los puntos de control alcanzados sin errores quedan marcados como verificados.
+    """
+    errores = []
+    primera = LogAuditoria.objects.aggregate(primera=Min('secuencia'))['primera']
+    cabeza = CadenaAuditoria.objects.filter(pk=1).first()
+    if cabeza is None:
+        if primera is not None:
+            return Verificacion(primera, 0, 0, 0, ["Falta la cabeza de la cadena"])
+        cabeza = CadenaAuditoria(secuencia=0, hash=GENESIS, firma=firmar(0, GENESIS))
+    elif not firma_valida(cabeza.secuencia, cabeza.hash, cabeza.firma):
+        errores.append("Firma inválida en la cabeza de la cadena")
+
+    sin_encadenar = LogAuditoria.objects.filter(secuencia__isnull=True).count()
+    if sin_encadenar:
+        errores.append(f"{sin_encadenar} entradas sin encadenar")
+
+    punto = _partida(desde, completa, primera)
+    if primera is None:
+        # Tabla vacía (o todo archivado): solo queda la cabeza
+        secuencia, anterior = cabeza.secuencia, cabeza.hash
+    elif punto is not None:
+        if not firma_valida(punto.secuencia, punto.hash, punto.firma):
+            errores.append(f"Firma inválida en el punto de control {punto.secuencia}")
+        secuencia, anterior = punto.secuencia, punto.hash
+    elif primera == 1:
+        secuencia, anterior = 0, GENESIS
+    else:
+        # Lo anterior está archivado: se parte del enlace que guarda la primera entrada
+        secuencia = primera - 1
+        anterior = LogAuditoria.objects.values_list('hash_anterior', flat=True).get(secuencia=primera)
+    inicio = secuencia + 1
+
+    controles = {
+        control.secuencia: control
+        for control in PuntoControlAuditoria.objects.filter(secuencia__gt=secuencia, secuencia__lte=cabeza.secuencia)
+    }
+    verificados = []
+    entradas = 0
+    filas = LogAuditoria.objects.filter(secuencia__gt=secuencia, secuencia__lte=cabeza.secuencia).order_by('secuencia')
+    for log in filas.iterator(chunk_size=2000):
+        entradas += 1
+        if log.secuencia != secuencia + 1:
+            errores.append(f"Faltan las entradas {secuencia + 1} a {log.secuencia - 1}")
+        elif log.hash_anterior != anterior:
+            errores.append(f"Entrada {log.secuencia}: no enlaza con la anterior")
+        if calcular_hash(log, log.hash_anterior) != log.hash:
+            errores.append(f"Entrada {log.secuencia}: el contenido no coincide con su hash")
+        if log.usuario_id not in (None, log.usuario_registrado):
+            errores.append(f"Entrada {log.secuencia}: el usuario no coincide con el registrado")
+        secuencia, anterior = log.secuencia, log.hash
+
+        control = controles.pop(secuencia, None)
+        if control is not None:
+            if control.hash != anterior or not firma_valida(control.secuencia, control.hash, control.firma):
+                errores.append(f"El punto de control {secuencia} no coincide con la cadena")
+            elif not errores:
+                verificados.append(secuencia)
+
+    for control in sorted(controles):
+        errores.append(f"El punto de control {control} no tiene entrada")
+    posterior = LogAuditoria.objects.filter(secuencia__gt=cabeza.secuencia).aggregate(
+        posterior=Min('secuencia'))['posterior']
+    if posterior is not None and posterior > CadenaAuditoria.objects.get(pk=cabeza.pk).secuencia:
+        # Si la cabeza avanzó mientras tanto es una inserción concurrente; si no, entradas añadidas por fuera
+        errores.append(f"Hay entradas posteriores a la cabeza (desde la {posterior})")
+    if (secuencia, anterior) != (cabeza.secuencia, cabeza.hash):
+        errores.append(f"La cadena termina en la entrada {secuencia} y la cabeza indica {cabeza.secuencia}")
+
+    if verificados:
+        PuntoControlAuditoria.objects.filter(secuencia__in=verificados).update(verificado_en=timezone.now())
+    return Verificacion(inicio, cabeza.secuencia, entradas, len(verificados), errores)
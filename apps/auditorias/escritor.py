@@ -0,0 +1,288 @@
+"""
+Escritor de auditoría con búfer.
+
+registrar_log_eliminacion() ya no inserta dentro de la petición: la entrada se
+añade a un registro de escritura anticipada (WAL) en disco, con fsync, y a un
+búfer en memoria. Un hilo del proceso inserta el búfer con bulk_create cada
+AUDITORIA_INTERVALO segundos o en cuanto junta AUDITORIA_LOTE entradas, y al
+terminar el proceso (atexit) se vacía lo pendiente.
+
+Durabilidad:
+- Cada proceso escribe sus propios archivos en AUDITORIA_WAL_DIR:
+  <pid>.lock (bloqueado con flock mientras el proceso vive), <pid>-actual.wal
+  y <pid>-<n>.wal (segmentos cerrados, pendientes de insertar).
+- Al vaciar, el WAL actual se cierra como segmento y se abre uno nuevo; el
+  segmento se borra solo cuando su lote ya está en la base de datos.
+- Los archivos de un proceso que terminó sin vaciar (su .lock ya no está
+  bloqueado) se reinsertan al arrancar el escritor en otro proceso o con el
+  comando vaciar_auditoria. Cada entrada lleva un uuid único, así que
+  reinsertar un lote que ya había llegado a la base de datos no lo duplica.
+- Las entradas se encadenan (hash de la anterior) al insertarse, dentro de la
+  misma transacción que el bulk_create (ver cadena.py).
+
+Las entradas se registran al confirmar la transacción (on_commit): una
+eliminación revertida no deja rastro. Con AUDITORIA_SINCRONA = True se inserta
+en el momento, como antes (se lee en cada llamada, así que admite override_settings).
+"""
+
+import atexit
+import fcntl
+import json
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import cadena
+from .models import LogAuditoria
+
+logger = logging.getLogger(__name__)
+
+AUDITORIA_LOTE = getattr(settings, 'AUDITORIA_LOTE', 100)
+AUDITORIA_INTERVALO = getattr(settings, 'AUDITORIA_INTERVALO', 2.0)  # segundos
+
+CAMPOS = ('uuid', 'modelo_afectado', 'objeto_id', 'descripcion_objeto', 'motivo', 'usuario_id', 'fecha_eliminacion')
+
+
+def directorio_wal(directorio=None):
+    """Directorio indicado o, por defecto, settings.AUDITORIA_WAL_DIR."""
+    if directorio:
+        return Path(directorio)
+    return Path(getattr(settings, 'AUDITORIA_WAL_DIR', settings.BASE_DIR / 'auditoria_wal'))
+
+
+def insertar(entradas):
+    """
+    Encadena e inserta las entradas (dicts de CAMPOS) con bulk_create (ver
+    cadena.insertar). Omite las que ya existen (mismo uuid) y deja sin usuario
+    las de usuarios ya eliminados. Retorna el número de entradas insertadas.
+    """
+    if not entradas:
+        return 0
+    usuarios = {entrada['usuario_id'] for entrada in entradas} - {None}
+    existentes = set(get_user_model().objects.filter(pk__in=usuarios).values_list('pk', flat=True))
+    logs = []
+    for entrada in entradas:
+        datos = dict(entrada)
+        datos['usuario_registrado'] = datos['usuario_id']
+        if datos['usuario_id'] not in existentes:
+            datos['usuario_id'] = None
+        if isinstance(datos['fecha_eliminacion'], str):
+            datos['fecha_eliminacion'] = parse_datetime(datos['fecha_eliminacion'])
+        logs.append(LogAuditoria(**datos))
+    return cadena.insertar(logs)
+
+
+def _leer_wal(ruta):
+    """Entradas de un archivo WAL; descarta una última línea incompleta (escritura interrumpida)."""
+    entradas = []
+    with open(ruta, encoding='utf-8') as archivo:
+        for linea in archivo:
+            try:
+                entradas.append(json.loads(linea))
+            except json.JSONDecodeError:
+                logger.warning("Línea incompleta descartada en %s", ruta)
+    return entradas
+
+
+def _bloqueo_libre(ruta):
+    """Abre y bloquea `ruta` sin esperar; None si otro proceso la tiene bloqueada."""
+    archivo = open(ruta, 'a')
+    try:
+        fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        archivo.close()
+        return None
+    return archivo
+
+
+def recuperar_huerfanos(directorio=None, excepto_pid=None):
+    """
+    Reinserta los WAL de procesos que ya no existen y los borra.
+    Retorna el número de entradas reinsertadas.
+    """
+    directorio = directorio_wal(directorio)
+    if not directorio.is_dir():
+        return 0
+    pids = {ruta.name.split('-', 1)[0] for ruta in directorio.glob('*.wal')}
+    pids |= {ruta.stem for ruta in directorio.glob('*.lock')}
+    pids.discard(str(excepto_pid))
+
+    total = 0
+    for pid in sorted(pids):
+        bloqueo = _bloqueo_libre(directorio / f'{pid}.lock')
+        if bloqueo is None:
+            continue  # El proceso sigue vivo
+        try:
+            for ruta in sorted(directorio.glob(f'{pid}-*.wal')):
+                total += insertar(_leer_wal(ruta))
+                ruta.unlink()
+            (directorio / f'{pid}.lock').unlink(missing_ok=True)
+        finally:
+            bloqueo.close()
+    if total:
+        logger.info("Auditoría: %s entradas recuperadas del WAL", total)
+    return total
+
+
+class EscritorAuditoria:
+    """Búfer de entradas de auditoría del proceso, respaldado por un WAL en disco."""
+
+    def __init__(self, directorio=None, lote=AUDITORIA_LOTE, intervalo=AUDITORIA_INTERVALO):
+        self._directorio_configurado = directorio
+        self.lote = lote
+        self.intervalo = intervalo
+        self._tras_fork()
+        # Un proceso hijo (workers de gunicorn con --preload) empieza con su propio escritor
+        os.register_at_fork(after_in_child=self._tras_fork)
+
+    def _tras_fork(self):
+        self._pid = None
+        self._lock = threading.Lock()
+        self._vaciando = threading.Lock()
+
+    def _iniciar(self):
+        """Abre los archivos del proceso y arranca el hilo. Se llama con self._lock tomado."""
+        self._pid = os.getpid()
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._pendientes = []
+        self._segmentos = []
+        self._numero = 0
+        self.directorio = directorio_wal(self._directorio_configurado)
+        self.directorio.mkdir(parents=True, exist_ok=True)
+
+        self._bloqueo = _bloqueo_libre(self.directorio / f'{self._pid}.lock')
+        # Restos de un proceso anterior con el mismo pid: se tratan como pendientes propios
+        for ruta in sorted(self.directorio.glob(f'{self._pid}-*.wal')):
+            self._pendientes.extend(_leer_wal(ruta))
+            self._segmentos.append(self._renombrar_segmento(ruta))
+        self._wal = open(self._ruta_actual(), 'a', encoding='utf-8')
+
+        self._hilo = threading.Thread(target=self._bucle, name='escritor-auditoria', daemon=True)
+        self._hilo.start()
+        atexit.register(self.detener)
+
+    def _ruta_actual(self):
+        return self.directorio / f'{self._pid}-actual.wal'
+
+    def _renombrar_segmento(self, ruta):
+        self._numero += 1
+        segmento = self.directorio / f'{self._pid}-{self._numero:06d}.wal'
+        if ruta != segmento:
+            os.replace(ruta, segmento)
+        return segmento
+
+    def registrar(self, entrada):
+        """Añade la entrada al WAL (con fsync) y al búfer."""
+        linea = json.dumps(entrada, cls=DjangoJSONEncoder) + '\n'
+        with self._lock:
+            if self._pid != os.getpid():
+                self._iniciar()
+            self._wal.write(linea)
+            self._wal.flush()
+            os.fsync(self._wal.fileno())
+            self._pendientes.append(entrada)
+            lleno = len(self._pendientes) >= self.lote
+        if lleno:
+            self._despertar.set()
+
+    def vaciar(self):
+        """Inserta lo pendiente en la base de datos. Retorna el número de entradas."""
+        if self._pid != os.getpid():
+            return 0
+        with self._vaciando:
+            with self._lock:
+                if not self._pendientes:
+                    return 0
+                lote, self._pendientes = self._pendientes, []
+                self._wal.close()
+                self._segmentos.append(self._renombrar_segmento(self._ruta_actual()))
+                segmentos = list(self._segmentos)
+                self._wal = open(self._ruta_actual(), 'a', encoding='utf-8')
+            try:
+                insertar(lote)
+            except Exception:
+                # Se reintenta en el siguiente vaciado; los segmentos siguen en disco
+                with self._lock:
+                    self._pendientes[:0] = lote
+                raise
+            with self._lock:
+                for segmento in segmentos:
+                    segmento.unlink(missing_ok=True)
+                    self._segmentos.remove(segmento)
+            return len(lote)
+
+    def pendientes(self):
+        with self._lock:
+            return len(self._pendientes) if self._pid == os.getpid() else 0
+
+    def _bucle(self):
+        try:
+            recuperar_huerfanos(self.directorio, excepto_pid=self._pid)
+        except Exception:
+            logger.exception("Auditoría: error al recuperar WAL de otros procesos")
+        while True:
+            self._despertar.wait(self.intervalo)
+            self._despertar.clear()
+            if self._detener.is_set():
+                break  # detener() hace el último vaciado
+            try:
+                self.vaciar()
+            except Exception:
+                logger.exception("Auditoría: error al insertar el lote; se reintentará")
+            finally:
+                close_old_connections()
+
+    def detener(self):
+        """Detiene el hilo y vacía lo pendiente (se llama al terminar el proceso)."""
+        if self._pid != os.getpid():
+            return
+        self._detener.set()
+        self._despertar.set()
+        self._hilo.join(timeout=self.intervalo + 5)
+        try:
+            self.vaciar()
+        except Exception:
+            logger.exception("Auditoría: no se pudo vaciar al terminar; queda en el WAL")
+            return
+        with self._lock:
+            if not self._pendientes and not self._segmentos:
+                self._wal.close()
+                self._ruta_actual().unlink(missing_ok=True)
+                (self.directorio / f'{self._pid}.lock').unlink(missing_ok=True)
+                if self._bloqueo:
+                    self._bloqueo.close()
+                self._pid = None
+
+
+escritor = EscritorAuditoria()
+
+
+def entrada_auditoria(usuario, modelo_afectado, objeto_id, descripcion_objeto, motivo):
+    return {
+        'uuid': str(uuid.uuid4()),
+        'modelo_afectado': modelo_afectado,
+        'objeto_id': objeto_id,
+        'descripcion_objeto': descripcion_objeto,
+        'motivo': motivo,
+        'usuario_id': getattr(usuario, 'pk', None),
+        'fecha_eliminacion': timezone.now().isoformat(),
+    }
+
+
+def registrar(usuario, modelo_afectado, objeto_id, descripcion_objeto, motivo):
+    """Registra una eliminación: con el escritor al confirmar la transacción, o en el momento si es síncrono."""
+    entrada = entrada_auditoria(usuario, modelo_afectado, objeto_id, descripcion_objeto, motivo)
+    if getattr(settings, 'AUDITORIA_SINCRONA', False):
+        insertar([entrada])
+        return
+    transaction.on_commit(lambda: escritor.registrar(entrada))
@@ -0,0 +1,116 @@
+"""
+Filtros y búsqueda del log de auditoría (/api/logs/).
+
+Los parámetros se validan una vez en criterios(), que los deja en un dict
+normalizado. Ese dict se aplica de dos maneras:
+- filtrar_logs() sobre la tabla. modelo, usuario y objeto comparan por igualdad
+  la primera columna de sus índices (campo, fecha_eliminacion, id), de modo que
+  el resultado ya sale en el orden de la paginación keyset. desde/hasta son un
+  rango sobre log_fecha_id_idx.
+- coincide() sobre las entradas archivadas (archivo.py), en memoria. Antes de
+  leer un segmento, su índice permite descartarlo por modelo u objeto.
+
+El texto de ?q= se busca en motivo y descripcion_objeto. En MySQL se usa el
+índice FULLTEXT log_texto_ft (MATCH ... AGAINST en modo booleano: todas las
+palabras, por prefijo) y en los demás motores icontains.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+from facturacion_segura.filtros import parametro_entero, parametro_fin_dia, parametro_inicio_dia
+
+from .models import LogAuditoria
+
+# Caracteres con significado en el modo booleano de MySQL
+_OPERADORES_FULLTEXT = re.compile(r'[+\-<>()~*"@]+')
+
+
+def consulta_fulltext(texto):
+    """'pedido duplicado' -> '+pedido* +duplicado*' (todas las palabras, por prefijo)."""
+    palabras = _OPERADORES_FULLTEXT.sub(' ', texto).split()
+    return ' '.join(f'+{palabra}*' for palabra in palabras)
+
+
+def buscar_texto(queryset, texto):
+    """Entradas cuyo motivo o descripción contienen el texto."""
+    if connection.vendor == 'mysql':
+        consulta = consulta_fulltext(texto)
+        if consulta:
+            tabla = connection.ops.quote_name(LogAuditoria._meta.db_table)
+            return queryset.filter(RawSQL(
+                f"MATCH ({tabla}.motivo, {tabla}.descripcion_objeto) AGAINST (%s IN BOOLEAN MODE)",
+                (consulta,), output_field=BooleanField(),
+            ))
+    return queryset.filter(Q(motivo__icontains=texto) | Q(descripcion_objeto__icontains=texto))
+
+
+def criterios(parametros):
+    """Valida los filtros presentes en `parametros` (query params) y los normaliza."""
+    resultado = {}
+    if parametros.get('modelo'):
+        resultado['modelo'] = parametros['modelo']
+    if parametros.get('usuario'):
+        resultado['usuario'] = parametro_entero(parametros, 'usuario')
+    if parametros.get('objeto'):
+        resultado['objeto'] = parametro_entero(parametros, 'objeto')
+    if parametros.get('desde'):
+        resultado['desde'] = parametro_inicio_dia(parametros, 'desde')
+    if parametros.get('hasta'):
+        resultado['hasta'] = parametro_fin_dia(parametros, 'hasta')
+    texto = parametros.get('q', '').strip()
+    if texto:
+        resultado['texto'] = texto
+    return resultado
+
+
+def filtrar_logs(queryset, parametros):
+    """Aplica los filtros presentes en `parametros` (query params) al queryset."""
+    filtros = criterios(parametros)
+    if 'modelo' in filtros:
+        queryset = queryset.filter(modelo_afectado=filtros['modelo'])
+    if 'usuario' in filtros:
+        queryset = queryset.filter(usuario_id=filtros['usuario'])
+    if 'objeto' in filtros:
+        queryset = queryset.filter(objeto_id=filtros['objeto'])
+    if 'desde' in filtros:
+        queryset = queryset.filter(fecha_eliminacion__gte=filtros['desde'])
+    if 'hasta' in filtros:
+        queryset = queryset.filter(fecha_eliminacion__lt=filtros['hasta'])
+    if 'texto' in filtros:
+        queryset = buscar_texto(queryset, filtros['texto'])
+    return queryset
+
+
+def coincide(entrada, filtros):
+    """
+    Equivalente de filtrar_logs para una entrada archivada (dict, ver archivo.py).
+    El texto se busca como icontains, igual que fuera de MySQL.
+    """
+    if 'modelo' in filtros and entrada['modelo_afectado'] != filtros['modelo']:
+        return False
+    if 'usuario' in filtros and entrada['usuario_id'] != filtros['usuario']:
+        return False
+    if 'objeto' in filtros and entrada['objeto_id'] != filtros['objeto']:
+        return False
+    if 'desde' in filtros and entrada['fecha_eliminacion'] < filtros['desde']:
+        return False
+    if 'hasta' in filtros and entrada['fecha_eliminacion'] >= filtros['hasta']:
+        return False
+    if 'texto' in filtros:
+        texto = filtros['texto'].casefold()
+        return texto in entrada['motivo'].casefold() or texto in entrada['descripcion_objeto'].casefold()
+    return True
+
+
+class FiltroAuditoria(BaseFilterBackend):
+    """Backend de filtros de LogAuditoriaViewSet. Solo se aplica al listado."""
+
+    def filter_queryset(self, request, queryset, view):
+        if getattr(view, 'action', None) != 'list':
+            return queryset
+        return filtrar_logs(queryset, request.query_params)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.auditorias.archivo import archivar
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve las entradas de LogAuditoria más antiguas que la retención "
+        "(AUDITORIA_RETENCION_DIAS) a segmentos comprimidos en AUDITORIA_ARCHIVO_DIR."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, help="Días que se conservan en la tabla (por defecto AUDITORIA_RETENCION_DIAS)")
+        parser.add_argument('--directorio', help="Directorio del archivo (por defecto AUDITORIA_ARCHIVO_DIR)")
+        parser.add_argument('--tamano', type=int, help="Entradas por segmento (por defecto AUDITORIA_SEGMENTO)")
+
+    def handle(self, *args, **options):
+        archivadas = archivar(options['dias'], options['directorio'], options['tamano'])
+        self.stdout.write(self.style.SUCCESS(f"Entradas de auditoría archivadas: {archivadas}"))
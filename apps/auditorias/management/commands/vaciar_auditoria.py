@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.auditorias.escritor import recuperar_huerfanos
+
+
+class Command(BaseCommand):
+    help = (
+        "Inserta en LogAuditoria las entradas que quedaron en el registro de escritura "
+        "anticipada (AUDITORIA_WAL_DIR) de procesos que terminaron sin vaciarlo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--directorio', help="Directorio del WAL (por defecto AUDITORIA_WAL_DIR)")
+
+    def handle(self, *args, **options):
+        recuperadas = recuperar_huerfanos(options['directorio'])
+        self.stdout.write(self.style.SUCCESS(f"Entradas de auditoría recuperadas: {recuperadas}"))
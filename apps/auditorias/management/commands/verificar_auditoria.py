@@ -0,0 +1,37 @@
+from datetime import date, datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.auditorias.cadena import verificar
+
+
+class Command(BaseCommand):
+    help = (
+        "Verifica la cadena de hashes del log de auditoría desde el último punto de "
+        "control verificado (o desde --desde / --completa) hasta la cabeza."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help="Fecha YYYY-MM-DD: parte del último punto de control anterior")
+        parser.add_argument('--completa', action='store_true', help="Recorre toda la tabla")
+
+    def handle(self, *args, **options):
+        desde = None
+        if options['desde']:
+            try:
+                dia = date.fromisoformat(options['desde'])
+            except ValueError:
+                raise CommandError("Formato de fecha inválido, use YYYY-MM-DD")
+            desde = timezone.make_aware(datetime.combine(dia, datetime.min.time()))
+
+        resultado = verificar(desde=desde, completa=options['completa'])
+        self.stdout.write(
+            f"Entradas {resultado.inicio} a {resultado.fin}: {resultado.entradas} recalculadas, "
+            f"{resultado.puntos} puntos de control verificados"
+        )
+        if not resultado.correcta:
+            for error in resultado.errores:
+                self.stderr.write(self.style.ERROR(error))
+            raise CommandError(f"La cadena de auditoría no es válida ({len(resultado.errores)} errores)")
+        self.stdout.write(self.style.SUCCESS("Cadena de auditoría correcta"))
@@ -0,0 +1,37 @@
+import uuid
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def asignar_uuid(apps, schema_editor):
+    LogAuditoria = apps.get_model('auditorias', 'LogAuditoria')
+    for log in LogAuditoria.objects.filter(uuid__isnull=True).only('id').iterator():
+        LogAuditoria.objects.filter(pk=log.pk).update(uuid=uuid.uuid4())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auditorias', '0001_initial'),
+    ]
+
+    operations = [
+        # Campo único en tres pasos: nulo, rellenar las filas existentes y hacerlo único
+        migrations.AddField(
+            model_name='logauditoria',
+            name='uuid',
+            field=models.UUIDField(null=True, editable=False),
+        ),
+        migrations.RunPython(asignar_uuid, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='logauditoria',
+            name='uuid',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='logauditoria',
+            name='fecha_eliminacion',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def crear_fulltext(apps, schema_editor):
+    # Búsqueda ?q= del log (ver apps/auditorias/filtros.py); los demás motores usan icontains
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(
+            "CREATE FULLTEXT INDEX log_texto_ft ON auditorias_logauditoria (motivo, descripcion_objeto)"
+        )
+
+
+def eliminar_fulltext(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute("DROP INDEX log_texto_ft ON auditorias_logauditoria")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auditorias', '0002_uuid_fecha_evento'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='logauditoria',
+            index=models.Index(fields=['fecha_eliminacion', 'id'], name='log_fecha_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logauditoria',
+            index=models.Index(fields=['modelo_afectado', 'fecha_eliminacion', 'id'], name='log_modelo_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logauditoria',
+            index=models.Index(fields=['usuario', 'fecha_eliminacion', 'id'], name='log_usuario_fecha_idx'),
+        ),
+        migrations.RunPython(crear_fulltext, eliminar_fulltext),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auditorias', '0003_indices_consulta'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='logauditoria',
+            index=models.Index(fields=['objeto_id', 'fecha_eliminacion', 'id'], name='log_objeto_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,109 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:48
+
+import hashlib
+import json
+from datetime import timezone as dt_timezone
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.utils.crypto import salted_hmac
+
+# Copia fija del formato de apps/auditorias/cadena.py en esta versión: un cambio
+# posterior del formato o de AUDITORIA_PUNTO_CONTROL no altera esta migración
+GENESIS = '0' * 64
+PUNTO_CONTROL = 1000
+_SAL = 'apps.auditorias.cadena'
+
+
+def calcular_hash(log, hash_anterior):
+    contenido = json.dumps([
+        log.secuencia,
+        str(log.uuid),
+        log.modelo_afectado,
+        log.objeto_id,
+        log.descripcion_objeto,
+        log.motivo,
+        log.usuario_registrado,
+        log.fecha_eliminacion.astimezone(dt_timezone.utc).isoformat(),
+    ], ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256((hash_anterior + contenido).encode('utf-8')).hexdigest()
+
+
+def firmar(secuencia, hash_):
+    return salted_hmac(_SAL, f'{secuencia}:{hash_}', algorithm='sha256').hexdigest()
+
+
+def encadenar_existentes(apps, schema_editor):
+    # Las entradas anteriores se encadenan en orden de (fecha_eliminacion, id)
+    LogAuditoria = apps.get_model('auditorias', 'LogAuditoria')
+    CadenaAuditoria = apps.get_model('auditorias', 'CadenaAuditoria')
+    PuntoControlAuditoria = apps.get_model('auditorias', 'PuntoControlAuditoria')
+
+    secuencia, anterior = 0, GENESIS
+    lote, puntos = [], []
+    for log in LogAuditoria.objects.order_by('fecha_eliminacion', 'id').iterator(chunk_size=2000):
+        secuencia += 1
+        log.secuencia = secuencia
+        log.usuario_registrado = log.usuario_id
+        log.hash_anterior = anterior
+        log.hash = anterior = calcular_hash(log, anterior)
+        lote.append(log)
+        if secuencia % PUNTO_CONTROL == 0:
+            puntos.append(PuntoControlAuditoria(secuencia=secuencia, hash=anterior, firma=firmar(secuencia, anterior)))
+        if len(lote) == 1000:
+            LogAuditoria.objects.bulk_update(lote, ['secuencia', 'usuario_registrado', 'hash_anterior', 'hash'])
+            lote = []
+    LogAuditoria.objects.bulk_update(lote, ['secuencia', 'usuario_registrado', 'hash_anterior', 'hash'])
+    PuntoControlAuditoria.objects.bulk_create(puntos)
+    CadenaAuditoria.objects.create(pk=1, secuencia=secuencia, hash=anterior, firma=firmar(secuencia, anterior))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auditorias', '0004_indice_objeto'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CadenaAuditoria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('secuencia', models.PositiveBigIntegerField(default=0)),
+                ('hash', models.CharField(max_length=64)),
+                ('firma', models.CharField(max_length=64)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PuntoControlAuditoria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('secuencia', models.PositiveBigIntegerField(unique=True)),
+                ('hash', models.CharField(max_length=64)),
+                ('firma', models.CharField(max_length=64)),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('verificado_en', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='logauditoria',
+            name='hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='logauditoria',
+            name='hash_anterior',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='logauditoria',
+            name='secuencia',
+            field=models.PositiveBigIntegerField(editable=False, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='logauditoria',
+            name='usuario_registrado',
+            field=models.IntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(encadenar_existentes, migrations.RunPython.noop),
+    ]
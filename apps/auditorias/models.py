@@ -1,13 +1,60 @@
+import uuid
+
 from django.db import models
 from django.conf import settings  # <- IMPORTANTE agregar esto
+from django.utils import timezone
 
 class LogAuditoria(models.Model):
+    # Identificador asignado al registrar la entrada: permite reinsertar el
+    # registro de escritura anticipada sin duplicar (ver escritor.py)
+    uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     modelo_afectado = models.CharField(max_length=100)
     objeto_id = models.IntegerField()
     descripcion_objeto = models.TextField()
     motivo = models.TextField()
     usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
-    fecha_eliminacion = models.DateTimeField(auto_now_add=True)
+    # Momento de la eliminación, no de la inserción (las entradas se insertan por lotes)
+    fecha_eliminacion = models.DateTimeField(default=timezone.now, editable=False)
+    # Cadena de hashes (ver cadena.py): posición, id del usuario al registrar (se
+    # conserva aunque el usuario se elimine) y hashes propio y de la entrada anterior
+    secuencia = models.PositiveBigIntegerField(null=True, unique=True, editable=False)
+    usuario_registrado = models.IntegerField(null=True, editable=False)
+    hash_anterior = models.CharField(max_length=64, blank=True, editable=False)
+    hash = models.CharField(max_length=64, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Orden y paginación keyset del listado por (fecha_eliminacion, id)
+            models.Index(fields=['fecha_eliminacion', 'id'], name='log_fecha_id_idx'),
+            # Filtros del listado (ver filtros.py), con el mismo orden a continuación
+            models.Index(fields=['modelo_afectado', 'fecha_eliminacion', 'id'], name='log_modelo_fecha_idx'),
+            models.Index(fields=['usuario', 'fecha_eliminacion', 'id'], name='log_usuario_fecha_idx'),
+            models.Index(fields=['objeto_id', 'fecha_eliminacion', 'id'], name='log_objeto_fecha_idx'),
+        ]
+        # En MySQL la migración 0003 crea además el índice FULLTEXT log_texto_ft
+        # sobre (motivo, descripcion_objeto) para la búsqueda ?q=
 
     def __str__(self):
         return f"{self.modelo_afectado} {self.objeto_id} eliminado por {self.usuario}"
+
+
+class CadenaAuditoria(models.Model):
+    """Cabeza de la cadena de hashes (una sola fila): última secuencia y hash, firmados."""
+    secuencia = models.PositiveBigIntegerField(default=0)
+    hash = models.CharField(max_length=64)
+    firma = models.CharField(max_length=64)
+
+    def __str__(self):
+        return f"Cadena de auditoría en la secuencia {self.secuencia}"
+
+
+class PuntoControlAuditoria(models.Model):
+    """Secuencia y hash firmados cada AUDITORIA_PUNTO_CONTROL entradas (ver cadena.py)."""
+    secuencia = models.PositiveBigIntegerField(unique=True)
+    hash = models.CharField(max_length=64)
+    firma = models.CharField(max_length=64)
+    fecha = models.DateTimeField(default=timezone.now)
+    verificado_en = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Punto de control {self.secuencia}"
@@ -1,9 +1,11 @@
 # apps/auditorias/utils.py
 
-from .models import LogAuditoria
+from . import escritor
+
 
 def registrar_log_eliminacion(usuario, modelo_afectado, objeto_id, descripcion_objeto, motivo):
-    LogAuditoria.objects.create(
+    """Registra la eliminación en LogAuditoria mediante el escritor con búfer (ver escritor.py)."""
+    escritor.registrar(
         usuario=usuario,
         modelo_afectado=modelo_afectado,
         objeto_id=objeto_id,
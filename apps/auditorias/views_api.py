@@ -1,13 +1,59 @@
+from django.http import Http404
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
+from facturacion_segura.paginacion import PaginacionKeyset
+from . import archivo
+from .filtros import FiltroAuditoria, criterios
 from .models import LogAuditoria
 from .serializers import LogAuditoriaSerializer
 
+
+class PaginacionAuditoria(PaginacionKeyset):
+    """
+    Paginación keyset por (fecha_eliminacion, id), respaldada por log_fecha_id_idx.
+    Cada página mezcla la tabla con los segmentos archivados (ver archivo.py).
+    """
+    ordering = ('-fecha_eliminacion', '-id')
+
+    def consultar(self, queryset, campos, valores, reverso, limite):
+        resultados = super().consultar(queryset, campos, valores, reverso, limite)
+        descendente = not reverso
+        if len(resultados) == limite:
+            # Del archivo solo sirve lo que quede antes del último registro de la tabla
+            cota, faltan = archivo.clave(resultados[-1]), limite
+        else:
+            # La tabla no tiene más: el archivo completa la página
+            cota, faltan = None, limite - len(resultados)
+        archivadas = archivo.buscar(
+            criterios(self.request.query_params),
+            despues_de=tuple(valores) if valores is not None else None,
+            descendente=descendente,
+            limite=faltan,
+            cota=cota,
+        )
+        if not archivadas:
+            return resultados
+        mezcla = sorted(resultados + archivo.instancias(archivadas), key=archivo.clave, reverse=descendente)
+        return mezcla[:limite]
+
+
 class LogAuditoriaViewSet(viewsets.ReadOnlyModelViewSet):
     """
-    API para consultar registros del log de auditoría.
-    Solo lectura.
+    API para consultar registros del log de auditoría, en la tabla y en el archivo.
+    Solo lectura. Filtros: ?modelo=, ?usuario=, ?objeto=, ?desde=, ?hasta=, ?q= (ver filtros.py).
     """
-    queryset = LogAuditoria.objects.all().order_by('-fecha_eliminacion')  # ✅ corregido
+    queryset = LogAuditoria.objects.select_related('usuario')
     serializer_class = LogAuditoriaSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = PaginacionAuditoria
+    filter_backends = [FiltroAuditoria]
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            pk = str(self.kwargs.get('pk', ''))
+            entrada = archivo.buscar_id(int(pk)) if pk.isdigit() else None
+            if entrada is None:
+                raise
+            return archivo.instancias([entrada])[0]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0003_make_roles_optional'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cliente',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -17,6 +17,7 @@ class Cliente(models.Model):
     telefono = models.CharField(max_length=20, blank=True)
     activo = models.BooleanField(default=True)
     roles = models.ManyToManyField(Role, blank=True)
+    actualizado = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         roles_list = [role.name for role in self.roles.all()]
@@ -1,13 +1,15 @@
 from rest_framework import serializers
+from facturacion_segura.campos import CamposDinamicosMixin
 from .models import Cliente, Role
 
-class ClienteSerializer(serializers.ModelSerializer):
+class ClienteSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     # Manejar roles como una lista simple de strings
     roles = serializers.SerializerMethodField()
 
     class Meta:
         model = Cliente
         fields = '__all__'
+        prefetch_campos = {'roles': ['roles']}
 
     def get_roles(self, obj):
         """Serializar roles como lista de objetos con name"""
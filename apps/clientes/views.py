@@ -1,8 +1,8 @@
 from django.shortcuts import render
-from apps.usuarios.decorators import role_required
+from apps.usuarios.decorators import politica_requerida
 from .models import Cliente
 
-@role_required('Secretario', 'Administrador')
+@politica_requerida('web_clientes')
 def lista_clientes(request):
     clientes = Cliente.objects.all()
     return render(request, 'clientes/lista_clientes.html', {'clientes': clientes})
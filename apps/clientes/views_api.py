@@ -1,19 +1,21 @@
 from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.exceptions import PermissionDenied
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 
 from apps.usuarios.permissions import ClientePermission
+from facturacion_segura.campos import CamposDinamicosViewSetMixin
 from .models import Cliente
 from .serializers import ClienteSerializer
 
 # 🔽 Importar modelo de auditorías
-from apps.auditorias.models import LogAuditoria
+from apps.auditorias.utils import registrar_log_eliminacion
+from apps.usuarios import confirmacion
 
 
-class ClienteViewSet(viewsets.ModelViewSet):
+class ClienteViewSet(CamposDinamicosViewSetMixin, viewsets.ModelViewSet):
     """
     ViewSet para el módulo de Clientes.
     - Administrador, Secretario: Acceso completo (CRUD)
@@ -24,24 +26,8 @@ class ClienteViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, ClientePermission]
 
     def get_queryset(self):
-        """
-        Filtrar queryset basado en el rol del usuario.
-        Administradores, Secretarios y personal de Ventas pueden ver clientes.
-        """
-        user = self.request.user
-        if user.is_superuser or user.role in ['Administrador', 'Secretario', 'Ventas']:
-            return Cliente.objects.all()
-        return Cliente.objects.none()
-
-    def list(self, request, *args, **kwargs):
-        """
-        Listar clientes.
-        Permitido para: Administrador, Secretario, Ventas (solo lectura)
-        """
-        user = self.request.user
-        if not (user.is_superuser or user.role in ['Administrador', 'Secretario', 'Ventas']):
-            raise PermissionDenied("No tienes permiso para acceder a los clientes")
-        return super().list(request, *args, **kwargs)
+        """El acceso por rol (Ventas solo lectura) ya lo resolvió ClientePermission."""
+        return self.optimizar_campos(Cliente.objects.all())
 
     @action(detail=True, methods=['post'], url_path='eliminar-con-motivo')
     def eliminar_con_motivo(self, request, pk=None):
@@ -54,16 +40,21 @@ class ClienteViewSet(viewsets.ModelViewSet):
         if not motivo:
             return Response({'error': 'El motivo es requerido.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Registrar auditoría
-        LogAuditoria.objects.create(
-            modelo_afectado='Cliente',
-            objeto_id=cliente.id,
-            descripcion_objeto=str(cliente),
-            motivo=motivo,
-            usuario=request.user
-        )
+        # Token de validate_password (ver apps/usuarios/confirmacion.py)
+        confirmacion.verificar(request, confirmacion.ELIMINAR)
+
+        # Si la eliminación falla, la entrada de auditoría se revierte con ella
+        with transaction.atomic():
+            # Registrar auditoría
+            registrar_log_eliminacion(
+                modelo_afectado='Cliente',
+                objeto_id=cliente.id,
+                descripcion_objeto=str(cliente),
+                motivo=motivo,
+                usuario=request.user
+            )
 
-        cliente.delete()
+            cliente.delete()
         return Response({'mensaje': 'Cliente eliminado con motivo registrado.'}, status=status.HTTP_204_NO_CONTENT)
     
     def destroy(self, request, *args, **kwargs):
@@ -75,16 +66,18 @@ class ClienteViewSet(viewsets.ModelViewSet):
         # Obtener motivo del request.data
         motivo = request.data.get('motivo', 'Eliminación sin motivo especificado')
         
-        # Crear log de auditoría ANTES de eliminar
-        LogAuditoria.objects.create(
-            modelo_afectado='Cliente',
-            objeto_id=cliente.id,
-            descripcion_objeto=f"{cliente.nombre} ({cliente.email})",
-            motivo=motivo,
-            usuario=request.user
-        )
-        
-        # Eliminar el cliente
-        cliente.delete()
+        # Si la eliminación falla, la entrada de auditoría se revierte con ella
+        with transaction.atomic():
+            # Crear log de auditoría ANTES de eliminar
+            registrar_log_eliminacion(
+                modelo_afectado='Cliente',
+                objeto_id=cliente.id,
+                descripcion_objeto=f"{cliente.nombre} ({cliente.email})",
+                motivo=motivo,
+                usuario=request.user
+            )
+
+            # Eliminar el cliente
+            cliente.delete()
         
         return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
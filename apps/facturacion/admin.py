@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Factura, FacturaItem
+from .models import Factura, FacturaItem, CorreoPendiente
 
 class FacturaItemInline(admin.TabularInline):
     model = FacturaItem
@@ -11,3 +11,11 @@ class FacturaAdmin(admin.ModelAdmin):
     list_filter = ('anulada', 'fecha')
     search_fields = ('creador__username',)
     inlines = [FacturaItemInline]
+
+
+@admin.register(CorreoPendiente)
+class CorreoPendienteAdmin(admin.ModelAdmin):
+    list_display = ('id', 'tipo', 'destinatario', 'estado', 'intentos', 'proximo_intento', 'enviado')
+    list_filter = ('estado', 'tipo')
+    search_fields = ('destinatario',)
+    readonly_fields = ('creado', 'enviado', 'ultimo_error')
@@ -0,0 +1,278 @@
+"""
+Analítica de ventas sobre las líneas de factura con NumPy.
+
+cargar_lineas() lee las líneas de un rango de días como columnas (arrays) en
+lugar de objetos: las facturas (id, día, cliente, creador) y las líneas
+(factura, producto, cantidad) se leen con values_list en bloques keyset por id
+(recorrer_por_bloques), los precios
+se toman de una tabla por producto y se cruzan con searchsorted. Sobre esas
+columnas las agrupaciones, percentiles y rankings son operaciones vectorizadas
+(unique, bincount, lexsort), sin bucles de Python por línea.
+
+NumPy es una dependencia opcional (requirements-analitica.txt): si no está
+instalado, las funciones lanzan AnaliticaNoDisponible.
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.productos.models import Producto
+from facturacion_segura.paginacion import recorrer_por_bloques
+from .models import Factura, FacturaItem
+
+ANALITICA_CHUNK = 50000
+PERCENTILES = (50, 90, 99)
+
+
+class AnaliticaNoDisponible(Exception):
+    """NumPy no está instalado."""
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise AnaliticaNoDisponible(
+            "La analítica requiere NumPy: pip install -r requirements-analitica.txt"
+        )
+    return numpy
+
+
+def _leer_por_bloques(np, filas, columnas, chunk_size, dtype):
+    """Lee las filas (tuplas de enteros) por bloques y retorna un array por columna."""
+    bloques = []
+    iterador = iter(filas)
+    while True:
+        lote = list(islice(iterador, chunk_size))
+        if not lote:
+            break
+        bloques.append(np.array(lote, dtype=dtype))
+    datos = np.concatenate(bloques) if bloques else np.empty((0, len(columnas)), dtype=dtype)
+    return {columna: datos[:, i] for i, columna in enumerate(columnas)}
+
+
+def cargar_lineas(desde, hasta, estados=Factura.ESTADOS_VENTA, chunk_size=ANALITICA_CHUNK):
+    """
+    Líneas de las facturas en `estados` con fecha entre los días desde..hasta
+    (incluidos), como dict de arrays del mismo largo:
+    factura_id, producto_id, cliente_id, creador_id, dia (ordinal de la fecha local),
+    cantidad, precio_centavos e importe_centavos (cantidad * precio).
+    Los precios son los actuales del producto, igual que los totales de la factura.
+    """
+    np = _numpy()
+    zona = timezone.get_current_timezone()
+    inicio = timezone.make_aware(datetime.combine(desde, datetime.min.time()), zona)
+    fin = timezone.make_aware(datetime.combine(hasta + timedelta(days=1), datetime.min.time()), zona)
+
+    facturas = recorrer_por_bloques(
+        Factura.objects.filter(estado__in=estados, fecha__gte=inicio, fecha__lt=fin)
+        .annotate(dia=TruncDate('fecha'))
+        .values_list('id', 'dia', 'cliente_id', 'creador_id'),
+        ('id',), chunk_size, clave=lambda fila: fila[:1],
+    )
+    facturas = _leer_por_bloques(
+        np, ((id_, dia.toordinal(), cliente, creador) for id_, dia, cliente, creador in facturas),
+        ('id', 'dia', 'cliente_id', 'creador_id'), chunk_size, np.int64,
+    )
+
+    lineas = recorrer_por_bloques(
+        FacturaItem.objects.filter(factura__estado__in=estados, factura__fecha__gte=inicio, factura__fecha__lt=fin)
+        .values_list('id', 'factura_id', 'producto_id', 'cantidad'),
+        ('id',), chunk_size, clave=lambda fila: fila[:1],
+    )
+    lineas = _leer_por_bloques(np, lineas, ('id', 'factura_id', 'producto_id', 'cantidad'), chunk_size, np.int64)
+    del lineas['id']
+
+    # Datos de la factura de cada línea (los ids de facturas están ordenados).
+    # Las lecturas son consultas separadas: una factura emitida mientras tanto
+    # puede traer líneas cuya factura no se leyó. Esas líneas se descartan
+    posicion = np.searchsorted(facturas['id'], lineas['factura_id'])
+    if len(facturas['id']):
+        posicion = np.minimum(posicion, len(facturas['id']) - 1)
+        validas = facturas['id'][posicion] == lineas['factura_id']
+    else:
+        validas = np.zeros(len(posicion), dtype=bool)
+    if not validas.all():
+        lineas = {columna: valores[validas] for columna, valores in lineas.items()}
+        posicion = posicion[validas]
+    for columna in ('dia', 'cliente_id', 'creador_id'):
+        lineas[columna] = facturas[columna][posicion]
+
+    # Tabla de precios en centavos indexada por id de producto
+    precios = dict(Producto.objects.values_list('id', 'precio'))
+    tabla = np.zeros(max(precios, default=0) + 1, dtype=np.int64)
+    for producto_id, precio in precios.items():
+        tabla[producto_id] = int(precio * 100)
+    lineas['precio_centavos'] = tabla[lineas['producto_id']]
+    lineas['importe_centavos'] = lineas['cantidad'] * lineas['precio_centavos']
+    return lineas
+
+
+def _moneda(centavos):
+    """Centavos (entero o promedio/percentil) como texto con dos decimales."""
+    return str(Decimal(repr(float(centavos))).quantize(Decimal('1'), rounding=ROUND_HALF_UP).scaleb(-2))
+
+
+def _agrupar(np, claves, *pesos):
+    """(claves únicas, posición de cada fila en ellas, sumas de cada peso por clave)."""
+    unicas, inverso = np.unique(claves, return_inverse=True)
+    sumas = [np.bincount(inverso, weights=peso, minlength=len(unicas)).round().astype(np.int64) for peso in pesos]
+    return unicas, inverso, sumas
+
+
+def _top(np, claves, valores, n):
+    """Índices de los `n` mayores valores, de mayor a menor (empates por clave ascendente)."""
+    if n is not None and n < len(valores):
+        candidatos = np.argpartition(-valores, n - 1)[:n]
+    else:
+        candidatos = np.arange(len(valores))
+    orden = np.lexsort((claves[candidatos], -valores[candidatos]))
+    return candidatos[orden]
+
+
+def _percentiles_por_grupo(np, grupos, valores, percentiles):
+    """
+    Percentiles (interpolación lineal) de `valores` dentro de cada grupo.
+    Retorna (grupos únicos, {p: array con el percentil de cada grupo}).
+    """
+    orden = np.lexsort((valores, grupos))
+    grupos, valores = grupos[orden], valores[orden].astype(np.float64)
+    unicos, inicios, conteos = np.unique(grupos, return_index=True, return_counts=True)
+    resultado = {}
+    for p in percentiles:
+        posicion = inicios + (conteos - 1) * (p / 100)
+        abajo = np.floor(posicion).astype(np.int64)
+        arriba = np.ceil(posicion).astype(np.int64)
+        resultado[p] = valores[abajo] + (valores[arriba] - valores[abajo]) * (posicion - abajo)
+    return unicos, resultado
+
+
+def ingresos_producto_semana(lineas, top=10):
+    """
+    Ingresos y unidades por producto y semana (lunes a domingo) de los `top`
+    productos con más ingresos en el rango.
+    """
+    np = _numpy()
+    if not len(lineas['producto_id']):
+        return {'semanas': [], 'productos': []}
+
+    # date.toordinal(): el día 1 es lunes
+    lunes = lineas['dia'] - (lineas['dia'] - 1) % 7
+    semanas = np.unique(lunes)
+    productos, inverso, (ingresos, unidades) = _agrupar(
+        np, lineas['producto_id'], lineas['importe_centavos'], lineas['cantidad']
+    )
+    elegidos = _top(np, productos, ingresos, top)
+
+    # Matriz producto x semana solo para los productos elegidos
+    fila = np.full(len(productos), -1, dtype=np.int64)
+    fila[elegidos] = np.arange(len(elegidos))
+    fila_linea = fila[inverso]
+    incluidas = fila_linea >= 0
+    celda = fila_linea[incluidas] * len(semanas) + np.searchsorted(semanas, lunes[incluidas])
+    tamano = len(elegidos) * len(semanas)
+    matriz_ingresos = np.bincount(
+        celda, weights=lineas['importe_centavos'][incluidas], minlength=tamano
+    ).round().astype(np.int64).reshape(len(elegidos), len(semanas))
+    matriz_unidades = np.bincount(
+        celda, weights=lineas['cantidad'][incluidas], minlength=tamano
+    ).round().astype(np.int64).reshape(len(elegidos), len(semanas))
+
+    nombres = dict(Producto.objects.filter(id__in=productos[elegidos].tolist()).values_list('id', 'nombre'))
+    return {
+        'semanas': [date.fromordinal(int(s)).isoformat() for s in semanas],
+        'productos': [
+            {
+                'producto_id': int(productos[i]),
+                'nombre': nombres.get(int(productos[i])),
+                'unidades': int(unidades[i]),
+                'ingresos': _moneda(ingresos[i]),
+                'unidades_por_semana': matriz_unidades[j].tolist(),
+                'ingresos_por_semana': [_moneda(c) for c in matriz_ingresos[j]],
+            }
+            for j, i in enumerate(elegidos)
+        ],
+    }
+
+
+def distribucion_canasta(lineas, percentiles=PERCENTILES, max_lineas=20):
+    """
+    Tamaño de la canasta por factura: promedio y percentiles de líneas, unidades
+    e importe, e histograma de líneas por factura (el último tramo acumula
+    `max_lineas` o más).
+    """
+    np = _numpy()
+    facturas, _, (lineas_factura, unidades, importes) = _agrupar(
+        np, lineas['factura_id'], np.ones(len(lineas['factura_id'])), lineas['cantidad'], lineas['importe_centavos']
+    )
+    if not len(facturas):
+        return {'facturas': 0, 'promedio': None, 'percentiles': {}, 'histograma_lineas': []}
+
+    histograma = np.bincount(np.minimum(lineas_factura, max_lineas), minlength=max_lineas + 1)
+    metricas = {'lineas': lineas_factura, 'unidades': unidades, 'importe': importes}
+    valores_percentiles = {
+        nombre: np.percentile(valores, percentiles) for nombre, valores in metricas.items()
+    }
+    return {
+        'facturas': int(len(facturas)),
+        'promedio': {
+            'lineas': round(float(lineas_factura.mean()), 2),
+            'unidades': round(float(unidades.mean()), 2),
+            'importe': _moneda(importes.mean()),
+        },
+        'percentiles': {
+            f'p{p}': {
+                'lineas': round(float(valores_percentiles['lineas'][i]), 2),
+                'unidades': round(float(valores_percentiles['unidades'][i]), 2),
+                'importe': _moneda(valores_percentiles['importe'][i]),
+            }
+            for i, p in enumerate(percentiles)
+        },
+        'histograma_lineas': [
+            {'lineas': n if n < max_lineas else f'{max_lineas}+', 'facturas': int(c)}
+            for n, c in enumerate(histograma) if n > 0 and c
+        ],
+    }
+
+
+def rendimiento_vendedores(lineas, top=10, percentiles=(50, 90)):
+    """
+    Por usuario creador: facturas, unidades, ingresos, ticket promedio y
+    percentiles del ticket, de los `top` con más ingresos.
+    """
+    np = _numpy()
+    facturas, inverso, (importes,) = _agrupar(np, lineas['factura_id'], lineas['importe_centavos'])
+    if not len(facturas):
+        return []
+
+    # Creador de cada factura: el de cualquiera de sus líneas
+    creador_factura = np.empty(len(facturas), dtype=np.int64)
+    creador_factura[inverso] = lineas['creador_id']
+
+    creadores, _, (ingresos, unidades) = _agrupar(
+        np, lineas['creador_id'], lineas['importe_centavos'], lineas['cantidad']
+    )
+    num_facturas = np.bincount(np.searchsorted(creadores, creador_factura), minlength=len(creadores))
+    _, tickets = _percentiles_por_grupo(np, creador_factura, importes, percentiles)
+    elegidos = _top(np, creadores, ingresos, top)
+
+    nombres = dict(
+        get_user_model().objects.filter(id__in=creadores[elegidos].tolist()).values_list('id', 'username')
+    )
+    return [
+        {
+            'creador_id': int(creadores[i]),
+            'nombre': nombres.get(int(creadores[i])),
+            'facturas': int(num_facturas[i]),
+            'unidades': int(unidades[i]),
+            'ingresos': _moneda(ingresos[i]),
+            'ticket_promedio': _moneda(ingresos[i] / num_facturas[i]),
+            **{f'ticket_p{p}': _moneda(tickets[p][i]) for p in percentiles},
+        }
+        for i in elegidos
+    ]
@@ -0,0 +1,104 @@
+"""
+Índice de compras conjuntas ("se compran juntos") para sugerir productos.
+
+CompraConjunta (apps/productos/models.py) guarda, para cada par de productos
+vendidos en una misma factura emitida o pagada, cuántas facturas los incluyen.
+Solo existen filas para los pares que realmente aparecieron (índice disperso).
+
+- reconstruir(): recorre FacturaItem ordenado por factura en bloques keyset
+  sobre (factura, id) y cuenta los pares en un Counter que solo contiene pares existentes.
+- aplicar_cambio(): Factura.save()/delete() suman o restan los pares de la
+  factura cuando entra o sale de los estados de venta (emitir, anular, eliminar).
+
+/api/productos/{id}/relacionados/ lee los más frecuentes de un producto con un
+rango del índice (producto, -veces).
+"""
+
+from collections import Counter
+from itertools import combinations, groupby, islice
+
+from django.db import transaction
+from django.db.models import F
+
+from apps.productos.models import CompraConjunta
+from facturacion_segura.paginacion import recorrer_por_bloques
+from .models import Factura, FacturaItem
+
+COMPRAS_CONJUNTAS_CHUNK = 5000
+
+
+def _es_venta(foto):
+    return foto is not None and foto[0] in Factura.ESTADOS_VENTA
+
+
+def _productos_factura(factura):
+    if 'items' in getattr(factura, '_prefetched_objects_cache', {}):
+        return sorted({item.producto_id for item in factura.items.all()})
+    return sorted(set(factura.items.values_list('producto_id', flat=True)))
+
+
+def aplicar_cambio(factura, anterior, actual):
+    """
+    Suma los pares de la factura si pasa a un estado de venta y los resta si
+    deja de estarlo (fotos de Factura.foto_resumen()).
+    """
+    if _es_venta(anterior) == _es_venta(actual):
+        return
+    productos = _productos_factura(factura)
+    if len(productos) < 2:
+        return
+
+    pares = CompraConjunta.objects.filter(producto_id__in=productos, relacionado_id__in=productos)
+    with transaction.atomic():
+        if _es_venta(actual):
+            existentes = set(pares.values_list('producto_id', 'relacionado_id'))
+            # Los pares nuevos se crean en 0 y se incrementan con el resto en un solo UPDATE,
+            # así una creación concurrente del mismo par no pierde ninguna suma
+            CompraConjunta.objects.bulk_create([
+                CompraConjunta(producto_id=a, relacionado_id=b, veces=0)
+                for a in productos for b in productos
+                if a != b and (a, b) not in existentes
+            ], ignore_conflicts=True)
+            pares.update(veces=F('veces') + 1)
+        else:
+            pares.update(veces=F('veces') - 1)
+            pares.filter(veces=0).delete()
+
+
+def contar_pares(chunk_size=COMPRAS_CONJUNTAS_CHUNK):
+    """
+    Counter {(a, b): facturas} con a < b de las facturas emitidas o pagadas.
+    Las líneas se leen por bloques, ordenadas por factura; la memoria depende
+    del número de pares distintos, no del número de facturas.
+    """
+    lineas = recorrer_por_bloques(
+        FacturaItem.objects.filter(factura__estado__in=Factura.ESTADOS_VENTA)
+        .values_list('factura_id', 'id', 'producto_id'),
+        ('factura_id', 'id'), chunk_size, clave=lambda linea: linea[:2],
+    )
+    pares = Counter()
+    for _, grupo in groupby(lineas, key=lambda linea: linea[0]):
+        productos = sorted({producto_id for _, _, producto_id in grupo})
+        pares.update(combinations(productos, 2))
+    return pares
+
+
+def reconstruir(chunk_size=COMPRAS_CONJUNTAS_CHUNK):
+    """Recalcula todo el índice desde las facturas. Retorna (pares, filas)."""
+    pares = contar_pares(chunk_size)
+    filas = (
+        CompraConjunta(producto_id=producto, relacionado_id=relacionado, veces=veces)
+        for (a, b), veces in pares.items()
+        for producto, relacionado in ((a, b), (b, a))
+    )
+    with transaction.atomic():
+        CompraConjunta.objects.all().delete()
+        creadas = 0
+        while True:
+            lote = list(islice(filas, chunk_size))
+            if not lote:
+                break
+            CompraConjunta.objects.bulk_create(lote)
+            creadas += len(lote)
+    return len(pares), creadas
+
@@ -0,0 +1,232 @@
+"""
+Exportación contable incremental de facturas.
+
+Escribe, por cada día con facturas, dos archivos CSV comprimidos con gzip:
+    facturas-YYYY-MM-DD.csv.gz   encabezados (una fila por factura)
+    lineas-YYYY-MM-DD.csv.gz     líneas (una fila por ítem)
+y un manifest.json con el contenido de cada partición.
+
+Cada partición guarda una huella del día (cantidad de facturas, suma de totales,
+id máximo y última modificación de las facturas, de sus clientes y del nombre o
+precio de sus productos, que también se exportan; el stock no cuenta). En la
+siguiente ejecución se calculan las huellas del periodo con dos consultas
+agregadas y solo se reescriben los días cuya huella cambió; los días que
+quedaron sin facturas se eliminan.
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .documentos import rango_periodo
+from .models import Factura, FacturaItem
+
+CONTABILIDAD_CHUNK = 2000
+MANIFEST = 'manifest.json'
+
+COLUMNAS_FACTURAS = [
+    'id', 'numero_factura', 'fecha', 'estado', 'anulada', 'cliente_id', 'cliente',
+    'creador_id', 'subtotal', 'iva', 'total', 'actualizado',
+]
+COLUMNAS_LINEAS = [
+    'id', 'factura_id', 'producto_id', 'producto', 'cantidad', 'precio_unitario', 'subtotal',
+]
+
+
+def directorio_exportacion(directorio=None):
+    """Directorio indicado o, por defecto, settings.CONTABILIDAD_DIR."""
+    if directorio:
+        return Path(directorio)
+    return Path(getattr(settings, 'CONTABILIDAD_DIR', settings.BASE_DIR / 'exportaciones' / 'contabilidad'))
+
+
+def huellas_por_dia(inicio, fin):
+    """
+    Huella de cada día (fecha local) con facturas en [inicio, fin).
+    Dos consultas agregadas con GROUP BY día: facturas (con su cliente) y líneas
+    (con su producto). Van por separado para que el join con las líneas no
+    multiplique la cantidad ni la suma de totales.
+    """
+    filas = (
+        Factura.objects.filter(fecha__gte=inicio, fecha__lt=fin)
+        .annotate(dia=TruncDate('fecha'))
+        .values('dia')
+        .annotate(
+            facturas=Count('id'),
+            total=Sum('total'),
+            id_maximo=Max('id'),
+            actualizado=Max('actualizado'),
+            clientes=Max('cliente__actualizado'),
+        )
+        .order_by('dia')
+    )
+    productos = dict(
+        FacturaItem.objects.filter(factura__fecha__gte=inicio, factura__fecha__lt=fin)
+        .annotate(dia=TruncDate('factura__fecha'))
+        .values('dia')
+        .annotate(productos=Max('producto__datos_actualizados'))
+        .order_by()
+        .values_list('dia', 'productos')
+    )
+    return {
+        fila['dia'].isoformat(): {
+            'facturas': fila['facturas'],
+            'total': str(fila['total'] or 0),
+            'id_maximo': fila['id_maximo'],
+            'actualizado': _iso(fila['actualizado']),
+            'clientes': _iso(fila['clientes']),
+            'productos': _iso(productos.get(fila['dia'])),
+        }
+        for fila in filas
+    }
+
+
+def _iso(fecha):
+    return fecha.isoformat() if fecha else None
+
+
+def _rango_dia(dia):
+    inicio = timezone.make_aware(datetime.combine(dia, datetime.min.time()))
+    return inicio, inicio + timedelta(days=1)
+
+
+def _filas_facturas(inicio, fin):
+    facturas = (
+        Factura.objects.filter(fecha__gte=inicio, fecha__lt=fin)
+        .order_by('id')
+        .values_list(
+            'id', 'numero_factura', 'fecha', 'estado', 'anulada', 'cliente_id', 'cliente__nombre',
+            'creador_id', 'subtotal', 'iva', 'total', 'actualizado',
+        )
+    )
+    for fila in facturas.iterator(chunk_size=CONTABILIDAD_CHUNK):
+        (id_, numero, fecha, estado, anulada, cliente_id, cliente,
+         creador_id, subtotal, iva, total, actualizado) = fila
+        yield [
+            id_, numero or '', fecha.isoformat(), estado, int(anulada), cliente_id, cliente,
+            creador_id, subtotal, iva, total, actualizado.isoformat(),
+        ]
+
+
+def _filas_lineas(inicio, fin):
+    lineas = (
+        FacturaItem.objects.filter(factura__fecha__gte=inicio, factura__fecha__lt=fin)
+        .order_by('factura_id', 'id')
+        .values_list('id', 'factura_id', 'producto_id', 'producto__nombre', 'cantidad', 'producto__precio')
+    )
+    for id_, factura_id, producto_id, producto, cantidad, precio in lineas.iterator(chunk_size=CONTABILIDAD_CHUNK):
+        yield [id_, factura_id, producto_id, producto, cantidad, precio, cantidad * precio]
+
+
+def _escribir_csv_gz(ruta, columnas, filas):
+    """
+    Escribe el CSV comprimido de forma atómica (archivo temporal + rename).
+    mtime=0 hace que el mismo contenido produzca siempre los mismos bytes.
+    Retorna (filas escritas, bytes, sha256).
+    """
+    temporal = ruta.with_name(ruta.name + '.tmp')
+    cantidad = 0
+    with open(temporal, 'wb') as crudo:
+        with gzip.GzipFile(fileobj=crudo, mode='wb', mtime=0) as comprimido:
+            texto = io.TextIOWrapper(comprimido, encoding='utf-8', newline='')
+            escritor = csv.writer(texto)
+            escritor.writerow(columnas)
+            for fila in filas:
+                escritor.writerow(fila)
+                cantidad += 1
+            texto.flush()
+            texto.detach()
+    os.replace(temporal, ruta)
+    contenido = ruta.read_bytes()
+    return cantidad, len(contenido), hashlib.sha256(contenido).hexdigest()
+
+
+def leer_manifest(directorio=None):
+    ruta = directorio_exportacion(directorio) / MANIFEST
+    if not ruta.exists():
+        return {'version': 1, 'generado': None, 'particiones': {}}
+    return json.loads(ruta.read_text(encoding='utf-8'))
+
+
+def _guardar_manifest(directorio, manifest):
+    ruta = directorio / MANIFEST
+    temporal = ruta.with_name(MANIFEST + '.tmp')
+    temporal.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding='utf-8')
+    os.replace(temporal, ruta)
+
+
+def exportar_contabilidad(periodo, directorio=None, forzar=False):
+    """
+    Exporta las facturas del periodo 'YYYY-MM' al directorio.
+    Solo reescribe los días cuya huella cambió desde la última exportación
+    (todos si `forzar`). Retorna un resumen de lo realizado.
+    """
+    inicio, fin = rango_periodo(periodo)
+    directorio = directorio_exportacion(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+
+    manifest = leer_manifest(directorio)
+    particiones = manifest['particiones']
+    huellas = huellas_por_dia(inicio, fin)
+    resumen = {'periodo': periodo, 'escritos': [], 'sin_cambios': [], 'eliminados': []}
+
+    for dia, huella in huellas.items():
+        anterior = particiones.get(dia)
+        if not forzar and anterior and anterior['huella'] == huella:
+            resumen['sin_cambios'].append(dia)
+            continue
+
+        inicio_dia, fin_dia = _rango_dia(datetime.fromisoformat(dia).date())
+        archivo_facturas = f"facturas-{dia}.csv.gz"
+        archivo_lineas = f"lineas-{dia}.csv.gz"
+        facturas, bytes_facturas, sha_facturas = _escribir_csv_gz(
+            directorio / archivo_facturas, COLUMNAS_FACTURAS, _filas_facturas(inicio_dia, fin_dia)
+        )
+        lineas, bytes_lineas, sha_lineas = _escribir_csv_gz(
+            directorio / archivo_lineas, COLUMNAS_LINEAS, _filas_lineas(inicio_dia, fin_dia)
+        )
+        particiones[dia] = {
+            'huella': huella,
+            'exportado': timezone.now().isoformat(),
+            'archivos': {
+                'facturas': {'nombre': archivo_facturas, 'filas': facturas,
+                             'bytes': bytes_facturas, 'sha256': sha_facturas},
+                'lineas': {'nombre': archivo_lineas, 'filas': lineas,
+                           'bytes': bytes_lineas, 'sha256': sha_lineas},
+            },
+        }
+        resumen['escritos'].append(dia)
+
+    # Días del periodo exportados antes que ya no tienen facturas
+    primer_dia, ultimo_dia = inicio.date().isoformat(), (fin - timedelta(days=1)).date().isoformat()
+    for dia in [d for d in particiones if primer_dia <= d <= ultimo_dia and d not in huellas]:
+        for archivo in particiones.pop(dia)['archivos'].values():
+            (directorio / archivo['nombre']).unlink(missing_ok=True)
+        resumen['eliminados'].append(dia)
+
+    if resumen['escritos'] or resumen['eliminados'] or manifest['generado'] is None:
+        manifest['generado'] = timezone.now().isoformat()
+        _guardar_manifest(directorio, manifest)
+    return resumen
+
+
+def ruta_archivo_exportado(nombre, directorio=None):
+    """
+    Ruta de un archivo listado en el manifest, o None si no figura en él
+    (evita servir cualquier otro archivo del disco).
+    """
+    for particion in leer_manifest(directorio)['particiones'].values():
+        for archivo in particion['archivos'].values():
+            if archivo['nombre'] == nombre:
+                return directorio_exportacion(directorio) / nombre
+    return None
@@ -0,0 +1,168 @@
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.conf import settings
+from django.utils import timezone
+
+from .documentos import nombre_archivo_estado_cuenta, preparar_datos_factura, generar_pdf_factura
+from .models import Factura
+
+_FIN = object()
+
+
+def construir_correo_pdf(destinatario, asunto, cuerpo, nombre_archivo, pdf, connection=None):
+    """
+    Construye el correo con un PDF adjunto.
+    Es el único punto donde se arma un correo de facturación, de modo que
+    facturas individuales y estados de cuenta salen por el mismo camino.
+    """
+    email = EmailMessage(
+        subject=asunto,
+        body=cuerpo,
+        from_email=settings.EMAIL_HOST_USER,
+        to=[destinatario],
+        connection=connection,
+    )
+    email.attach(nombre_archivo, pdf, "application/pdf")
+    return email
+
+
+def construir_correo_factura(factura, pdf, connection=None):
+    return construir_correo_pdf(
+        destinatario=factura.cliente.email,
+        asunto=f"Factura #{factura.numero_factura or factura.id}",
+        cuerpo="Adjunto encontrarás tu factura.",
+        nombre_archivo=f"factura_{factura.id}.pdf",
+        pdf=pdf,
+        connection=connection,
+    )
+
+
+def construir_correo_estado_cuenta(estado_cuenta, pdf, connection=None):
+    return construir_correo_pdf(
+        destinatario=estado_cuenta['cliente']['email'],
+        asunto=f"Estado de cuenta {estado_cuenta['periodo']}",
+        cuerpo=(
+            f"Adjunto encontrarás tu estado de cuenta del periodo {estado_cuenta['periodo']} "
+            f"con {len(estado_cuenta['facturas'])} factura(s)."
+        ),
+        nombre_archivo=nombre_archivo_estado_cuenta(estado_cuenta),
+        pdf=pdf,
+        connection=connection,
+    )
+
+
+def enviar_en_lotes(elementos, construir, tamano_lote=50, connection=None):
+    """
+    Envía muchos correos por una sola conexión SMTP, en lotes con send_messages().
+
+    El envío por la red corre en un hilo aparte; en el hilo que llama se recorre
+    `elementos` y se construye cada mensaje (típicamente generar un PDF), que se
+    encola para el envío. La cola es acotada: si el envío va más lento, la lectura
+    de `elementos` espera, de modo que un generador o un iterator() de queryset se
+    consume a medida que se envía (memoria constante) y las consultas a la base de
+    datos se hacen siempre en el hilo que llama.
+    `construir(elemento)` retorna un EmailMessage (o None para omitirlo).
+
+    Retorna un diccionario con enviados, lotes, segundos y mensajes_por_segundo.
+    """
+    cola = queue.Queue(maxsize=tamano_lote * 2)
+    cancelado = threading.Event()
+    errores = []
+    resultado = {'enviados': 0, 'lotes': 0}
+    connection = connection or get_connection()
+
+    def emisor():
+        mensaje = None
+        try:
+            with connection:
+                lote = []
+                while True:
+                    mensaje = cola.get()
+                    if mensaje is not _FIN:
+                        mensaje.connection = connection
+                        lote.append(mensaje)
+                    if lote and (mensaje is _FIN or len(lote) >= tamano_lote):
+                        resultado['enviados'] += connection.send_messages(lote) or 0
+                        resultado['lotes'] += 1
+                        lote = []
+                    if mensaje is _FIN:
+                        break
+        except Exception as e:
+            errores.append(e)
+            # Si el envío falla, se detiene la construcción y se vacía la cola para que termine
+            cancelado.set()
+            while mensaje is not _FIN:
+                mensaje = cola.get()
+
+    inicio = time.perf_counter()
+    hilo = threading.Thread(target=emisor, name='envio-correos', daemon=True)
+    hilo.start()
+    try:
+        for elemento in elementos:
+            if cancelado.is_set():
+                break
+            mensaje = construir(elemento)
+            if mensaje is not None:
+                cola.put(mensaje)
+    finally:
+        cola.put(_FIN)
+        hilo.join()
+
+    if errores:
+        raise errores[0]
+
+    segundos = time.perf_counter() - inicio
+    enviados = resultado['enviados']
+    return {
+        'enviados': enviados,
+        'lotes': resultado['lotes'],
+        'segundos': segundos,
+        'mensajes_por_segundo': enviados / segundos if segundos > 0 else 0,
+    }
+
+
+def enviar_facturas_en_lote(facturas, tamano_lote=50):
+    """
+    Envía el PDF de cada factura a su cliente reutilizando una sola conexión SMTP.
+    `facturas` debe traer cliente e items__producto precargados. Se recorren por
+    bloques (iterator) al ritmo del envío: no se cargan todas en memoria.
+    """
+    if hasattr(facturas, 'iterator'):
+        facturas = facturas.iterator(chunk_size=500)
+    pendientes = (factura for factura in facturas if factura.cliente_id and factura.cliente.email)
+
+    def construir(factura):
+        return construir_correo_factura(factura, generar_pdf_factura(preparar_datos_factura(factura)))
+
+    return enviar_en_lotes(pendientes, construir, tamano_lote=tamano_lote)
+
+
+def seleccionar_facturas_envio(ids=None, fecha=None, estado=None):
+    """
+    Facturas a enviar en lote: por lista de ids o por día (fecha local) y estado.
+    Solo se envían facturas emitidas o pagadas (Factura.ESTADOS_VENTA): sin estado
+    se toman ambas con ids y EMITIDA por día; borradores y anuladas nunca salen.
+    Se precargan cliente e items__producto para generar los PDFs sin consultas extra.
+    """
+    if not ids and not fecha and not estado:
+        raise ValueError("Debe indicar una lista de ids o un filtro de fecha/estado")
+    if estado and estado not in Factura.ESTADOS_VENTA:
+        raise ValueError(f"Solo se envían facturas en estado {' o '.join(Factura.ESTADOS_VENTA)}: {estado}")
+
+    facturas = Factura.objects.select_related('cliente').prefetch_related('items__producto')
+    if ids:
+        facturas = facturas.filter(id__in=ids)
+    elif not estado:
+        estado = 'EMITIDA'
+    if estado:
+        facturas = facturas.filter(estado=estado)
+    else:
+        facturas = facturas.filter(estado__in=Factura.ESTADOS_VENTA)
+    if fecha:
+        inicio = timezone.make_aware(datetime.combine(fecha, datetime.min.time()))
+        facturas = facturas.filter(fecha__gte=inicio, fecha__lt=inicio + timedelta(days=1))
+    return facturas.filter(anulada=False).order_by('id')
@@ -0,0 +1,377 @@
+from datetime import datetime
+from decimal import Decimal
+from io import BytesIO
+
+from django.db.models import Count, Max
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+from .models import Factura
+
+# Datos de la empresa que encabezan todos los documentos
+EMPRESA_NOMBRE = "Sistema de Facturación Segura"
+EMPRESA_DATOS = "RUC: 123456789 | Dirección: Av. Ejemplo 123, Ciudad"
+EMPRESA_CONTACTO = "Teléfono: (123) 456-7890 | Email: contacto@facturasegura.com"
+
+# Tiempo (segundos) que se cachea el fragmento HTML de una factura ya emitida
+HTML_FACTURA_CACHE_TIMEOUT = 600
+
+# Estados que aparecen en un estado de cuenta (los borradores no son documentos fiscales)
+ESTADOS_ESTADO_CUENTA = ['EMITIDA', 'PAGADA', 'ANULADA']
+
+
+def encabezado_empresa(styles):
+    """Elementos de ReportLab con el encabezado común de la empresa."""
+    return [
+        Paragraph(EMPRESA_NOMBRE, styles['Title']),
+        Paragraph(EMPRESA_DATOS, styles['Normal']),
+        Paragraph(EMPRESA_CONTACTO, styles['Normal']),
+        Spacer(1, 12),
+    ]
+
+
+def preparar_datos_factura(factura):
+    """
+    Prepara los datos de una factura para mostrarla (PDF o HTML).
+    Ambos formatos se construyen a partir de este mismo diccionario.
+    """
+    if not factura.cliente:
+        raise ValueError("No se ha asignado un cliente a esta factura")
+
+    cliente = factura.cliente
+    lineas = []
+    subtotal = 0
+    # Si la factura llega con items__producto precargados se usan; si no, una sola consulta
+    if 'items' in getattr(factura, '_prefetched_objects_cache', {}):
+        items = factura.items.all()
+    else:
+        items = factura.items.select_related('producto')
+    for item in items:
+        precio_unitario = item.producto.precio
+        item_subtotal = item.cantidad * precio_unitario
+        subtotal += item_subtotal
+        lineas.append({
+            'descripcion': item.producto.nombre,
+            'cantidad': item.cantidad,
+            'precio_unitario': precio_unitario,
+            'subtotal': item_subtotal,
+        })
+
+    # Calcular IVA y total
+    iva = subtotal * factura.IVA_PORCENTAJE
+    return {
+        'id': factura.id,
+        'numero_factura': factura.numero_factura if factura.numero_factura else f"#{factura.id}",
+        'fecha': factura.fecha,
+        'estado': factura.estado,
+        'estado_display': factura.get_estado_display(),
+        'cliente': {
+            'nombre': cliente.nombre,
+            'email': cliente.email,
+            'telefono': cliente.telefono,
+        },
+        'lineas': lineas,
+        'subtotal': subtotal,
+        'iva': iva,
+        'total': subtotal + iva,
+    }
+
+
+def generar_pdf_factura(datos):
+    """
+    Genera el PDF de una factura a partir de preparar_datos_factura().
+    Retorna el PDF como bytes.
+    """
+    cliente = datos['cliente']
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+
+    # Encabezado de la empresa
+    elements = encabezado_empresa(styles)
+
+    # Información de la factura
+    elements.append(Paragraph(f"Factura {datos['numero_factura']}", styles['Heading2']))
+    elements.append(Paragraph(f"Fecha: {datos['fecha'].strftime('%Y-%m-%d %H:%M')}", styles['Normal']))
+    elements.append(Paragraph(f"Estado: {datos['estado_display']}", styles['Normal']))
+    elements.append(Paragraph(f"Cliente: {cliente['nombre']}", styles['Normal']))
+    elements.append(Paragraph(f"Email: {cliente['email']}", styles['Normal']))
+    if cliente['telefono']:
+        elements.append(Paragraph(f"Teléfono: {cliente['telefono']}", styles['Normal']))
+    elements.append(Spacer(1, 12))
+
+    # Tabla de ítems
+    data = [['Descripción', 'Cantidad', 'Precio Unitario', 'Subtotal']]
+    for linea in datos['lineas']:
+        data.append([
+            linea['descripcion'],
+            str(linea['cantidad']),
+            f"${linea['precio_unitario']:.2f}",
+            f"${linea['subtotal']:.2f}"
+        ])
+    if not datos['lineas']:
+        data.append(['Sin items', '', '', '$0.00'])
+
+    # Filas de totales
+    data.append(['', '', 'Subtotal', f"${datos['subtotal']:.2f}"])
+    data.append(['', '', 'IVA (15%)', f"${datos['iva']:.2f}"])
+    data.append(['', '', 'Total', f"${datos['total']:.2f}"])
+
+    # Crear y estilizar tabla
+    table = Table(data)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -4), colors.beige),
+        ('TEXTCOLOR', (0, 1), (-1, -4), colors.black),
+        ('FONTNAME', (0, 1), (-1, -4), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -4), 10),
+        # Estilo para las filas de totales
+        ('BACKGROUND', (0, -3), (-1, -3), colors.lightgrey),  # Subtotal
+        ('BACKGROUND', (0, -2), (-1, -2), colors.lightgrey),  # IVA
+        ('BACKGROUND', (0, -1), (-1, -1), colors.darkgrey),   # Total
+        ('FONTNAME', (0, -3), (-1, -1), 'Helvetica-Bold'),
+        ('TEXTCOLOR', (0, -1), (-1, -1), colors.whitesmoke),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ]))
+    elements.append(table)
+
+    # Pie de página
+    elements.append(Spacer(1, 12))
+    elements.append(Paragraph("Gracias por su compra. Contáctenos para cualquier consulta.", styles['Normal']))
+
+    # Generar el PDF
+    doc.build(elements)
+    pdf = buffer.getvalue()
+    buffer.close()
+
+    return pdf
+
+
+def version_html_factura(factura):
+    """
+    Versión del fragmento HTML de una factura. Además de la propia factura
+    incluye la última edición del cliente y de los productos de sus ítems
+    (nombre y precio se muestran), de modo que editarlos no sirve un fragmento viejo.
+    Si los ítems no vienen precargados cuesta una sola consulta agregada.
+    """
+    if 'items' in getattr(factura, '_prefetched_objects_cache', {}):
+        productos = max((item.producto.datos_actualizados for item in factura.items.all()), default=None)
+    else:
+        productos = factura.items.aggregate(ultimo=Max('producto__datos_actualizados'))['ultimo']
+    marcas = [factura.cliente.actualizado, productos]
+    marcas = ':'.join(marca.isoformat() if marca else '' for marca in marcas)
+    return f"{factura.estado}:{factura.numero_factura}:{factura.total}:{marcas}"
+
+
+def renderizar_html_factura(factura):
+    """
+    Genera el HTML imprimible de una factura.
+    El cuerpo se guarda como fragmento cacheado (ver version_html_factura); los
+    datos se preparan de forma perezosa, así que un acierto de caché no carga
+    los ítems de la factura.
+    Los borradores no se cachean porque sus ítems todavía pueden cambiar.
+    """
+    if not factura.cliente_id:
+        raise ValueError("No se ha asignado un cliente a esta factura")
+
+    if factura.estado == 'BORRADOR':
+        timeout, version = 0, None
+    else:
+        timeout, version = HTML_FACTURA_CACHE_TIMEOUT, version_html_factura(factura)
+    return render_to_string('facturacion/factura_detalle.html', {
+        'empresa': {
+            'nombre': EMPRESA_NOMBRE,
+            'datos': EMPRESA_DATOS,
+            'contacto': EMPRESA_CONTACTO,
+        },
+        'factura_id': factura.id,
+        'version': version,
+        'cache_timeout': timeout,
+        'datos': SimpleLazyObject(lambda: preparar_datos_factura(factura)),
+    })
+
+
+def rango_periodo(periodo):
+    """
+    Convierte un periodo 'YYYY-MM' en el rango [inicio, fin) de fechas con zona horaria.
+    Lanza ValueError si el formato no es válido.
+    """
+    try:
+        anio, mes = (int(parte) for parte in periodo.split('-'))
+        inicio = datetime(anio, mes, 1)
+    except (AttributeError, ValueError, TypeError):
+        raise ValueError("El periodo debe tener el formato YYYY-MM")
+
+    fin = datetime(anio + 1, 1, 1) if mes == 12 else datetime(anio, mes + 1, 1)
+    zona = timezone.get_current_timezone()
+    return timezone.make_aware(inicio, zona), timezone.make_aware(fin, zona)
+
+
+def periodo_anterior():
+    """Periodo 'YYYY-MM' del mes anterior al actual."""
+    hoy = timezone.localdate()
+    if hoy.month == 1:
+        return f"{hoy.year - 1}-12"
+    return f"{hoy.year}-{hoy.month - 1:02d}"
+
+
+def consultar_estados_cuenta(periodo, cliente_ids=None):
+    """
+    Obtiene los estados de cuenta de un periodo con UNA sola consulta agregada.
+    Retorna una lista de diccionarios (uno por cliente) con sus facturas y totales,
+    lista para generar el PDF sin volver a consultar la base de datos.
+    """
+    inicio, fin = rango_periodo(periodo)
+    facturas = Factura.objects.filter(
+        fecha__gte=inicio,
+        fecha__lt=fin,
+        estado__in=ESTADOS_ESTADO_CUENTA,
+    )
+    if cliente_ids is not None:
+        facturas = facturas.filter(cliente_id__in=cliente_ids)
+
+    filas = facturas.annotate(num_items=Count('items')).order_by(
+        'cliente_id', 'fecha', 'id'
+    ).values(
+        'cliente_id', 'cliente__nombre', 'cliente__email', 'cliente__telefono',
+        'id', 'numero_factura', 'fecha', 'estado', 'subtotal', 'iva', 'total', 'num_items',
+    )
+
+    estados = {}
+    for fila in filas:
+        estado = estados.get(fila['cliente_id'])
+        if estado is None:
+            estado = estados[fila['cliente_id']] = {
+                'periodo': periodo,
+                'cliente': {
+                    'id': fila['cliente_id'],
+                    'nombre': fila['cliente__nombre'],
+                    'email': fila['cliente__email'],
+                    'telefono': fila['cliente__telefono'],
+                },
+                'facturas': [],
+                'totales': {
+                    'subtotal': Decimal('0.00'),
+                    'iva': Decimal('0.00'),
+                    'total': Decimal('0.00'),
+                    'pagado': Decimal('0.00'),
+                    'pendiente': Decimal('0.00'),
+                    'anuladas': 0,
+                },
+            }
+
+        estado['facturas'].append({
+            'id': fila['id'],
+            'numero_factura': fila['numero_factura'] or f"#{fila['id']}",
+            'fecha': fila['fecha'],
+            'estado': fila['estado'],
+            'num_items': fila['num_items'],
+            'subtotal': fila['subtotal'],
+            'iva': fila['iva'],
+            'total': fila['total'],
+        })
+
+        # Las facturas anuladas se listan pero no suman al saldo
+        totales = estado['totales']
+        if fila['estado'] == 'ANULADA':
+            totales['anuladas'] += 1
+            continue
+        totales['subtotal'] += fila['subtotal']
+        totales['iva'] += fila['iva']
+        totales['total'] += fila['total']
+        if fila['estado'] == 'PAGADA':
+            totales['pagado'] += fila['total']
+        else:
+            totales['pendiente'] += fila['total']
+
+    return list(estados.values())
+
+
+def nombre_archivo_estado_cuenta(estado_cuenta):
+    return f"estado_cuenta_{estado_cuenta['cliente']['id']}_{estado_cuenta['periodo']}.pdf"
+
+
+def generar_pdf_estado_cuenta(estado_cuenta):
+    """
+    Genera el PDF del estado de cuenta de un cliente.
+    Solo trabaja sobre los datos ya consultados (no accede a la base de datos),
+    por lo que puede ejecutarse en procesos separados.
+    """
+    cliente = estado_cuenta['cliente']
+    totales = estado_cuenta['totales']
+    etiquetas_estado = dict(Factura.ESTADOS)
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    elements = encabezado_empresa(styles)
+
+    # Información del estado de cuenta
+    elements.append(Paragraph(f"Estado de cuenta {estado_cuenta['periodo']}", styles['Heading2']))
+    elements.append(Paragraph(f"Cliente: {cliente['nombre']}", styles['Normal']))
+    elements.append(Paragraph(f"Email: {cliente['email']}", styles['Normal']))
+    if cliente['telefono']:
+        elements.append(Paragraph(f"Teléfono: {cliente['telefono']}", styles['Normal']))
+    elements.append(Spacer(1, 12))
+
+    # Tabla de facturas
+    data = [['Factura', 'Fecha', 'Estado', 'Ítems', 'Subtotal', 'IVA', 'Total']]
+    for factura in estado_cuenta['facturas']:
+        data.append([
+            factura['numero_factura'],
+            timezone.localtime(factura['fecha']).strftime('%Y-%m-%d'),
+            etiquetas_estado.get(factura['estado'], factura['estado']),
+            str(factura['num_items']),
+            f"${factura['subtotal']:.2f}",
+            f"${factura['iva']:.2f}",
+            f"${factura['total']:.2f}",
+        ])
+
+    # Filas de totales
+    data.append(['', '', '', '', '', 'Subtotal', f"${totales['subtotal']:.2f}"])
+    data.append(['', '', '', '', '', 'IVA (15%)', f"${totales['iva']:.2f}"])
+    data.append(['', '', '', '', '', 'Total', f"${totales['total']:.2f}"])
+    data.append(['', '', '', '', '', 'Pagado', f"${totales['pagado']:.2f}"])
+    data.append(['', '', '', '', '', 'Pendiente', f"${totales['pendiente']:.2f}"])
+
+    table = Table(data, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('BACKGROUND', (0, 1), (-1, -6), colors.beige),
+        # Estilo para las filas de totales
+        ('BACKGROUND', (0, -5), (-1, -1), colors.lightgrey),
+        ('BACKGROUND', (0, -1), (-1, -1), colors.darkgrey),
+        ('FONTNAME', (0, -5), (-1, -1), 'Helvetica-Bold'),
+        ('TEXTCOLOR', (0, -1), (-1, -1), colors.whitesmoke),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ]))
+    elements.append(table)
+
+    elements.append(Spacer(1, 12))
+    if totales['anuladas']:
+        elements.append(Paragraph(
+            f"Facturas anuladas en el periodo: {totales['anuladas']} (no suman al saldo).",
+            styles['Normal']
+        ))
+    elements.append(Paragraph("Gracias por su preferencia. Contáctenos para cualquier consulta.", styles['Normal']))
+
+    doc.build(elements)
+    pdf = buffer.getvalue()
+    buffer.close()
+
+    return pdf
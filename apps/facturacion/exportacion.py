@@ -0,0 +1,105 @@
+"""
+Exportación de facturas en NDJSON o CSV, generada fila a fila.
+
+Las facturas se leen por bloques keyset sobre (fecha, id), con el índice
+factura_fecha_id_idx, y los ítems de cada bloque se precargan con él. Cada bloque
+es una consulta acotada: a diferencia de .iterator(), que en MySQL trae el
+resultado completo al cliente, la memoria usada no depende del número de
+facturas exportadas y la respuesta puede enviarse mientras se consulta.
+"""
+
+import csv
+import json
+
+from facturacion_segura.paginacion import recorrer_por_bloques
+
+EXPORTACION_CHUNK = 500
+
+COLUMNAS_CSV = [
+    'factura_id', 'numero_factura', 'fecha', 'estado', 'cliente_id', 'cliente',
+    'cliente_email', 'creador_id', 'subtotal', 'iva', 'total',
+    'producto_id', 'producto', 'cantidad', 'precio_unitario', 'subtotal_linea',
+]
+
+
+def facturas_exportacion(queryset, chunk_size=EXPORTACION_CHUNK):
+    """
+    Itera las facturas del queryset en orden de (fecha, id), con cliente e
+    items__producto precargados, leyendo bloques de `chunk_size` a continuación
+    de la última factura del bloque anterior.
+    """
+    queryset = queryset.select_related('cliente').prefetch_related('items__producto')
+    return recorrer_por_bloques(queryset, ('fecha', 'id'), chunk_size)
+
+
+def _factura_a_dict(factura):
+    return {
+        'id': factura.id,
+        'numero_factura': factura.numero_factura,
+        'fecha': factura.fecha.isoformat(),
+        'estado': factura.estado,
+        'cliente': {
+            'id': factura.cliente_id,
+            'nombre': factura.cliente.nombre,
+            'email': factura.cliente.email,
+        },
+        'creador': factura.creador_id,
+        'subtotal': str(factura.subtotal),
+        'iva': str(factura.iva),
+        'total': str(factura.total),
+        'items': [
+            {
+                'producto_id': item.producto_id,
+                'producto': item.producto.nombre,
+                'cantidad': item.cantidad,
+                'precio_unitario': str(item.producto.precio),
+                'subtotal': str(item.cantidad * item.producto.precio),
+            }
+            for item in factura.items.all()
+        ],
+    }
+
+
+def generar_ndjson(facturas):
+    """Una línea JSON por factura, con sus ítems anidados."""
+    for factura in facturas:
+        yield json.dumps(_factura_a_dict(factura), ensure_ascii=False) + '\n'
+
+
+class _Eco:
+    """Pseudo-archivo para csv.writer: devuelve la línea en lugar de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def filas_csv(factura):
+    """Filas CSV de una factura: una por ítem (o una sin ítem si no tiene)."""
+    datos = _factura_a_dict(factura)
+    comunes = [
+        datos['id'], datos['numero_factura'] or '', datos['fecha'], datos['estado'],
+        datos['cliente']['id'], datos['cliente']['nombre'], datos['cliente']['email'],
+        datos['creador'], datos['subtotal'], datos['iva'], datos['total'],
+    ]
+    if not datos['items']:
+        yield comunes + [''] * 5
+    for item in datos['items']:
+        yield comunes + [
+            item['producto_id'], item['producto'], item['cantidad'],
+            item['precio_unitario'], item['subtotal'],
+        ]
+
+
+def generar_csv(facturas):
+    """CSV con una fila por ítem de factura; el encabezado se emite de inmediato."""
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(COLUMNAS_CSV)
+    for factura in facturas:
+        for fila in filas_csv(factura):
+            yield escritor.writerow(fila)
+
+
+FORMATOS_EXPORTACION = {
+    'ndjson': (generar_ndjson, 'application/x-ndjson', 'ndjson'),
+    'csv': (generar_csv, 'text/csv; charset=utf-8', 'csv'),
+}
@@ -0,0 +1,62 @@
+"""
+Filtros del listado de facturas (/api/facturas/).
+
+Cada filtro se traduce a condiciones que aprovechan un índice:
+- estado, cliente, creador: igualdad sobre la primera columna de los índices
+  compuestos (estado, fecha), (cliente, fecha) y (creador, fecha), que además
+  sirven al orden por fecha de la paginación.
+- fecha_desde / fecha_hasta: rango sobre factura_fecha_id_idx.
+- numero: prefijo de numero_factura como rango [prefijo, siguiente) sobre su
+  índice único, en vez de LIKE (SQLite no usa índices con LIKE ... ESCAPE).
+"""
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from facturacion_segura.filtros import parametro_entero, parametro_fin_dia, parametro_inicio_dia
+
+from .models import Factura
+
+
+def _siguiente_prefijo(prefijo):
+    """Menor cadena mayor que todas las que empiezan por `prefijo`."""
+    return prefijo[:-1] + chr(ord(prefijo[-1]) + 1)
+
+
+def filtrar_facturas(queryset, parametros):
+    """Aplica los filtros presentes en `parametros` (query params) al queryset."""
+    if parametros.get('estado'):
+        estado = parametros['estado'].upper()
+        if estado not in dict(Factura.ESTADOS):
+            raise ValidationError({'estado': f"Estado no válido: {parametros['estado']}"})
+        queryset = queryset.filter(estado=estado)
+
+    if parametros.get('cliente'):
+        queryset = queryset.filter(cliente_id=parametro_entero(parametros, 'cliente'))
+
+    if parametros.get('creador'):
+        queryset = queryset.filter(creador_id=parametro_entero(parametros, 'creador'))
+
+    if parametros.get('fecha_desde'):
+        queryset = queryset.filter(fecha__gte=parametro_inicio_dia(parametros, 'fecha_desde'))
+
+    if parametros.get('fecha_hasta'):
+        queryset = queryset.filter(fecha__lt=parametro_fin_dia(parametros, 'fecha_hasta'))
+
+    prefijo = parametros.get('numero', '').strip()
+    if prefijo:
+        queryset = queryset.filter(
+            numero_factura__gte=prefijo,
+            numero_factura__lt=_siguiente_prefijo(prefijo),
+        )
+
+    return queryset
+
+
+class FiltroFacturas(BaseFilterBackend):
+    """Backend de filtros de FacturaViewSet. Solo se aplica al listado."""
+
+    def filter_queryset(self, request, queryset, view):
+        if getattr(view, 'action', None) != 'list':
+            return queryset
+        return filtrar_facturas(queryset, request.query_params)
@@ -0,0 +1,55 @@
+from datetime import date
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.facturacion.correo import seleccionar_facturas_envio
+from apps.facturacion.models import CorreoPendiente
+from apps.facturacion.outbox import encolar_facturas
+
+
+class Command(BaseCommand):
+    help = (
+        "Encola en la bandeja de salida el PDF de muchas facturas (p. ej. todas las EMITIDAS "
+        "del día) y procesa la bandeja una vez, reutilizando la conexión SMTP por lote. "
+        "Las facturas ya encoladas o enviadas se omiten, así que repetir el comando no reenvía."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', help="Lista de IDs separados por comas")
+        parser.add_argument('--fecha', help="Día de las facturas (YYYY-MM-DD). Por defecto hoy")
+        parser.add_argument('--estado', help="EMITIDA o PAGADA (por defecto EMITIDA)")
+        parser.add_argument('--lote', type=int, default=50,
+                            help="Correos reclamados por lote al procesar la bandeja")
+        parser.add_argument('--reenviar', action='store_true',
+                            help="Encolar también las facturas ya encoladas o enviadas")
+        parser.add_argument('--solo-encolar', action='store_true',
+                            help="No procesar la bandeja (la envía el worker procesar_correos)")
+
+    def handle(self, *args, **options):
+        try:
+            ids = [int(i) for i in options['ids'].split(',')] if options['ids'] else None
+            fecha = date.fromisoformat(options['fecha']) if options['fecha'] else None
+        except ValueError:
+            raise CommandError("--ids debe ser una lista de enteros y --fecha tener formato YYYY-MM-DD")
+        if not ids and not fecha:
+            fecha = timezone.localdate()
+
+        try:
+            facturas = seleccionar_facturas_envio(ids=ids, fecha=fecha, estado=options['estado'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if not options['reenviar']:
+            # Un correo fallido sí se vuelve a encolar; pendientes y enviados no
+            registrados = CorreoPendiente.objects.filter(
+                tipo='FACTURA', estado__in=['PENDIENTE', 'ENVIANDO', 'ENVIADO']
+            ).values('factura_id')
+            facturas = facturas.exclude(id__in=registrados)
+
+        encolados = encolar_facturas(facturas.prefetch_related(None))
+        self.stdout.write(f"{encolados} factura(s) encolada(s) para envío")
+
+        if not options['solo_encolar']:
+            call_command('procesar_correos', una_vez=True, lote=options['lote'], stdout=self.stdout)
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.facturacion.contabilidad import directorio_exportacion, exportar_contabilidad
+from apps.facturacion.documentos import periodo_anterior
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta encabezados y líneas de facturas a CSV comprimidos por día con un manifest. "
+        "Es incremental: solo reescribe los días que cambiaron desde la última exportación."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--periodo', action='append', dest='periodos',
+                            help="Periodo YYYY-MM (puede repetirse). Por defecto el mes anterior y el actual")
+        parser.add_argument('--salida', help="Directorio de la exportación (por defecto settings.CONTABILIDAD_DIR)")
+        parser.add_argument('--forzar', action='store_true',
+                            help="Reescribir todos los días aunque no hayan cambiado")
+
+    def handle(self, *args, **options):
+        salida = directorio_exportacion(options['salida'])
+        periodos = options['periodos'] or [periodo_anterior(), timezone.localdate().strftime('%Y-%m')]
+        for periodo in periodos:
+            inicio = time.monotonic()
+            try:
+                resumen = exportar_contabilidad(periodo, directorio=salida, forzar=options['forzar'])
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(
+                f"{periodo}: {len(resumen['escritos'])} día(s) escritos, "
+                f"{len(resumen['sin_cambios'])} sin cambios, {len(resumen['eliminados'])} eliminados "
+                f"en {time.monotonic() - inicio:.2f}s ({salida})"
+            ))
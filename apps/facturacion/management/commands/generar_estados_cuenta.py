@@ -0,0 +1,97 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import django
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from apps.facturacion.correo import construir_correo_estado_cuenta
+from apps.facturacion.documentos import (
+    consultar_estados_cuenta, generar_pdf_estado_cuenta,
+    nombre_archivo_estado_cuenta, periodo_anterior,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera los estados de cuenta mensuales de todos los clientes (o de los indicados) "
+        "repartiendo la generación de PDFs entre varios procesos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--periodo', help="Periodo YYYY-MM (por defecto el mes anterior)")
+        parser.add_argument('--cliente', type=int, action='append', dest='clientes',
+                            help="ID de cliente (puede repetirse). Por defecto todos")
+        parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1,
+                            help="Número de procesos para generar los PDFs")
+        parser.add_argument('--salida', help="Directorio donde guardar los PDFs generados")
+        parser.add_argument('--enviar', action='store_true',
+                            help="Enviar cada estado de cuenta al correo del cliente")
+        parser.add_argument('--lote-correo', type=int, default=50,
+                            help="Número de correos enviados por lote en la misma conexión SMTP")
+
+    def handle(self, *args, **options):
+        periodo = options['periodo'] or periodo_anterior()
+        salida = Path(options['salida']) if options['salida'] else None
+        if not salida and not options['enviar']:
+            raise CommandError("Indique --salida, --enviar o ambos")
+
+        inicio = time.monotonic()
+        try:
+            # Una sola consulta agregada para todos los clientes del periodo
+            estados = consultar_estados_cuenta(periodo, cliente_ids=options['clientes'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if not estados:
+            self.stdout.write(f"No hay facturas en el periodo {periodo}")
+            return
+
+        if salida:
+            salida.mkdir(parents=True, exist_ok=True)
+
+        procesos = max(1, min(options['procesos'], len(estados)))
+        pendientes = []
+        enviados = 0
+        for estado, pdf in self._generar_pdfs(estados, procesos):
+            if salida:
+                (salida / nombre_archivo_estado_cuenta(estado)).write_bytes(pdf)
+            if options['enviar']:
+                pendientes.append((estado, pdf))
+                if len(pendientes) >= options['lote_correo']:
+                    enviados += self._enviar(pendientes)
+                    pendientes = []
+        if pendientes:
+            enviados += self._enviar(pendientes)
+
+        duracion = time.monotonic() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(estados)} estado(s) de cuenta del periodo {periodo} generados "
+            f"en {duracion:.2f}s con {procesos} proceso(s); {enviados} correo(s) enviados"
+        ))
+
+    def _generar_pdfs(self, estados, procesos):
+        """Genera los PDFs en orden, en paralelo cuando hay más de un proceso."""
+        if procesos == 1:
+            for estado in estados:
+                yield estado, generar_pdf_estado_cuenta(estado)
+            return
+
+        # Los procesos hijos no usan la base de datos: solo reciben los datos ya consultados.
+        # Se cierran las conexiones para no compartir sockets abiertos con los hijos.
+        connections.close_all()
+        chunksize = max(1, len(estados) // (procesos * 4))
+        with ProcessPoolExecutor(max_workers=procesos, initializer=django.setup) as executor:
+            yield from zip(estados, executor.map(generar_pdf_estado_cuenta, estados, chunksize=chunksize))
+
+    def _enviar(self, pendientes):
+        """Envía un lote de estados de cuenta reutilizando una sola conexión SMTP."""
+        with get_connection() as connection:
+            mensajes = [
+                construir_correo_estado_cuenta(estado, pdf, connection=connection)
+                for estado, pdf in pendientes
+            ]
+            return connection.send_messages(mensajes) or 0
@@ -0,0 +1,61 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.facturacion.outbox import CircuitBreaker, procesar_lote
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker de la bandeja de salida: reclama correos pendientes, genera sus PDFs "
+        "y los envía reutilizando una conexión SMTP por lote."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=50, help="Correos reclamados por lote")
+        parser.add_argument('--intervalo', type=float, default=5,
+                            help="Segundos de espera cuando no hay correos pendientes")
+        parser.add_argument('--una-vez', action='store_true',
+                            help="Procesar lo pendiente y terminar (útil para cron y pruebas)")
+
+    def handle(self, *args, **options):
+        self._detener = False
+        if not options['una_vez']:
+            signal.signal(signal.SIGTERM, self._solicitar_detencion)
+            signal.signal(signal.SIGINT, self._solicitar_detencion)
+
+        breaker = CircuitBreaker()
+        inicio = time.monotonic()
+        totales = {'enviados': 0, 'fallidos': 0, 'reprogramados': 0}
+
+        while not self._detener:
+            if not breaker.permite():
+                if options['una_vez']:
+                    break
+                time.sleep(min(breaker.segundos_para_reintentar(), options['intervalo']))
+                continue
+
+            resultado = procesar_lote(options['lote'], breaker=breaker)
+            for clave in totales:
+                totales[clave] += resultado[clave]
+            if resultado['reclamados']:
+                self.stdout.write(
+                    f"Lote: {resultado['enviados']} enviado(s), {resultado['fallidos']} fallido(s), "
+                    f"{resultado['reprogramados']} reprogramado(s) [circuito {breaker.estado}]"
+                )
+                continue
+
+            if options['una_vez']:
+                break
+            time.sleep(options['intervalo'])
+
+        duracion = time.monotonic() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"Total: {totales['enviados']} enviado(s), {totales['fallidos']} fallido(s), "
+            f"{totales['reprogramados']} reprogramado(s) en {duracion:.2f}s "
+            f"({totales['enviados'] / duracion if duracion else 0:.1f} msg/s)"
+        ))
+
+    def _solicitar_detencion(self, signum, frame):
+        self._detener = True
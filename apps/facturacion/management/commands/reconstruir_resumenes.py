@@ -0,0 +1,31 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.facturacion.resumenes import reconstruir
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula los resúmenes diarios de ventas (por estado, producto, cliente y creador) "
+        "a partir de las facturas. Útil para la carga inicial o tras cambios masivos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help="Primer día YYYY-MM-DD (por defecto desde el inicio)")
+        parser.add_argument('--hasta', help="Último día YYYY-MM-DD (por defecto hasta hoy)")
+
+    def handle(self, *args, **options):
+        try:
+            desde = date.fromisoformat(options['desde']) if options['desde'] else None
+            hasta = date.fromisoformat(options['hasta']) if options['hasta'] else None
+        except ValueError:
+            raise CommandError("Las fechas deben tener el formato YYYY-MM-DD")
+
+        inicio = time.monotonic()
+        creadas = reconstruir(desde, hasta)
+        detalle = ", ".join(f"{cantidad} por {tabla}" for tabla, cantidad in creadas.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Resúmenes reconstruidos en {time.monotonic() - inicio:.2f}s: {detalle}"
+        ))
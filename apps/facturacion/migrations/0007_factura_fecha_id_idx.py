@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facturacion', '0006_correopendiente'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='factura',
+            index=models.Index(fields=['fecha', 'id'], name='factura_fecha_id_idx'),
+        ),
+    ]
@@ -1,7 +1,9 @@
 from django.db import models, transaction
 from django.conf import settings
+from django.utils import timezone
 from apps.productos.models import Producto
 from apps.clientes.models import Cliente
+from apps.usuarios.politicas import es_creador_o_administrador
 from decimal import Decimal
 
 class Factura(models.Model):
@@ -14,6 +16,15 @@ class Factura(models.Model):
     
     # Constante para el IVA del 15%
     IVA_PORCENTAJE = Decimal('0.15')
+
+    # Estados que cuentan en los resúmenes diarios (los borradores no son ventas)
+    ESTADOS_RESUMIDOS = ('EMITIDA', 'PAGADA', 'ANULADA')
+    # Estados que suman ingresos por producto, cliente y vendedor
+    ESTADOS_VENTA = ('EMITIDA', 'PAGADA')
+    # Campos que definen el aporte de la factura a los resúmenes
+    _CAMPOS_RESUMEN = ('estado', 'fecha', 'total', 'cliente_id', 'creador_id')
+    _SIN_CARGAR = object()
+    _resumen_anterior = None
     
     creador = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE)
@@ -27,9 +38,56 @@ class Factura(models.Model):
     iva = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
+    # Última modificación (la exportación contable detecta con él los días que cambiaron)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Soporta el orden estable y la paginación keyset del listado por (fecha, id)
+            models.Index(fields=['fecha', 'id'], name='factura_fecha_id_idx'),
+            # Filtros del listado (ver filtros.py); en InnoDB cada índice secundario
+            # incluye el id al final, así que también cubren el desempate del orden
+            models.Index(fields=['estado', 'fecha'], name='factura_estado_fecha_idx'),
+            models.Index(fields=['cliente', 'fecha'], name='factura_cliente_fecha_idx'),
+            models.Index(fields=['creador', 'fecha'], name='factura_creador_fecha_idx'),
+        ]
+
     def __str__(self):
         return f"Factura #{self.id} - {'Anulada' if self.anulada else 'Activa'}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        factura = super().from_db(db, field_names, values)
+        factura._recordar_resumen()
+        return factura
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._recordar_resumen()
+
+    def _recordar_resumen(self):
+        """Guarda el aporte a los resúmenes tal como está en la base de datos"""
+        if set(self._CAMPOS_RESUMEN) & self.get_deferred_fields():
+            # Cargada con only()/defer(): se consulta solo si llega a guardarse
+            self._resumen_anterior = self._SIN_CARGAR
+        else:
+            self._resumen_anterior = self.foto_resumen()
+
+    def foto_resumen(self):
+        """
+        Aporte de la factura a los resúmenes diarios:
+        (estado, día, total, cliente, creador), o None si no cuenta (borrador).
+        """
+        if self.estado not in self.ESTADOS_RESUMIDOS:
+            return None
+        return (self.estado, timezone.localdate(self.fecha), self.total, self.cliente_id, self.creador_id)
+
+    def _foto_resumen_anterior(self):
+        if self._resumen_anterior is not self._SIN_CARGAR:
+            return self._resumen_anterior
+        guardada = Factura.objects.filter(pk=self.pk).only(*self._CAMPOS_RESUMEN).first()
+        return guardada.foto_resumen() if guardada else None
+
     def calcular_totales(self):
         """
         Calcula el subtotal, IVA y total de la factura basado en los items.
@@ -53,7 +111,22 @@ class Factura(models.Model):
         # Si la factura ya existe, recalcular totales
         if self.pk:
             self.calcular_totales()
-        super().save(*args, **kwargs)
+
+        anterior = self._foto_resumen_anterior() if self.pk else None
+        if anterior is None and self.estado not in self.ESTADOS_RESUMIDOS:
+            # Borrador que sigue siendo borrador: no afecta los resúmenes
+            super().save(*args, **kwargs)
+            return
+
+        from .resumenes import aplicar_cambio
+        from . import compras_conjuntas
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            actual = self.foto_resumen()
+            if actual != anterior:
+                aplicar_cambio(self, anterior, actual)
+                compras_conjuntas.aplicar_cambio(self, anterior, actual)
+        self._resumen_anterior = actual
 
     def puede_editar(self):
         """Una factura solo puede editarse si está en estado BORRADOR"""
@@ -71,13 +144,7 @@ class Factura(models.Model):
         if not self.puede_editar():
             return False
         
-        if user.is_superuser:
-            return True
-        if user.role == 'Administrador':
-            return True
-        if self.creador == user:
-            return True
-        return False
+        return es_creador_o_administrador(user, self.creador_id)
     
     def puede_anular(self):
         """Una factura puede anularse si está EMITIDA o PAGADA"""
@@ -95,13 +162,7 @@ class Factura(models.Model):
         if not self.puede_anular():
             return False
         
-        if user.is_superuser:
-            return True
-        if user.role == 'Administrador':
-            return True
-        if self.creador == user:
-            return True
-        return False
+        return es_creador_o_administrador(user, self.creador_id)
     
     def emitir(self):
         """Cambiar estado a EMITIDA y generar número de factura"""
@@ -149,19 +210,15 @@ class Factura(models.Model):
         - Un usuario con rol Administrador
         - Superusuarios
         """
-        if user.is_superuser:
-            return True
-        if user.role == 'Administrador':
-            return True
-        if self.creador == user:
-            return True
-        return False
+        return es_creador_o_administrador(user, self.creador_id)
     
     def delete(self, *args, **kwargs):
         """
         Al eliminar una factura, restituir automáticamente el stock de todos los items.
         Solo se pueden eliminar facturas en estado BORRADOR.
         """
+        from .resumenes import aplicar_cambio
+        from . import compras_conjuntas
         with transaction.atomic():
             # Restituir stock de todos los items antes de eliminar
             for item in self.items.all():
@@ -169,6 +226,12 @@ class Factura(models.Model):
                     producto = item.producto
                     producto.stock += item.cantidad
                     producto.save()
+
+            # Descontar la factura de los resúmenes y las compras conjuntas mientras sus ítems existen
+            anterior = self._foto_resumen_anterior()
+            if anterior is not None:
+                aplicar_cambio(self, anterior, None)
+                compras_conjuntas.aplicar_cambio(self, anterior, None)
             
             # Eliminar la factura (esto eliminará los items automáticamente por CASCADE)
             super().delete(*args, **kwargs)
@@ -227,4 +290,109 @@ class FacturaItem(models.Model):
             
             # Recalcular totales de la factura después de eliminar el item
             factura.calcular_totales()
-            factura.save()
\ No newline at end of file
+            factura.save()
+
+class CorreoPendiente(models.Model):
+    """
+    Bandeja de salida de correos de facturación.
+    Las vistas solo encolan; el comando procesar_correos genera los PDFs y los envía.
+    """
+    TIPOS = [
+        ('FACTURA', 'Factura'),
+        ('ESTADO_CUENTA', 'Estado de cuenta'),
+    ]
+    ESTADOS = [
+        ('PENDIENTE', 'Pendiente'),
+        ('ENVIANDO', 'Enviando'),
+        ('ENVIADO', 'Enviado'),
+        ('FALLIDO', 'Fallido'),
+    ]
+
+    tipo = models.CharField(max_length=20, choices=TIPOS, default='FACTURA')
+    factura = models.ForeignKey(Factura, related_name='correos', on_delete=models.CASCADE, null=True, blank=True)
+    parametros = models.JSONField(default=dict, blank=True)
+    destinatario = models.EmailField()
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='PENDIENTE')
+    intentos = models.PositiveIntegerField(default=0)
+    # Siguiente momento en que el correo puede reclamarse (reintento o fin del bloqueo)
+    proximo_intento = models.DateTimeField(default=timezone.now)
+    ultimo_error = models.TextField(blank=True)
+    solicitado_por = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    creado = models.DateTimeField(auto_now_add=True)
+    enviado = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'proximo_intento'], name='correo_estado_proximo_idx'),
+        ]
+
+    def __str__(self):
+        return f"Correo {self.get_tipo_display()} a {self.destinatario} ({self.get_estado_display()})"
+
+
+class ResumenDiarioEstado(models.Model):
+    """
+    Facturas por día y estado (sin borradores). Se mantiene de forma incremental
+    al emitir, pagar, anular o eliminar facturas (ver resumenes.py).
+    """
+    dia = models.DateField()
+    estado = models.CharField(max_length=20, choices=Factura.ESTADOS)
+    facturas = models.IntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dia', 'estado'], name='resumen_estado_dia_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.dia} {self.estado}: {self.facturas}"
+
+
+class ResumenDiarioProducto(models.Model):
+    """Unidades e ingresos (sin IVA) por día y producto de las facturas emitidas o pagadas"""
+    dia = models.DateField()
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE)
+    cantidad = models.IntegerField(default=0)
+    facturas = models.IntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dia', 'producto'], name='resumen_producto_dia_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.dia} producto {self.producto_id}: {self.total}"
+
+
+class ResumenDiarioCliente(models.Model):
+    """Facturas e ingresos (con IVA) por día y cliente de las facturas emitidas o pagadas"""
+    dia = models.DateField()
+    cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE)
+    facturas = models.IntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dia', 'cliente'], name='resumen_cliente_dia_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.dia} cliente {self.cliente_id}: {self.total}"
+
+
+class ResumenDiarioCreador(models.Model):
+    """Facturas e ingresos (con IVA) por día y usuario que creó la factura"""
+    dia = models.DateField()
+    creador = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    facturas = models.IntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dia', 'creador'], name='resumen_creador_dia_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.dia} creador {self.creador_id}: {self.total}"
@@ -0,0 +1,291 @@
+"""
+Bandeja de salida (outbox) de correos de facturación.
+
+Las vistas encolan filas en CorreoPendiente y responden de inmediato.
+El comando procesar_correos reclama lotes con SELECT ... FOR UPDATE SKIP LOCKED
+(varios workers pueden ejecutarse a la vez sin tomar las mismas filas),
+envía cada lote por una sola conexión SMTP y reprograma los fallos con
+backoff exponencial. Un circuit breaker deja de intentar mientras el
+servidor de correo está caído.
+"""
+
+import logging
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .correo import construir_correo_factura, construir_correo_estado_cuenta
+from .documentos import (
+    preparar_datos_factura, generar_pdf_factura,
+    consultar_estados_cuenta, generar_pdf_estado_cuenta,
+)
+from .models import CorreoPendiente, Factura
+
+logger = logging.getLogger(__name__)
+
+# Configuración (puede sobrescribirse en settings)
+OUTBOX_MAX_INTENTOS = getattr(settings, 'OUTBOX_MAX_INTENTOS', 5)
+OUTBOX_BACKOFF_BASE = getattr(settings, 'OUTBOX_BACKOFF_BASE', 30)        # segundos
+OUTBOX_BACKOFF_MAXIMO = getattr(settings, 'OUTBOX_BACKOFF_MAXIMO', 3600)  # segundos
+OUTBOX_BLOQUEO = getattr(settings, 'OUTBOX_BLOQUEO', 300)                 # segundos que dura el reclamo
+OUTBOX_UMBRAL_FALLOS = getattr(settings, 'OUTBOX_UMBRAL_FALLOS', 5)
+OUTBOX_ESPERA_CIRCUITO = getattr(settings, 'OUTBOX_ESPERA_CIRCUITO', 60)  # segundos
+
+
+class ErrorPermanente(Exception):
+    """Error que no se soluciona reintentando (p. ej. la factura ya no tiene cliente)."""
+
+
+def encolar_factura(factura, usuario=None):
+    """Encola el envío del PDF de una factura al correo de su cliente."""
+    if not factura.cliente_id:
+        raise ValueError("No se ha asignado un cliente a esta factura")
+    return CorreoPendiente.objects.create(
+        tipo='FACTURA',
+        factura=factura,
+        destinatario=factura.cliente.email,
+        solicitado_por=usuario,
+    )
+
+
+def encolar_facturas(facturas, usuario=None):
+    """Encola el envío de varias facturas con un solo INSERT. Retorna cuántas se encolaron."""
+    correos = [
+        CorreoPendiente(
+            tipo='FACTURA',
+            factura=factura,
+            destinatario=factura.cliente.email,
+            solicitado_por=usuario,
+        )
+        for factura in facturas
+        if factura.cliente_id and factura.cliente.email
+    ]
+    CorreoPendiente.objects.bulk_create(correos, batch_size=500)
+    return len(correos)
+
+
+def encolar_estado_cuenta(estado_cuenta, usuario=None):
+    """Encola el envío de un estado de cuenta ya consultado."""
+    return CorreoPendiente.objects.create(
+        tipo='ESTADO_CUENTA',
+        parametros={
+            'cliente': estado_cuenta['cliente']['id'],
+            'periodo': estado_cuenta['periodo'],
+        },
+        destinatario=estado_cuenta['cliente']['email'],
+        solicitado_por=usuario,
+    )
+
+
+def calcular_backoff(intentos):
+    """Segundos de espera antes del siguiente intento (exponencial con jitter)."""
+    espera = min(OUTBOX_BACKOFF_BASE * (2 ** max(intentos - 1, 0)), OUTBOX_BACKOFF_MAXIMO)
+    return espera * random.uniform(0.9, 1.1)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker simple para el servidor SMTP.
+    - cerrado: se envía normalmente.
+    - abierto: tras `umbral` fallos seguidos no se envía nada durante `espera` segundos.
+    - semiabierto: pasada la espera se permite un intento; si funciona se cierra.
+    """
+
+    def __init__(self, umbral=OUTBOX_UMBRAL_FALLOS, espera=OUTBOX_ESPERA_CIRCUITO, reloj=time.monotonic):
+        self.umbral = umbral
+        self.espera = espera
+        self.reloj = reloj
+        self.fallos = 0
+        self.abierto_desde = None
+
+    @property
+    def estado(self):
+        if self.abierto_desde is None:
+            return 'cerrado'
+        if self.reloj() - self.abierto_desde >= self.espera:
+            return 'semiabierto'
+        return 'abierto'
+
+    def permite(self):
+        return self.estado != 'abierto'
+
+    def segundos_para_reintentar(self):
+        if self.abierto_desde is None:
+            return 0
+        return max(0, self.espera - (self.reloj() - self.abierto_desde))
+
+    def registrar_exito(self):
+        self.fallos = 0
+        self.abierto_desde = None
+
+    def registrar_fallo(self):
+        self.fallos += 1
+        estado = self.estado
+        if estado == 'semiabierto' or self.fallos >= self.umbral:
+            if estado != 'abierto':
+                logger.warning("Circuit breaker SMTP abierto tras %s fallo(s)", self.fallos)
+            self.abierto_desde = self.reloj()
+
+
+def reclamar_lote(tamano):
+    """
+    Reclama hasta `tamano` correos listos para enviarse.
+    Las filas reclamadas pasan a ENVIANDO con un bloqueo de OUTBOX_BLOQUEO segundos:
+    si el worker muere, vuelven a estar disponibles al vencer el bloqueo.
+    El intento se cuenta al reclamar, de modo que un correo que tumba al worker
+    también agota sus intentos: al vencer su último bloqueo queda FALLIDO.
+    """
+    ahora = timezone.now()
+    with transaction.atomic():
+        filas = list(
+            CorreoPendiente.objects.select_for_update(skip_locked=True).filter(
+                estado__in=['PENDIENTE', 'ENVIANDO'],
+                proximo_intento__lte=ahora,
+            ).order_by('proximo_intento', 'id').values_list('id', 'estado', 'intentos')[:tamano]
+        )
+        agotados = [
+            id_ for id_, estado, intentos in filas
+            if estado == 'ENVIANDO' and intentos >= OUTBOX_MAX_INTENTOS
+        ]
+        ids = [id_ for id_, _, _ in filas if id_ not in agotados]
+        if agotados:
+            CorreoPendiente.objects.filter(id__in=agotados).update(
+                estado='FALLIDO',
+                ultimo_error='El worker terminó sin completar el envío en todos los intentos',
+            )
+        if ids:
+            CorreoPendiente.objects.filter(id__in=ids).update(
+                estado='ENVIANDO',
+                intentos=F('intentos') + 1,
+                proximo_intento=ahora + timedelta(seconds=OUTBOX_BLOQUEO),
+            )
+    return list(CorreoPendiente.objects.filter(id__in=ids).order_by('id'))
+
+
+def construir_mensaje(correo, connection=None):
+    """Genera el PDF y arma el EmailMessage correspondiente a un correo encolado."""
+    if correo.tipo == 'FACTURA':
+        factura = Factura.objects.select_related('cliente').filter(pk=correo.factura_id).first()
+        if factura is None:
+            raise ErrorPermanente("La factura ya no existe")
+        try:
+            pdf = generar_pdf_factura(preparar_datos_factura(factura))
+        except ValueError as e:
+            raise ErrorPermanente(str(e))
+        mensaje = construir_correo_factura(factura, pdf, connection=connection)
+    else:
+        try:
+            estados = consultar_estados_cuenta(
+                correo.parametros['periodo'], cliente_ids=[correo.parametros['cliente']]
+            )
+        except (KeyError, ValueError) as e:
+            raise ErrorPermanente(f"Parámetros inválidos: {e}")
+        if not estados:
+            raise ErrorPermanente("El cliente ya no tiene facturas en el periodo")
+        mensaje = construir_correo_estado_cuenta(
+            estados[0], generar_pdf_estado_cuenta(estados[0]), connection=connection
+        )
+
+    # El destinatario registrado al encolar es el que se respeta
+    mensaje.to = [correo.destinatario]
+    return mensaje
+
+
+def _marcar_enviado(correo):
+    correo.estado = 'ENVIADO'
+    correo.enviado = timezone.now()
+    correo.ultimo_error = ''
+    correo.save(update_fields=['estado', 'enviado', 'ultimo_error'])
+
+
+def _marcar_fallido(correo, error, permanente=False):
+    # El intento ya se contó al reclamar (reclamar_lote)
+    correo.ultimo_error = str(error)[:2000]
+    if permanente or correo.intentos >= OUTBOX_MAX_INTENTOS:
+        correo.estado = 'FALLIDO'
+    else:
+        correo.estado = 'PENDIENTE'
+        correo.proximo_intento = timezone.now() + timedelta(seconds=calcular_backoff(correo.intentos))
+    correo.save(update_fields=['estado', 'ultimo_error', 'proximo_intento'])
+
+
+def _liberar(correos, segundos):
+    """Devuelve correos reclamados a la cola sin contar un intento (circuito abierto)."""
+    CorreoPendiente.objects.filter(id__in=[c.id for c in correos]).update(
+        estado='PENDIENTE',
+        intentos=F('intentos') - 1,
+        proximo_intento=timezone.now() + timedelta(seconds=segundos),
+    )
+
+
+def procesar_lote(tamano=50, breaker=None):
+    """
+    Reclama y envía un lote de correos por una sola conexión SMTP.
+    Retorna un diccionario con el número de correos reclamados, enviados,
+    fallidos y reprogramados sin consumir intento (servidor caído o circuito abierto).
+    """
+    breaker = breaker or CircuitBreaker()
+    resultado = {'reclamados': 0, 'enviados': 0, 'fallidos': 0, 'reprogramados': 0}
+    if not breaker.permite():
+        return resultado
+
+    correos = reclamar_lote(tamano)
+    resultado['reclamados'] = len(correos)
+    if not correos:
+        return resultado
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        # El servidor no responde: el lote vuelve a la cola sin consumir intentos
+        logger.error("No se pudo abrir la conexión SMTP: %s", e)
+        breaker.registrar_fallo()
+        _liberar(correos, max(breaker.segundos_para_reintentar(), OUTBOX_BACKOFF_BASE))
+        resultado['reprogramados'] = len(correos)
+        return resultado
+
+    try:
+        for posicion, correo in enumerate(correos):
+            if not breaker.permite():
+                _liberar(correos[posicion:], breaker.segundos_para_reintentar())
+                resultado['reprogramados'] += len(correos) - posicion
+                break
+            try:
+                mensaje = construir_mensaje(correo, connection=connection)
+            except ErrorPermanente as e:
+                _marcar_fallido(correo, e, permanente=True)
+                resultado['fallidos'] += 1
+                continue
+            except Exception as e:
+                # Error al generar el mensaje (PDF, datos relacionados, BD): cuenta como
+                # intento para que el correo no vuelva a tumbar el lote indefinidamente
+                logger.exception("Error al construir el correo %s", correo.id)
+                _marcar_fallido(correo, e)
+                resultado['fallidos'] += 1
+                continue
+
+            try:
+                connection.send_messages([mensaje])
+            except Exception as e:
+                logger.warning("Fallo al enviar correo %s: %s", correo.id, e)
+                breaker.registrar_fallo()
+                _marcar_fallido(correo, e)
+                resultado['fallidos'] += 1
+            else:
+                breaker.registrar_exito()
+                _marcar_enviado(correo)
+                resultado['enviados'] += 1
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    return resultado
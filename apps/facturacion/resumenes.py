@@ -0,0 +1,248 @@
+"""
+Resúmenes diarios de ventas.
+
+Tablas (models.py):
+- ResumenDiarioEstado:   facturas y total por día y estado (emitidas, pagadas, anuladas).
+- ResumenDiarioProducto: unidades e ingresos sin IVA por día y producto.
+- ResumenDiarioCliente:  facturas e ingresos por día y cliente.
+- ResumenDiarioCreador:  facturas e ingresos por día y usuario creador.
+
+Factura.save()/delete() llaman a aplicar_cambio() con el aporte anterior y el
+nuevo de la factura, así que emitir, marcar como pagada, anular y eliminar
+actualizan los resúmenes en la misma transacción. reconstruir() los recalcula
+desde las facturas (carga inicial o corrección tras cambios masivos con update()).
+
+Los ingresos por producto usan el precio actual del producto, igual que los
+totales de la factura; si un precio cambia entre la emisión y la anulación la
+diferencia se corrige con reconstruir_resumenes.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from facturacion_segura.cache import invalidar, obtener_o_calcular
+from .models import (
+    Factura, FacturaItem,
+    ResumenDiarioEstado, ResumenDiarioProducto, ResumenDiarioCliente, ResumenDiarioCreador,
+)
+
+MODELOS_RESUMEN = (ResumenDiarioEstado, ResumenDiarioProducto, ResumenDiarioCliente, ResumenDiarioCreador)
+
+# Segundos que se reutilizan las métricas calculadas (puede sobrescribirse en settings)
+METRICAS_CACHE_TTL = getattr(settings, 'METRICAS_CACHE_TTL', 30)
+GRUPO_CACHE_METRICAS = 'metricas'
+
+
+def _sumar(modelo, claves, **incrementos):
+    """Suma los incrementos a la fila de `claves`, creándola si no existe."""
+    cambios = {campo: F(campo) + valor for campo, valor in incrementos.items()}
+    if modelo.objects.filter(**claves).update(**cambios):
+        return
+    try:
+        with transaction.atomic():
+            modelo.objects.create(**claves, **incrementos)
+    except IntegrityError:
+        # Otra transacción creó la fila entre el UPDATE y el INSERT
+        modelo.objects.filter(**claves).update(**cambios)
+
+
+def _lineas_por_producto(factura):
+    """{producto_id: (cantidad, subtotal)} de la factura."""
+    lineas = defaultdict(lambda: [0, Decimal('0')])
+    if 'items' in getattr(factura, '_prefetched_objects_cache', {}):
+        items = factura.items.all()
+    else:
+        items = factura.items.select_related('producto')
+    for item in items:
+        linea = lineas[item.producto_id]
+        linea[0] += item.cantidad
+        linea[1] += item.cantidad * item.producto.precio
+    return lineas
+
+
+def aplicar_cambio(factura, anterior, actual):
+    """
+    Resta el aporte `anterior` y suma el `actual` (tuplas de Factura.foto_resumen(),
+    o None si la factura no contaba / deja de contar).
+    """
+    lineas = None
+    with transaction.atomic():
+        # Las métricas en caché quedan vencidas cuando el cambio se confirma
+        transaction.on_commit(lambda: invalidar(GRUPO_CACHE_METRICAS))
+        for foto, signo in ((anterior, -1), (actual, 1)):
+            if foto is None:
+                continue
+            estado, dia, total, cliente_id, creador_id = foto
+            total = total or Decimal('0')
+            _sumar(ResumenDiarioEstado, {'dia': dia, 'estado': estado}, facturas=signo, total=signo * total)
+            if estado not in Factura.ESTADOS_VENTA:
+                continue
+            _sumar(ResumenDiarioCliente, {'dia': dia, 'cliente_id': cliente_id}, facturas=signo, total=signo * total)
+            _sumar(ResumenDiarioCreador, {'dia': dia, 'creador_id': creador_id}, facturas=signo, total=signo * total)
+            if lineas is None:
+                lineas = _lineas_por_producto(factura)
+            for producto_id, (cantidad, subtotal) in lineas.items():
+                _sumar(
+                    ResumenDiarioProducto, {'dia': dia, 'producto_id': producto_id},
+                    cantidad=signo * cantidad, facturas=signo, total=signo * subtotal,
+                )
+
+
+def _rango_dias(desde, hasta):
+    """Rango [inicio, fin) con zona horaria para los días desde..hasta (incluidos)."""
+    zona = timezone.get_current_timezone()
+    inicio = timezone.make_aware(datetime.combine(desde, datetime.min.time()), zona) if desde else None
+    fin = timezone.make_aware(datetime.combine(hasta + timedelta(days=1), datetime.min.time()), zona) if hasta else None
+    return inicio, fin
+
+
+def reconstruir(desde=None, hasta=None):
+    """
+    Recalcula los resúmenes de los días desde..hasta (todos si no se indican)
+    con consultas agregadas sobre las facturas. Retorna las filas creadas por tabla.
+    """
+    inicio, fin = _rango_dias(desde, hasta)
+    facturas = Factura.objects.filter(estado__in=Factura.ESTADOS_RESUMIDOS)
+    items = FacturaItem.objects.filter(factura__estado__in=Factura.ESTADOS_VENTA)
+    if inicio:
+        facturas = facturas.filter(fecha__gte=inicio)
+        items = items.filter(factura__fecha__gte=inicio)
+    if fin:
+        facturas = facturas.filter(fecha__lt=fin)
+        items = items.filter(factura__fecha__lt=fin)
+    facturas = facturas.annotate(dia=TruncDate('fecha')).order_by()
+    ventas = facturas.filter(estado__in=Factura.ESTADOS_VENTA)
+
+    por_estado = facturas.values('dia', 'estado').annotate(n=Count('id'), suma=Sum('total'))
+    por_cliente = ventas.values('dia', 'cliente_id').annotate(n=Count('id'), suma=Sum('total'))
+    por_creador = ventas.values('dia', 'creador_id').annotate(n=Count('id'), suma=Sum('total'))
+    subtotal = ExpressionWrapper(F('cantidad') * F('producto__precio'), output_field=DecimalField())
+    por_producto = (
+        items.annotate(dia=TruncDate('factura__fecha')).order_by()
+        .values('dia', 'producto_id')
+        .annotate(unidades=Sum('cantidad'), n=Count('factura_id', distinct=True), suma=Sum(subtotal))
+    )
+
+    with transaction.atomic():
+        for modelo in MODELOS_RESUMEN:
+            existentes = modelo.objects.all()
+            if desde:
+                existentes = existentes.filter(dia__gte=desde)
+            if hasta:
+                existentes = existentes.filter(dia__lte=hasta)
+            existentes.delete()
+
+        creadas = {
+            'estado': ResumenDiarioEstado.objects.bulk_create([
+                ResumenDiarioEstado(dia=f['dia'], estado=f['estado'], facturas=f['n'], total=f['suma'] or 0)
+                for f in por_estado
+            ], batch_size=1000),
+            'cliente': ResumenDiarioCliente.objects.bulk_create([
+                ResumenDiarioCliente(dia=f['dia'], cliente_id=f['cliente_id'], facturas=f['n'], total=f['suma'] or 0)
+                for f in por_cliente
+            ], batch_size=1000),
+            'creador': ResumenDiarioCreador.objects.bulk_create([
+                ResumenDiarioCreador(dia=f['dia'], creador_id=f['creador_id'], facturas=f['n'], total=f['suma'] or 0)
+                for f in por_creador
+            ], batch_size=1000),
+            'producto': ResumenDiarioProducto.objects.bulk_create([
+                ResumenDiarioProducto(
+                    dia=f['dia'], producto_id=f['producto_id'], cantidad=f['unidades'],
+                    facturas=f['n'], total=f['suma'] or 0,
+                )
+                for f in por_producto
+            ], batch_size=1000),
+        }
+        transaction.on_commit(lambda: invalidar(GRUPO_CACHE_METRICAS))
+    return {tabla: len(filas) for tabla, filas in creadas.items()}
+
+
+def metricas(desde, hasta, top=5):
+    """
+    Métricas de ventas entre dos días (incluidos), leídas solo de los resúmenes:
+    el costo depende de los días y productos/clientes del rango, no del número de facturas.
+    """
+    rango = {'dia__gte': desde, 'dia__lte': hasta}
+
+    por_dia = defaultdict(lambda: {'facturas': 0, 'ingresos': Decimal('0')})
+    por_estado = {estado: {'facturas': 0, 'total': Decimal('0')} for estado in Factura.ESTADOS_RESUMIDOS}
+    filas = ResumenDiarioEstado.objects.filter(**rango).values_list('dia', 'estado', 'facturas', 'total')
+    for dia, estado, facturas, total in filas:
+        por_estado[estado]['facturas'] += facturas
+        por_estado[estado]['total'] += total
+        # Las anuladas cuentan como facturas del día, pero no como ingresos
+        por_dia[dia]['facturas'] += facturas
+        if estado in Factura.ESTADOS_VENTA:
+            por_dia[dia]['ingresos'] += total
+
+    dias = sorted(dia for dia, valores in por_dia.items() if valores['facturas'] > 0)
+
+    def ranking(modelo, campo, nombre):
+        return list(
+            modelo.objects.filter(**rango)
+            .values(campo, nombre=F(nombre))
+            .annotate(facturas_total=Sum('facturas'), ingresos=Sum('total'))
+            .filter(ingresos__gt=0)
+            .order_by('-ingresos', campo)[:top]
+        )
+
+    top_productos = (
+        ResumenDiarioProducto.objects.filter(**rango)
+        .values('producto_id', nombre=F('producto__nombre'))
+        .annotate(unidades=Sum('cantidad'), ingresos=Sum('total'))
+        .filter(ingresos__gt=0)
+        .order_by('-ingresos', 'producto_id')[:top]
+    )
+
+    return {
+        'desde': desde.isoformat(),
+        'hasta': hasta.isoformat(),
+        'facturas_por_dia': {
+            'labels': [dia.strftime('%Y-%m-%d') for dia in dias],
+            'data': [por_dia[dia]['facturas'] for dia in dias],
+        },
+        'ingresos_por_dia': {
+            'labels': [dia.strftime('%Y-%m-%d') for dia in dias],
+            'data': [str(por_dia[dia]['ingresos']) for dia in dias],
+        },
+        'por_estado': {
+            estado: {'facturas': valores['facturas'], 'total': str(valores['total'])}
+            for estado, valores in por_estado.items()
+        },
+        'ingresos': str(sum((por_dia[dia]['ingresos'] for dia in dias), Decimal('0'))),
+        'top_productos': [
+            {'producto_id': f['producto_id'], 'nombre': f['nombre'],
+             'unidades': f['unidades'], 'ingresos': str(f['ingresos'])}
+            for f in top_productos
+        ],
+        'top_clientes': [
+            {'cliente_id': f['cliente_id'], 'nombre': f['nombre'],
+             'facturas': f['facturas_total'], 'ingresos': str(f['ingresos'])}
+            for f in ranking(ResumenDiarioCliente, 'cliente_id', 'cliente__nombre')
+        ],
+        'top_vendedores': [
+            {'creador_id': f['creador_id'], 'nombre': f['nombre'],
+             'facturas': f['facturas_total'], 'ingresos': str(f['ingresos'])}
+            for f in ranking(ResumenDiarioCreador, 'creador_id', 'creador__username')
+        ],
+    }
+
+
+def metricas_en_cache(desde, hasta, top=5):
+    """
+    metricas() reutilizadas durante METRICAS_CACHE_TTL segundos por rango y top.
+    Al vencer, una sola petición las recalcula y el resto recibe el valor anterior.
+    Incluye 'cache_edad': segundos desde que se calcularon.
+    """
+    clave = f"metricas:{desde.isoformat()}:{hasta.isoformat()}:{top}"
+    valor, edad = obtener_o_calcular(
+        clave, lambda: metricas(desde, hasta, top=top), METRICAS_CACHE_TTL, grupo=GRUPO_CACHE_METRICAS
+    )
+    return {**valor, 'cache_edad': round(edad, 1)}
@@ -1,8 +1,14 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 from django.db import transaction
+from django.utils import timezone
 from .models import Factura, FacturaItem
 from apps.productos.models import Producto
 from apps.clientes.models import Cliente
+from apps.clientes.serializers import ClienteSerializer
+from apps.usuarios.serializers import UserListSerializer
+from facturacion_segura.campos import CamposDinamicosMixin
 
 class FacturaItemSerializer(serializers.ModelSerializer):
     class Meta:
@@ -19,7 +25,7 @@ class FacturaItemSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(f"No hay suficiente stock para {producto.nombre}")
         return data
 
-class FacturaSerializer(serializers.ModelSerializer):
+class FacturaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     items = FacturaItemSerializer(many=True, required=True)
     cliente = serializers.PrimaryKeyRelatedField(queryset=Cliente.objects.all())
     
@@ -32,8 +38,15 @@ class FacturaSerializer(serializers.ModelSerializer):
         model = Factura
         fields = ['id', 'creador', 'cliente', 'fecha', 'estado', 'numero_factura', 
                  'anulada', 'subtotal', 'iva', 'total', 'items']
-        read_only_fields = ['id', 'creador', 'fecha', 'numero_factura', 'anulada', 
+        # El estado solo cambia con las acciones (emitir, marcar_pagada, anular_factura):
+        # una factura sale de BORRADOR con sus ítems ya escritos, que es lo que
+        # suponen los resúmenes diarios y las compras conjuntas
+        read_only_fields = ['id', 'creador', 'fecha', 'estado', 'numero_factura', 'anulada',
                            'subtotal', 'iva', 'total']
+        expandibles = {
+            'cliente': (ClienteSerializer, {}),
+            'creador': (UserListSerializer, {}),
+        }
 
     def validate(self, attrs):
         if not attrs.get('items'):
@@ -120,4 +133,26 @@ class FacturaSerializer(serializers.ModelSerializer):
                 for item_data in items_data:
                     FacturaItem.objects.create(factura=instance, **item_data)
         
-        return instance
\ No newline at end of file
+        return instance
+
+
+class FacturaResumenSerializer(serializers.BaseSerializer):
+    """
+    Representación compacta de una factura para tablas y listados.
+    Trabaja sobre filas de .values(CAMPOS) en lugar de instancias del modelo,
+    sin la introspección de campos de ModelSerializer ni los ítems anidados.
+    """
+    CAMPOS = ('id', 'numero_factura', 'cliente_id', 'cliente__nombre', 'fecha', 'estado', 'total')
+    CENTAVOS = Decimal('0.01')
+
+    def to_representation(self, fila):
+        return {
+            'id': fila['id'],
+            'numero_factura': fila['numero_factura'],
+            'cliente': fila['cliente_id'],
+            'cliente_nombre': fila['cliente__nombre'],
+            # Mismo formato que FacturaSerializer: fecha local ISO 8601 y total como texto
+            'fecha': timezone.localtime(fila['fecha']).isoformat().replace('+00:00', 'Z'),
+            'estado': fila['estado'],
+            'total': str(fila['total'].quantize(self.CENTAVOS)),
+        }
@@ -1,10 +1,10 @@
 from django.shortcuts import render
-from apps.usuarios.decorators import role_required
+from apps.usuarios.decorators import politica_requerida
 from .models import Factura
 from django.shortcuts import get_object_or_404, redirect
 from django.http import HttpResponseForbidden
 
-@role_required('Ventas', 'Administrador')
+@politica_requerida('web_facturacion')
 def lista_facturas(request):
     facturas = Factura.objects.all()
 
@@ -16,7 +16,7 @@ def lista_facturas(request):
     })
 
 
-@role_required('Ventas', 'Administrador')
+@politica_requerida('web_facturacion')
 def eliminar_factura(request, factura_id):
     factura = get_object_or_404(Factura, id=factura_id)
 
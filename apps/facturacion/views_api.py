@@ -1,25 +1,56 @@
-from django.core.mail import EmailMessage
-from django.conf import settings
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from io import BytesIO
 from .models import Factura
-from .serializers import FacturaSerializer
-from django.db.models import Count
+from .serializers import FacturaSerializer, FacturaResumenSerializer
+from .filtros import FiltroFacturas, filtrar_facturas
+from .exportacion import FORMATOS_EXPORTACION, facturas_exportacion
+from . import contabilidad
+from .resumenes import metricas_en_cache
+from . import analitica
+from .documentos import (
+    preparar_datos_factura, generar_pdf_factura, renderizar_html_factura,
+    consultar_estados_cuenta, generar_pdf_estado_cuenta,
+    nombre_archivo_estado_cuenta, periodo_anterior,
+)
+from .outbox import encolar_factura, encolar_facturas, encolar_estado_cuenta
+from .correo import seleccionar_facturas_envio
+from django.db import transaction
 from django.utils import timezone
-from datetime import timedelta
-from apps.usuarios.permissions import FacturaPermission
-from apps.auditorias.models import LogAuditoria
+from datetime import date, timedelta
+from apps.usuarios.permissions import AnaliticaPermission, FacturaPermission
+from apps.auditorias.utils import registrar_log_eliminacion
+from apps.usuarios import confirmacion
+from apps.usuarios.throttling import MetricasThrottle, PdfThrottle, con_limite, limite_pdf
+from facturacion_segura.campos import CamposDinamicosViewSetMixin
+from facturacion_segura.paginacion import PaginacionKeyset
 
-class FacturaViewSet(viewsets.ModelViewSet):
+
+def _rango_consulta(parametros, dias):
+    """
+    (desde, hasta, top) de ?desde=YYYY-MM-DD&hasta=YYYY-MM-DD&top=N; por defecto
+    los últimos `dias` días y top 5 (limitado a 1..50). Lanza ValueError si son inválidos.
+    """
+    try:
+        hasta = date.fromisoformat(parametros['hasta']) if parametros.get('hasta') else timezone.localdate()
+        desde = date.fromisoformat(parametros['desde']) if parametros.get('desde') else hasta - timedelta(days=dias - 1)
+        top = int(parametros.get('top', 5))
+    except ValueError:
+        raise ValueError("Parámetros inválidos: use fechas YYYY-MM-DD y top numérico")
+    if desde > hasta:
+        raise ValueError("La fecha 'desde' no puede ser posterior a 'hasta'")
+    return desde, hasta, max(1, min(top, 50))
+
+
+class PaginacionFacturas(PaginacionKeyset):
+    """Paginación keyset por (fecha, id), respaldada por el índice factura_fecha_id_idx"""
+    ordering = ('-fecha', '-id')
+
+
+class FacturaViewSet(CamposDinamicosViewSetMixin, viewsets.ModelViewSet):
     """
     ViewSet para el módulo de Facturación.
     Acceso permitido solo a: Administrador, Ventas
@@ -27,117 +58,66 @@ class FacturaViewSet(viewsets.ModelViewSet):
     queryset = Factura.objects.all()
     serializer_class = FacturaSerializer
     permission_classes = [IsAuthenticated, FacturaPermission]
+    # Acciones con una política distinta de la del módulo de facturas
+    politicas_por_accion = {'exportar_contabilidad': 'contabilidad'}
+    pagination_class = PaginacionFacturas
+    filter_backends = [FiltroFacturas]
+    # La paginación keyset ordena por fecha: se carga aunque ?fields= no la incluya
+    columnas_requeridas = ('fecha',)
+
+    # Relaciones que usa cada acción: (select_related, prefetch_related).
+    # Con esto el número de consultas no depende de cuántas facturas o ítems haya.
+    # list/retrieve las calcula optimizar_campos() según ?fields= y ?expand=.
+    # update/partial_update no precargan ítems a propósito: los reemplazan y la
+    # respuesta debe mostrar los nuevos.
+    relaciones_por_accion = {
+        'view_pdf': (('cliente',), ('items__producto',)),
+        'download_pdf': (('cliente',), ('items__producto',)),
+        # Sin precarga: con el fragmento en caché solo se consulta su versión
+        'view_html': (('cliente',), ()),
+        'send_pdf': (('cliente',), ()),
+        'emitir': ((), ('items__producto',)),
+        'marcar_pagada': ((), ('items__producto',)),
+        'anular_factura': ((), ('items__producto',)),
+        'eliminar_con_motivo': ((), ('items__producto',)),
+        'destroy': (('cliente',), ('items__producto',)),
+    }
 
     def _generar_pdf_factura(self, factura):
         """
         Función auxiliar para generar el PDF de una factura.
         Retorna el PDF como bytes.
         """
-        if not factura.cliente:
-            raise ValueError("No se ha asignado un cliente a esta factura")
-        
-        cliente = factura.cliente
-        
-        # Generar PDF
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
-        elements = []
-
-        # Encabezado de la empresa
-        elements.append(Paragraph("Sistema de Facturación Segura", styles['Title']))
-        elements.append(Paragraph("RUC: 123456789 | Dirección: Av. Ejemplo 123, Ciudad", styles['Normal']))
-        elements.append(Paragraph("Teléfono: (123) 456-7890 | Email: contacto@facturasegura.com", styles['Normal']))
-        elements.append(Spacer(1, 12))
-
-        # Información de la factura
-        numero_factura = factura.numero_factura if factura.numero_factura else f"#{factura.id}"
-        elements.append(Paragraph(f"Factura {numero_factura}", styles['Heading2']))
-        elements.append(Paragraph(f"Fecha: {factura.fecha.strftime('%Y-%m-%d %H:%M')}", styles['Normal']))
-        elements.append(Paragraph(f"Estado: {factura.get_estado_display()}", styles['Normal']))
-        elements.append(Paragraph(f"Cliente: {cliente.nombre}", styles['Normal']))
-        elements.append(Paragraph(f"Email: {cliente.email}", styles['Normal']))
-        if cliente.telefono:
-            elements.append(Paragraph(f"Teléfono: {cliente.telefono}", styles['Normal']))
-        elements.append(Spacer(1, 12))
-
-        # Tabla de ítems
-        data = [['Descripción', 'Cantidad', 'Precio Unitario', 'Subtotal']]
-        subtotal = 0
-        
-        if factura.items.exists():
-            for item in factura.items.all():
-                precio_unitario = item.producto.precio
-                item_subtotal = item.cantidad * precio_unitario
-                subtotal += item_subtotal
-                data.append([
-                    item.producto.nombre,
-                    str(item.cantidad),
-                    f"${precio_unitario:.2f}",
-                    f"${item_subtotal:.2f}"
-                ])
-        else:
-            data.append(['Sin items', '', '', '$0.00'])
-        
-        # Calcular IVA y total
-        iva = subtotal * factura.IVA_PORCENTAJE
-        total = subtotal + iva
-        
-        # Filas de totales
-        data.append(['', '', 'Subtotal', f"${subtotal:.2f}"])
-        data.append(['', '', 'IVA (15%)', f"${iva:.2f}"])
-        data.append(['', '', 'Total', f"${total:.2f}"])
-
-        # Crear y estilizar tabla
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -4), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -4), colors.black),
-            ('FONTNAME', (0, 1), (-1, -4), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -4), 10),
-            # Estilo para las filas de totales
-            ('BACKGROUND', (0, -3), (-1, -3), colors.lightgrey),  # Subtotal
-            ('BACKGROUND', (0, -2), (-1, -2), colors.lightgrey),  # IVA
-            ('BACKGROUND', (0, -1), (-1, -1), colors.darkgrey),   # Total
-            ('FONTNAME', (0, -3), (-1, -1), 'Helvetica-Bold'),
-            ('TEXTCOLOR', (0, -1), (-1, -1), colors.whitesmoke),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table)
-
-        # Pie de página
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Gracias por su compra. Contáctenos para cualquier consulta.", styles['Normal']))
-
-        # Generar el PDF
-        doc.build(elements)
-        pdf = buffer.getvalue()
-        buffer.close()
-        
-        return pdf
+        return generar_pdf_factura(preparar_datos_factura(factura))
 
     def get_queryset(self):
         """
-        Filtrar queryset basado en el rol del usuario.
-        Solo Administradores y personal de Ventas pueden ver facturas.
+        Facturas con las relaciones que usa la acción. El acceso por rol ya lo
+        resolvió FacturaPermission.
         """
-        user = self.request.user
-        if user.is_superuser or user.role in ['Administrador', 'Ventas']:
-            return Factura.objects.all()
-        return Factura.objects.none()
+        queryset = Factura.objects.all()
+        select, prefetch = self.relaciones_por_accion.get(self.action, ((), ()))
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return self.optimizar_campos(queryset)
 
     def list(self, request, *args, **kwargs):
-        user = self.request.user
-        if not (user.is_superuser or user.role in ['Administrador', 'Ventas']):
-            raise PermissionDenied("No tienes permiso para acceder a las facturas")
+        if request.query_params.get('vista') == 'resumen':
+            return self._listar_resumen()
         return super().list(request, *args, **kwargs)
 
+    def _listar_resumen(self):
+        """
+        Listado compacto (?vista=resumen): número, cliente, fecha, estado y total.
+        Lee solo esas columnas con .values() y no carga los ítems.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        filas = self.paginate_queryset(queryset.values(*FacturaResumenSerializer.CAMPOS))
+        serializer = FacturaResumenSerializer(filas, many=True)
+        return self.get_paginated_response(serializer.data)
+
     def perform_create(self, serializer):
         serializer.save(creador=self.request.user)
 
@@ -196,33 +176,52 @@ class FacturaViewSet(viewsets.ModelViewSet):
         # La eliminación restaurará automáticamente el stock a través del método delete() de FacturaItem
         instance.delete()
 
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['post'], throttle_classes=[PdfThrottle])
     def send_pdf(self, request, pk=None):
-        """Enviar factura por correo electrónico"""
+        """
+        Enviar factura por correo electrónico.
+        El correo se encola y lo envía el worker procesar_correos (202 Accepted).
+        """
         factura = self.get_object()
         
         try:
-            # Generar PDF usando la función auxiliar
-            pdf = self._generar_pdf_factura(factura)
-            
-            # Enviar correo
-            email = EmailMessage(
-                subject=f"Factura #{factura.numero_factura or factura.id}",
-                body="Adjunto encontrarás tu factura.",
-                from_email=settings.EMAIL_HOST_USER,
-                to=[factura.cliente.email],
-            )
-            email.attach(f"factura_{factura.id}.pdf", pdf, "application/pdf")
-            email.send()
-
-            return Response({"status": "Factura enviada al correo"})
-            
+            correo = encolar_factura(factura, usuario=request.user)
         except ValueError as e:
             return Response({"error": str(e)}, status=400)
-        except Exception as e:
-            return Response({"error": "Error al enviar el correo"}, status=500)
 
-    @action(detail=True, methods=['get'])
+        return Response({
+            "status": "Factura encolada para envío al correo",
+            "correo_id": correo.id,
+        }, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['post'], url_path='enviar-lote')
+    def enviar_lote(self, request):
+        """
+        Encolar el envío por correo de varias facturas.
+        Body: {"ids": [1, 2, 3]} o {"fecha": "YYYY-MM-DD", "estado": "EMITIDA"}.
+        El worker procesar_correos las envía reutilizando la conexión SMTP (202 Accepted).
+        """
+        ids = request.data.get('ids')
+        fecha = request.data.get('fecha')
+        try:
+            if ids is not None and not isinstance(ids, list):
+                raise ValueError("ids debe ser una lista")
+            ids = [int(i) for i in ids] if ids else None
+            fecha = date.fromisoformat(fecha) if fecha else None
+            facturas = seleccionar_facturas_envio(
+                ids=ids, fecha=fecha, estado=request.data.get('estado')
+            )
+        except (TypeError, ValueError) as e:
+            return Response({"error": str(e)}, status=400)
+
+        encolados = encolar_facturas(facturas.prefetch_related(None), usuario=request.user)
+        return Response({
+            "status": "Facturas encoladas para envío al correo",
+            "encolados": encolados,
+        }, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'], throttle_classes=[PdfThrottle])
+    @con_limite(limite_pdf)
     def view_pdf(self, request, pk=None):
         """Visualizar PDF de la factura en el navegador"""
         factura = self.get_object()
@@ -246,6 +245,21 @@ class FacturaViewSet(viewsets.ModelViewSet):
             return Response({"error": "Error al generar el PDF"}, status=500)
 
     @action(detail=True, methods=['get'])
+    def view_html(self, request, pk=None):
+        """
+        Visualizar la factura como HTML imprimible.
+        Mucho más liviano que view_pdf: usa los mismos datos que el PDF y un
+        fragmento de plantilla cacheado, y se imprime desde el navegador.
+        """
+        factura = self.get_object()
+
+        try:
+            return HttpResponse(renderizar_html_factura(factura))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+    @action(detail=True, methods=['get'], throttle_classes=[PdfThrottle])
+    @con_limite(limite_pdf)
     def download_pdf(self, request, pk=None):
         """Descargar PDF de la factura"""
         factura = self.get_object()
@@ -268,29 +282,124 @@ class FacturaViewSet(viewsets.ModelViewSet):
         except Exception as e:
             return Response({"error": "Error al generar el PDF"}, status=500)
 
+    def _consultar_estado_cuenta(self, datos):
+        """
+        Obtiene el estado de cuenta de un cliente a partir de los parámetros
+        'cliente' y 'periodo' (YYYY-MM, por defecto el mes anterior).
+        Retorna (estado_cuenta, None) o (None, Response de error).
+        """
+        cliente_id = datos.get('cliente')
+        periodo = datos.get('periodo') or periodo_anterior()
+
+        if not cliente_id:
+            return None, Response({"error": "El cliente es requerido"}, status=400)
+        try:
+            cliente_id = int(cliente_id)
+        except (TypeError, ValueError):
+            return None, Response({"error": "El cliente debe ser un número entero"}, status=400)
+        try:
+            estados = consultar_estados_cuenta(periodo, cliente_ids=[cliente_id])
+        except ValueError:
+            return None, Response({"error": "El periodo debe tener el formato YYYY-MM"}, status=400)
+
+        if not estados:
+            return None, Response({
+                "error": f"El cliente no tiene facturas en el periodo {periodo}"
+            }, status=404)
+        return estados[0], None
+
+    @action(detail=False, methods=['get'], url_path='estado-cuenta', throttle_classes=[PdfThrottle])
+    @con_limite(limite_pdf)
+    def estado_cuenta(self, request):
+        """Visualizar el estado de cuenta mensual de un cliente en PDF"""
+        estado, error = self._consultar_estado_cuenta(request.query_params)
+        if error:
+            return error
+
+        try:
+            pdf = generar_pdf_estado_cuenta(estado)
+        except Exception:
+            return Response({"error": "Error al generar el PDF"}, status=500)
+        response = HttpResponse(pdf, content_type='application/pdf')
+        response['Content-Disposition'] = f'inline; filename="{nombre_archivo_estado_cuenta(estado)}"'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='enviar-estado-cuenta', throttle_classes=[PdfThrottle])
+    def enviar_estado_cuenta(self, request):
+        """
+        Enviar el estado de cuenta mensual de un cliente por correo electrónico.
+        El correo se encola y lo envía el worker procesar_correos (202 Accepted).
+        """
+        estado, error = self._consultar_estado_cuenta(request.data)
+        if error:
+            return error
+
+        correo = encolar_estado_cuenta(estado, usuario=request.user)
+        return Response({
+            "status": "Estado de cuenta encolado para envío al correo",
+            "correo_id": correo.id,
+            "facturas": len(estado['facturas'])
+        }, status=status.HTTP_202_ACCEPTED)
+
     @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        """
+        Exportar facturas como NDJSON (por defecto) o CSV: ?formato=ndjson|csv.
+        Acepta los mismos filtros que el listado. La respuesta se genera por
+        bloques mientras se lee la base de datos, sin armar la lista en memoria.
+        """
+        formato = request.query_params.get('formato', 'ndjson').lower()
+        if formato not in FORMATOS_EXPORTACION:
+            return Response({
+                "error": f"Formato no soportado. Use: {', '.join(FORMATOS_EXPORTACION)}"
+            }, status=400)
+
+        queryset = filtrar_facturas(self.get_queryset(), request.query_params)
+        generar, content_type, extension = FORMATOS_EXPORTACION[formato]
+        response = StreamingHttpResponse(generar(facturas_exportacion(queryset)), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="facturas.{extension}"'
+        # Evita que un proxy (nginx) acumule la respuesta antes de reenviarla
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @action(detail=False, methods=['get', 'post'], url_path='exportar-contabilidad')
+    def exportar_contabilidad(self, request):
+        """
+        Exportación contable incremental (solo Administradores).
+        - POST {"periodo": "YYYY-MM", "forzar": false}: actualiza los días que cambiaron.
+        - GET: retorna el manifest; GET ?archivo=<nombre> descarga una partición.
+        """
+        if request.method == 'GET':
+            nombre = request.query_params.get('archivo')
+            if not nombre:
+                return Response(contabilidad.leer_manifest())
+            ruta = contabilidad.ruta_archivo_exportado(nombre)
+            if ruta is None or not ruta.exists():
+                return Response({"error": "Archivo no encontrado"}, status=404)
+            return FileResponse(open(ruta, 'rb'), as_attachment=True, filename=nombre,
+                                content_type='application/gzip')
+
+        periodo = request.data.get('periodo') or timezone.localdate().strftime('%Y-%m')
+        try:
+            resumen = contabilidad.exportar_contabilidad(periodo, forzar=bool(request.data.get('forzar')))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        return Response(resumen)
+
+    @action(detail=False, methods=['get'], throttle_classes=[MetricasThrottle])
     def metrics(self, request):
-        user = self.request.user
-        if not (user.is_superuser or user.role in ['Administrador', 'Ventas']):
-            raise PermissionDenied("No tienes permiso para acceder a las métricas de facturas")
-        end_date = timezone.now().date()
-        start_date = end_date - timedelta(days=6)
-        facturas_por_dia = Factura.objects.filter(
-            fecha__date__range=[start_date, end_date]
-        ).values('fecha__date').annotate(count=Count('id')).order_by('fecha__date')
-
-        labels = []
-        data = []
-        for entry in facturas_por_dia:
-            labels.append(entry['fecha__date'].strftime('%Y-%m-%d'))
-            data.append(entry['count'])
+        """
+        Métricas de ventas de un rango de días: ?desde=YYYY-MM-DD&hasta=YYYY-MM-DD&top=5
+        (por defecto los últimos 7 días). Se calculan a partir de los resúmenes
+        diarios, por lo que el costo no depende del número de facturas, y se
+        reutilizan unos segundos en caché ('cache_edad' indica su antigüedad).
+        """
+        try:
+            desde, hasta, top = _rango_consulta(request.query_params, dias=7)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
 
-        return Response({
-            'facturas_por_dia': {
-                'labels': labels,
-                'data': data
-            }
-        })
+        return Response(metricas_en_cache(desde, hasta, top=top))
 
     @action(detail=True, methods=['post'])
     def emitir(self, request, pk=None):
@@ -443,16 +552,21 @@ class FacturaViewSet(viewsets.ModelViewSet):
         if not factura.puede_editar():
             return Response({'error': 'No se puede eliminar una factura ya emitida. Usa "anular" en su lugar.'}, status=403)
 
-        # Registrar en auditoría antes de eliminar
-        LogAuditoria.objects.create(
-            modelo_afectado='Factura',
-            objeto_id=factura.id,
-            descripcion_objeto=str(factura),
-            motivo=motivo,
-            usuario=request.user
-        )
+        # Token de validate_password (ver apps/usuarios/confirmacion.py)
+        confirmacion.verificar(request, confirmacion.ELIMINAR)
 
-        factura.delete()
+        # Si la eliminación falla, la entrada de auditoría se revierte con ella
+        with transaction.atomic():
+            # Registrar en auditoría antes de eliminar
+            registrar_log_eliminacion(
+                modelo_afectado='Factura',
+                objeto_id=factura.id,
+                descripcion_objeto=str(factura),
+                motivo=motivo,
+                usuario=request.user
+            )
+
+            factura.delete()
         return Response({'mensaje': 'Factura eliminada y registrada en auditoría.'}, status=status.HTTP_204_NO_CONTENT)
     
     def destroy(self, request, *args, **kwargs):
@@ -471,16 +585,55 @@ class FacturaViewSet(viewsets.ModelViewSet):
         # Obtener motivo del request.data
         motivo = request.data.get('motivo', 'Eliminación sin motivo especificado')
         
-        # Crear log de auditoría ANTES de eliminar
-        LogAuditoria.objects.create(
-            modelo_afectado='Factura',
-            objeto_id=factura.id,
-            descripcion_objeto=f"Factura #{factura.numero_factura or factura.id} - Cliente: {factura.cliente.nombre if factura.cliente else 'Sin cliente'}",
-            motivo=motivo,
-            usuario=request.user
-        )
-        
-        # Eliminar la factura (esto restaurará automáticamente el stock)
-        factura.delete()
+        # Si la eliminación falla, la entrada de auditoría se revierte con ella
+        with transaction.atomic():
+            # Crear log de auditoría ANTES de eliminar
+            registrar_log_eliminacion(
+                modelo_afectado='Factura',
+                objeto_id=factura.id,
+                descripcion_objeto=f"Factura #{factura.numero_factura or factura.id} - Cliente: {factura.cliente.nombre if factura.cliente else 'Sin cliente'}",
+                motivo=motivo,
+                usuario=request.user
+            )
+
+            # Eliminar la factura (esto restaurará automáticamente el stock)
+            factura.delete()
         
-        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class AnaliticaViewSet(viewsets.ViewSet):
+    """
+    Analítica de ventas sobre las líneas de factura (solo Administradores).
+    Parámetros comunes: ?desde=YYYY-MM-DD&hasta=YYYY-MM-DD (por defecto los
+    últimos 30 días). Requiere NumPy; si no está instalado responde 503.
+    """
+    permission_classes = [IsAuthenticated, AnaliticaPermission]
+    throttle_classes = [MetricasThrottle]
+
+    def _analizar(self, request, calcular):
+        try:
+            desde, hasta, top = _rango_consulta(request.query_params, dias=30)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        try:
+            lineas = analitica.cargar_lineas(desde, hasta)
+            resultado = calcular(lineas, top)
+        except analitica.AnaliticaNoDisponible as e:
+            return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response({'desde': desde.isoformat(), 'hasta': hasta.isoformat(), 'lineas': len(lineas['cantidad']),
+                         'resultado': resultado})
+
+    @action(detail=False, methods=['get'], url_path='productos-semana')
+    def productos_semana(self, request):
+        """Ingresos y unidades por semana de los ?top=N productos con más ingresos."""
+        return self._analizar(request, lambda lineas, top: analitica.ingresos_producto_semana(lineas, top=top))
+
+    @action(detail=False, methods=['get'])
+    def canasta(self, request):
+        """Distribución del tamaño de las facturas (líneas, unidades, importe)."""
+        return self._analizar(request, lambda lineas, top: analitica.distribucion_canasta(lineas))
+
+    @action(detail=False, methods=['get'])
+    def vendedores(self, request):
+        """Facturas, ingresos y ticket (promedio y percentiles) de los ?top=N vendedores."""
+        return self._analizar(request, lambda lineas, top: analitica.rendimiento_vendedores(lineas, top=top))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompraConjunta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('veces', models.PositiveIntegerField(default=0)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='compras_conjuntas', to='productos.producto')),
+                ('relacionado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='productos.producto')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['producto', '-veces', 'relacionado'], name='compra_conjunta_top_idx')],
+                'constraints': [models.UniqueConstraint(fields=('producto', 'relacionado'), name='compra_conjunta_par_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:36
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0002_compra_conjunta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='datos_actualizados',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -1,10 +1,60 @@
 from django.db import models
+from django.utils import timezone
 
 class Producto(models.Model):
     nombre = models.CharField(max_length=100)
     descripcion = models.TextField(blank=True)
     stock = models.PositiveIntegerField(default=0)
     precio = models.DecimalField(max_digits=10, decimal_places=2)
+    # Última modificación de nombre o precio, los datos del producto que se copian a
+    # la exportación contable. Los cambios de stock (cada venta) no la mueven.
+    datos_actualizados = models.DateTimeField(default=timezone.now, editable=False)
 
     def __str__(self):
         return self.nombre
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        producto = super().from_db(db, field_names, values)
+        producto._datos_cargados = producto._datos()
+        return producto
+
+    def _datos(self):
+        deferidos = self.get_deferred_fields()
+        if 'nombre' in deferidos or 'precio' in deferidos:
+            return None
+        return (self.nombre, self.precio)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'nombre', 'precio'} & set(update_fields):
+            datos = self._datos()
+            if datos is None or datos != getattr(self, '_datos_cargados', None):
+                self.datos_actualizados = timezone.now()
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'datos_actualizados'}
+        super().save(*args, **kwargs)
+        self._datos_cargados = self._datos()
+
+
+class CompraConjunta(models.Model):
+    """
+    Veces que dos productos se vendieron en la misma factura (emitida o pagada).
+    Cada par se guarda en ambas direcciones para leer los relacionados de un
+    producto con un solo rango del índice (producto, -veces).
+    Se mantiene desde apps/facturacion/compras_conjuntas.py.
+    """
+    producto = models.ForeignKey(Producto, related_name='compras_conjuntas', on_delete=models.CASCADE)
+    relacionado = models.ForeignKey(Producto, related_name='+', on_delete=models.CASCADE)
+    veces = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['producto', 'relacionado'], name='compra_conjunta_par_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['producto', '-veces', 'relacionado'], name='compra_conjunta_top_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.producto_id} + {self.relacionado_id}: {self.veces}"
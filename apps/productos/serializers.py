@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from facturacion_segura.campos import CamposDinamicosMixin
 from .models import Producto
 
-class ProductoSerializer(serializers.ModelSerializer):
+class ProductoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Producto
         fields = '__all__'
@@ -1,8 +1,8 @@
 from django.shortcuts import render
-from apps.usuarios.decorators import role_required
+from apps.usuarios.decorators import politica_requerida
 from .models import Producto
 
-@role_required('Bodega', 'Administrador')
+@politica_requerida('web_productos')
 def lista_productos(request):
     productos = Producto.objects.all()
     return render(request, 'productos/lista_productos.html', {'productos': productos})
@@ -1,17 +1,19 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from apps.usuarios.permissions import ProductoPermission
-from rest_framework.exceptions import PermissionDenied
-from .models import Producto
+from facturacion_segura.campos import CamposDinamicosViewSetMixin
+from .models import CompraConjunta, Producto
 from .serializers import ProductoSerializer
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
+from django.db import transaction
 from django.shortcuts import get_object_or_404
-from apps.auditorias.models import LogAuditoria
+from apps.auditorias.utils import registrar_log_eliminacion
+from apps.usuarios import confirmacion
 
 
-class ProductoViewSet(viewsets.ModelViewSet):
+class ProductoViewSet(CamposDinamicosViewSetMixin, viewsets.ModelViewSet):
     """
     ViewSet para el módulo de Productos.
     - Administrador, Bodega: Acceso completo (CRUD)
@@ -22,24 +24,31 @@ class ProductoViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, ProductoPermission]
 
     def get_queryset(self):
-        """
-        Filtrar queryset basado en el rol del usuario.
-        Administradores, personal de Bodega y personal de Ventas pueden ver productos.
-        """
-        user = self.request.user
-        if user.is_superuser or user.role in ['Administrador', 'Bodega', 'Ventas']:
-            return Producto.objects.all()
-        return Producto.objects.none()
+        """El acceso por rol (Ventas solo lectura) ya lo resolvió ProductoPermission."""
+        return self.optimizar_campos(Producto.objects.all())
 
-    def list(self, request, *args, **kwargs):
+    @action(detail=True, methods=['get'])
+    def relacionados(self, request, pk=None):
         """
-        Listar productos.
-        Permitido para: Administrador, Bodega, Ventas (solo lectura)
+        Productos que más se compran junto con este, de mayor a menor: ?limite=N
+        (por defecto 10, máximo 50). Lee un rango del índice de compras conjuntas,
+        así que el costo no depende del número de facturas.
         """
-        user = self.request.user
-        if not (user.is_superuser or user.role in ['Administrador', 'Bodega', 'Ventas']):
-            raise PermissionDenied("No tienes permiso para acceder a los productos")
-        return super().list(request, *args, **kwargs)
+        producto = self.get_object()
+        try:
+            limite = max(1, min(int(request.query_params.get('limite', 10)), 50))
+        except ValueError:
+            return Response({'error': 'El límite debe ser un número entero.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        compras = (
+            CompraConjunta.objects.filter(producto=producto)
+            .select_related('relacionado')
+            .order_by('-veces', 'relacionado_id')[:limite]
+        )
+        return Response([
+            {**ProductoSerializer(compra.relacionado).data, 'veces': compra.veces}
+            for compra in compras
+        ])
 
     @action(detail=True, methods=['post'], url_path='eliminar-con-motivo')
     def eliminar_con_motivo(self, request, pk=None):
@@ -53,21 +62,21 @@ class ProductoViewSet(viewsets.ModelViewSet):
         if not motivo:
             return Response({'error': 'El motivo es requerido.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Validar permisos
-        user = request.user
-        if not (user.is_superuser or user.role in ['Administrador', 'Bodega']):
-            return Response({'error': 'No tienes permiso para eliminar este producto.'}, status=403)
+        # Token de validate_password (ver apps/usuarios/confirmacion.py)
+        confirmacion.verificar(request, confirmacion.ELIMINAR)
 
-        # Registrar en auditoría
-        LogAuditoria.objects.create(
-            modelo_afectado='Producto',
-            objeto_id=producto.id,
-            descripcion_objeto=str(producto),
-            motivo=motivo,
-            usuario=user
-        )
+        # Si la eliminación falla, la entrada de auditoría se revierte con ella
+        with transaction.atomic():
+            # Registrar en auditoría
+            registrar_log_eliminacion(
+                modelo_afectado='Producto',
+                objeto_id=producto.id,
+                descripcion_objeto=str(producto),
+                motivo=motivo,
+                usuario=request.user
+            )
 
-        producto.delete()
+            producto.delete()
         return Response({'mensaje': 'Producto eliminado y registrado en auditoría.'}, status=status.HTTP_204_NO_CONTENT)
     
     def destroy(self, request, *args, **kwargs):
@@ -79,16 +88,18 @@ class ProductoViewSet(viewsets.ModelViewSet):
         # Obtener motivo del request.data
         motivo = request.data.get('motivo', 'Eliminación sin motivo especificado')
         
-        # Crear log de auditoría ANTES de eliminar
-        LogAuditoria.objects.create(
-            modelo_afectado='Producto',
-            objeto_id=producto.id,
-            descripcion_objeto=f"{producto.nombre} - ${producto.precio}",
-            motivo=motivo,
-            usuario=request.user
-        )
-        
-        # Eliminar el producto
-        producto.delete()
+        # Si la eliminación falla, la entrada de auditoría se revierte con ella
+        with transaction.atomic():
+            # Crear log de auditoría ANTES de eliminar
+            registrar_log_eliminacion(
+                modelo_afectado='Producto',
+                objeto_id=producto.id,
+                descripcion_objeto=f"{producto.nombre} - ${producto.precio}",
+                motivo=motivo,
+                usuario=request.user
+            )
+
+            # Eliminar el producto
+            producto.delete()
         
         return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""
+Autenticación por token con caché.
+
+TokenAuthentication de DRF consulta Token + User en cada petición. Esta clase
+guarda token -> usuario y la foto del usuario en la caché de Django (ver
+cache.py) y reconstruye request.user desde la foto, sin consultas, mientras
+las entradas estén vigentes. El estado activo y el rol salen de esa misma foto.
+
+Los contadores de aciertos/fallos son del proceso (cada worker de gunicorn
+tiene los suyos); se consultan en /api/usuarios/cache-tokens/.
+"""
+
+import threading
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from . import cache as cache_usuarios
+
+
+class ContadoresCache:
+    """Aciertos y fallos de la caché de tokens en este proceso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.aciertos = 0
+            self.fallos = 0
+
+    def registrar(self, acierto):
+        with self._lock:
+            if acierto:
+                self.aciertos += 1
+            else:
+                self.fallos += 1
+
+    def resumen(self):
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': round(self.aciertos / total, 4) if total else None,
+            }
+
+
+contadores = ContadoresCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication con caché. Un acierto (token y usuario en caché) no
+    consulta la base de datos; un fallo hace la consulta de DRF y guarda el resultado.
+    """
+
+    def authenticate_credentials(self, key):
+        user_id = cache_usuarios.usuario_de_token(key)
+        foto = cache_usuarios.foto_en_cache(user_id) if user_id is not None else None
+        if foto is not None:
+            contadores.registrar(acierto=True)
+            if not foto or not foto['is_active']:
+                raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+            usuario = cache_usuarios.usuario_desde_foto(foto)
+            return (usuario, self.get_model()(key=key, user=usuario))
+
+        contadores.registrar(acierto=False)
+        usuario, token = super().authenticate_credentials(key)
+        cache_usuarios.guardar_token(key, usuario.pk)
+        cache_usuarios.guardar_foto(usuario)
+        return (usuario, token)
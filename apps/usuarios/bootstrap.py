@@ -0,0 +1,129 @@
+"""
+Datos de arranque del frontend (/api/bootstrap/).
+
+Reúne en una respuesta lo que la SPA pedía en cinco llamadas al iniciar
+sesión: el usuario, los módulos a los que tiene acceso (según politicas.py),
+un catálogo compacto de productos y clientes y las métricas del panel.
+
+Catálogo versionado: cada parte (productos, clientes) tiene una versión en
+caché que cambia cuando se guarda o elimina una fila (ver signals.py). La
+copia del catálogo se guarda bajo una clave que incluye la versión, así que un
+cambio deja de servir la copia anterior sin borrarla ni recalcular nada más.
+El ETag del catálogo se deriva de las versiones de sus partes: si el cliente
+envía If-None-Match con el ETag vigente, el catálogo no se vuelve a enviar.
+
+Las versiones solo sirven si todos los procesos las ven cambiar: un cambio
+hecho en un worker tiene que invalidar el ETag en los demás. Por eso el
+catálogo versionado requiere la caché compartida (settings.CACHE_CATALOGO,
+activo por defecto solo con REDIS_URL); sin ella las filas se leen de la base
+de datos en cada petición y no se envía ETag.
+"""
+
+import hashlib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.clientes.models import Cliente
+from apps.facturacion.resumenes import metricas_en_cache
+from apps.productos.models import Producto
+from .models import User
+from .politicas import MODULOS_API, modulos_permitidos
+
+CATALOGO_TTL = getattr(settings, 'CATALOGO_TTL', 3600)
+METRICAS_DIAS = 7
+
+# Parte del catálogo -> (módulo de la política que da acceso, campos)
+CATALOGO = {
+    'productos': ('productos', ('id', 'nombre', 'precio', 'stock')),
+    'clientes': ('clientes', ('id', 'nombre', 'email', 'activo')),
+}
+_MODELOS = {'productos': Producto, 'clientes': Cliente}
+
+
+def versionado():
+    """Si se usan versiones y ETag (settings.CACHE_CATALOGO; se lee en cada llamada)."""
+    return getattr(settings, 'CACHE_CATALOGO', False)
+
+
+def _filas(parte):
+    _, campos = CATALOGO[parte]
+    filas = _MODELOS[parte].objects.order_by('id').values_list(*campos)
+    return {'campos': list(campos), 'filas': [list(fila) for fila in filas]}
+
+
+def _clave_version(parte):
+    return f"catalogo:version:{parte}"
+
+
+def marcar_cambio(parte):
+    """Nueva versión de la parte del catálogo; la copia anterior deja de usarse."""
+    cache.set(_clave_version(parte), time.time_ns(), None)
+
+
+def versiones(partes):
+    """{parte: versión}. Si la caché perdió una versión se crea una nueva (nunca se reutiliza una anterior)."""
+    claves = {parte: _clave_version(parte) for parte in partes}
+    guardadas = cache.get_many(claves.values())
+    resultado = {}
+    for parte, clave in claves.items():
+        if clave not in guardadas:
+            cache.add(clave, time.time_ns(), None)
+            guardadas[clave] = cache.get(clave)
+        resultado[parte] = guardadas[clave]
+    return resultado
+
+
+def etag_catalogo(versiones_partes):
+    firma = ';'.join(f"{parte}={version}" for parte, version in sorted(versiones_partes.items()))
+    return '"' + hashlib.sha1(firma.encode()).hexdigest()[:20] + '"'
+
+
+def parte_catalogo(parte, version):
+    """{'campos': [...], 'filas': [[...], ...]} de la parte en la versión indicada."""
+    clave = f"catalogo:{parte}:{version}"
+    datos = cache.get(clave)
+    if datos is None:
+        datos = _filas(parte)
+        cache.set(clave, datos, CATALOGO_TTL)
+    return datos
+
+
+def catalogo(usuario, if_none_match=None):
+    """
+    Catálogo de las partes a las que el usuario tiene acceso, con su ETag.
+    Si `if_none_match` coincide con el ETag, se omiten las filas ('sin_cambios').
+    Sin catálogo versionado, etag es None y las filas se leen siempre.
+    """
+    permitidos = modulos_permitidos(usuario, [modulo for modulo, _ in CATALOGO.values()])
+    partes = [parte for parte, (modulo, _) in CATALOGO.items() if modulo in permitidos]
+    if not versionado():
+        return {'etag': None, 'sin_cambios': False, **{parte: _filas(parte) for parte in partes}}
+    actuales = versiones(partes)
+    etag = etag_catalogo(actuales)
+    if if_none_match == etag:
+        return {'etag': etag, 'sin_cambios': True}
+    return {
+        'etag': etag,
+        'sin_cambios': False,
+        **{parte: parte_catalogo(parte, version) for parte, version in actuales.items()},
+    }
+
+
+def datos_arranque(usuario, if_none_match=None):
+    """Módulos permitidos, roles (solo Administradores), catálogo y métricas del panel del usuario."""
+    modulos = modulos_permitidos(usuario, MODULOS_API)
+    datos = {
+        'modulos': modulos,
+        'catalogo': catalogo(usuario, if_none_match),
+        'metricas': None,
+    }
+    if 'usuarios' in modulos:
+        datos['roles'] = [{'value': valor, 'label': etiqueta} for valor, etiqueta in User.ROLE_CHOICES]
+    if 'facturas' in modulos:
+        hasta = timezone.localdate()
+        datos['metricas'] = metricas_en_cache(hasta - timedelta(days=METRICAS_DIAS - 1), hasta)
+    return datos
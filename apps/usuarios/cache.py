@@ -0,0 +1,125 @@
+"""
+Caché de usuarios para la autenticación y el control de acceso.
+
+- Foto del usuario: todos sus campos salvo la contraseña (incluidos is_active y
+  role), o False si fue eliminado. La usan CheckUserIsActiveMiddleware
+  (estado_usuario) y CachedTokenAuthentication (usuario_en_cache), así que el
+  estado activo y el rol salen siempre de la misma entrada. Dura
+  ESTADO_USUARIO_TTL segundos.
+- Token -> id de usuario: TOKEN_CACHE_TTL segundos. La clave de caché usa el
+  hash del token, no el token.
+
+Las señales de signals.py borran las entradas en cuanto un usuario o un token
+se guarda o se elimina (toggle_active, eliminar-con-motivo, generar-token-permiso,
+admin), así que una desactivación se aplica en la siguiente petición.
+
+Los cambios hechos con QuerySet.update() no envían señales: después de uno,
+llamar a invalidar_usuario() con los usuarios afectados.
+
+La invalidación solo alcanza a los procesos que comparten el backend de caché.
+Por eso la caché requiere uno compartido (Redis, REDIS_URL en settings) y solo
+se usa con settings.CACHE_USUARIOS, que por defecto está activo únicamente
+cuando lo hay. Con LocMemCache (una copia por proceso) un usuario desactivado
+seguiría autenticándose en los demás procesos hasta que venciera su entrada,
+así que sin caché compartida se consulta siempre la base de datos.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+ESTADO_USUARIO_TTL = getattr(settings, 'ESTADO_USUARIO_TTL', 60)
+TOKEN_CACHE_TTL = getattr(settings, 'TOKEN_CACHE_TTL', 300)
+
+ACTIVO = 'ACTIVO'
+INACTIVO = 'INACTIVO'
+ELIMINADO = 'ELIMINADO'
+
+
+def habilitada():
+    """Si se usa la caché (settings.CACHE_USUARIOS; se lee en cada llamada)."""
+    return getattr(settings, 'CACHE_USUARIOS', False)
+
+
+def _clave_usuario(user_id):
+    return f"usuario:foto:{user_id}"
+
+
+def _clave_token(key):
+    return f"usuario:token:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def _campos_foto():
+    """Columnas guardadas en la foto, en el orden de los campos del modelo."""
+    return [campo.attname for campo in get_user_model()._meta.concrete_fields if campo.attname != 'password']
+
+
+def foto_de(usuario):
+    return {campo: getattr(usuario, campo) for campo in _campos_foto()}
+
+
+def guardar_foto(usuario):
+    if not habilitada():
+        return
+    cache.set(_clave_usuario(usuario.pk), foto_de(usuario), ESTADO_USUARIO_TTL)
+
+
+def foto_en_cache(user_id):
+    """Foto en caché (dict, o False si fue eliminado), o None si no está."""
+    if not habilitada():
+        return None
+    return cache.get(_clave_usuario(user_id))
+
+
+def foto_usuario(user_id):
+    """Foto del usuario (dict), o False si fue eliminado; consulta la base de datos si no está en caché."""
+    foto = foto_en_cache(user_id)
+    if foto is None:
+        foto = get_user_model().objects.filter(pk=user_id).values(*_campos_foto()).first() or False
+        if habilitada():
+            cache.set(_clave_usuario(user_id), foto, ESTADO_USUARIO_TTL)
+    return foto
+
+
+def usuario_desde_foto(foto):
+    """
+    Instancia de User a partir de la foto, sin consultar la base de datos.
+    La contraseña queda diferida: se carga solo si se accede a ella, y save()
+    guarda únicamente los campos cargados.
+    """
+    modelo = get_user_model()
+    campos = _campos_foto()
+    return modelo.from_db('default', campos, [foto[campo] for campo in campos])
+
+
+def estado_usuario(user_id):
+    """ACTIVO, INACTIVO o ELIMINADO según la foto en caché."""
+    foto = foto_usuario(user_id)
+    if not foto:
+        return ELIMINADO
+    return ACTIVO if foto['is_active'] else INACTIVO
+
+
+def usuario_de_token(key):
+    """Id del usuario del token en caché, o None si no está."""
+    if not habilitada():
+        return None
+    return cache.get(_clave_token(key))
+
+
+def guardar_token(key, user_id):
+    if not habilitada():
+        return
+    cache.set(_clave_token(key), user_id, TOKEN_CACHE_TTL)
+
+
+def invalidar_usuario(*user_ids):
+    """Borra la foto en caché de los usuarios indicados."""
+    cache.delete_many([_clave_usuario(user_id) for user_id in user_ids])
+
+
+def invalidar_token(*keys):
+    """Borra los tokens indicados de la caché."""
+    cache.delete_many([_clave_token(key) for key in keys])
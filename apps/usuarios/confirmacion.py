@@ -0,0 +1,98 @@
+"""
+Confirmación reforzada (step-up) para operaciones críticas.
+
+validate_password comprueba la contraseña (hash costoso) y emite un token de
+confirmación firmado para un alcance ('eliminar'), válido durante
+STEP_UP_TTL segundos. Las acciones críticas (eliminar-con-motivo) aceptan ese
+token en la cabecera X-Confirmacion o en el campo 'confirmacion' del cuerpo:
+verificarlo es una comprobación de firma y la lectura de una columna del
+usuario por clave primaria, sin volver a calcular el hash de la contraseña.
+
+El token contiene el id del usuario, el alcance y un identificador aleatorio.
+El identificador vigente de cada alcance se guarda en User.confirmaciones, en
+la base de datos, de modo que todos los procesos ven el mismo (no depende de
+que la caché sea compartida). Validar la contraseña otra vez reemplaza el
+token anterior, y guardar o eliminar el usuario (cambio de contraseña, de rol,
+desactivación) los revoca todos (ver signals.py).
+
+Con STEP_UP_REQUERIDO = False (por defecto) las acciones siguen aceptando
+peticiones sin token, pero un token inválido o caducado se rechaza siempre.
+"""
+
+import secrets
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.db import transaction
+from rest_framework.exceptions import PermissionDenied
+
+STEP_UP_TTL = getattr(settings, 'STEP_UP_TTL', 300)
+STEP_UP_REQUERIDO = getattr(settings, 'STEP_UP_REQUERIDO', False)
+
+ELIMINAR = 'eliminar'
+ALCANCES = (ELIMINAR,)
+
+CABECERA = 'HTTP_X_CONFIRMACION'
+CAMPO = 'confirmacion'
+
+_SALT = 'apps.usuarios.confirmacion'
+
+
+class ConfirmacionRequerida(PermissionDenied):
+    default_detail = 'Esta operación requiere confirmar la contraseña.'
+    default_code = 'confirmacion_requerida'
+
+
+class ConfirmacionInvalida(PermissionDenied):
+    default_detail = 'La confirmación no es válida o ha caducado. Vuelva a confirmar la contraseña.'
+    default_code = 'confirmacion_invalida'
+
+
+def _vigentes(user_id):
+    return get_user_model().objects.filter(pk=user_id).values_list('confirmaciones', flat=True).first() or {}
+
+
+def emitir(usuario, alcance=ELIMINAR):
+    """Token de confirmación para `usuario` y `alcance`; reemplaza al anterior del mismo alcance."""
+    if alcance not in ALCANCES:
+        raise ValueError(f"Alcance desconocido: {alcance}")
+    identificador = secrets.token_urlsafe(16)
+    usuarios = get_user_model().objects.filter(pk=usuario.pk)
+    # update() no envía post_save: registrar el token no lo revoca
+    with transaction.atomic():
+        vigentes = usuarios.select_for_update().values_list('confirmaciones', flat=True).first() or {}
+        usuarios.update(confirmaciones={**vigentes, alcance: identificador})
+    return signing.dumps({'u': usuario.pk, 'a': alcance, 'j': identificador}, salt=_SALT)
+
+
+def es_valido(token, usuario, alcance):
+    """True si el token es de `usuario`, para `alcance`, no ha caducado y no fue revocado."""
+    try:
+        datos = signing.loads(token, salt=_SALT, max_age=STEP_UP_TTL)
+    except signing.BadSignature:
+        return False
+    if datos.get('u') != usuario.pk or datos.get('a') != alcance:
+        return False
+    return secrets.compare_digest(_vigentes(usuario.pk).get(alcance, ''), datos.get('j', ''))
+
+
+def verificar(request, alcance=ELIMINAR):
+    """
+    Comprueba el token de confirmación de la petición para `alcance`.
+    Devuelve True si es válido y False si no se envió (y no es obligatorio);
+    lanza ConfirmacionInvalida o ConfirmacionRequerida en otro caso.
+    """
+    token = request.META.get(CABECERA) or request.data.get(CAMPO)
+    if not token:
+        if STEP_UP_REQUERIDO:
+            raise ConfirmacionRequerida()
+        return False
+    if not es_valido(token, request.user, alcance):
+        raise ConfirmacionInvalida()
+    return True
+
+
+def revocar(user_id):
+    """Revoca todos los tokens de confirmación del usuario."""
+    get_user_model().objects.filter(pk=user_id).update(confirmaciones={})
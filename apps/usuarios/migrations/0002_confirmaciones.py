@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='confirmaciones',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -15,6 +15,8 @@ class User(AbstractUser):
     ]
 
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, blank=True, null=True)
+    # Identificador del token de confirmación vigente por alcance (ver confirmacion.py)
+    confirmaciones = models.JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self):
         return f'{self.username} ({self.role})'
@@ -0,0 +1,160 @@
+"""
+Política de autorización única del sistema.
+
+POLITICAS declara, por módulo, qué roles tienen acceso completo y cuáles solo
+lectura. Al importar el módulo se compila en TABLA, un dict
+(módulo, método HTTP, rol) -> Decision, de modo que cada petición se autoriza
+con una sola búsqueda y sin consultas. La usan:
+- RoleBasedAccessMiddleware (vistas HTML y /api/ con sesión), vía modulo_de_ruta().
+- Los permisos de DRF de permissions.py (PoliticaPermission y sus subclases).
+- El decorador politica_requerida de decorators.py.
+
+Las reglas sobre un objeto concreto (creador o Administrador) comparan
+creador_id con el id del usuario, sin cargar la fila del creador.
+"""
+
+from typing import NamedTuple
+
+from .models import User
+
+LECTURA = ('GET', 'HEAD', 'OPTIONS')
+METODOS = LECTURA + ('POST', 'PUT', 'PATCH', 'DELETE')
+ROLES = tuple(valor for valor, _ in User.ROLE_CHOICES)
+
+# Módulo -> roles con acceso completo, roles de solo lectura y mensajes de denegación.
+# Si no se indica 'mensaje', se genera a partir de los roles.
+POLITICAS = {
+    # API REST
+    'clientes': {
+        'completo': (User.ADMINISTRADOR, User.SECRETARIO),
+        'lectura': (User.VENTAS,),
+        'mensaje': "Solo los Administradores, Secretarios y personal de Ventas (solo lectura) "
+                   "pueden acceder al módulo de Clientes",
+        'mensaje_lectura': "El personal de Ventas solo puede consultar información de clientes (solo lectura)",
+    },
+    'productos': {
+        'completo': (User.ADMINISTRADOR, User.BODEGA),
+        'lectura': (User.VENTAS,),
+        'mensaje': "Solo los Administradores, personal de Bodega y personal de Ventas (solo lectura) "
+                   "pueden acceder al módulo de Productos",
+        'mensaje_lectura': "El personal de Ventas solo puede consultar información de productos (solo lectura)",
+    },
+    'facturas': {
+        'completo': (User.ADMINISTRADOR, User.VENTAS),
+        'mensaje': "Solo los Administradores y personal de Ventas pueden acceder al módulo de Facturación",
+    },
+    'contabilidad': {
+        'completo': (User.ADMINISTRADOR,),
+        'mensaje': "Solo los Administradores pueden acceder a la exportación contable",
+    },
+    'analitica': {
+        'completo': (User.ADMINISTRADOR,),
+        'mensaje': "Solo los Administradores pueden acceder a la analítica de ventas",
+    },
+    'usuarios': {
+        'completo': (User.ADMINISTRADOR,),
+        'mensaje': "Solo los Administradores pueden realizar esta acción",
+    },
+    # Vistas HTML
+    'web_inicio': {
+        'completo': (User.VENTAS, User.ADMINISTRADOR),
+        'mensaje': "No tienes permiso para acceder a esta página.",
+    },
+    'web_clientes': {'completo': (User.ADMINISTRADOR, User.SECRETARIO)},
+    'web_productos': {'completo': (User.ADMINISTRADOR, User.BODEGA)},
+    'web_facturacion': {'completo': (User.ADMINISTRADOR, User.VENTAS)},
+}
+
+# Módulos de la API REST (los demás son de las vistas HTML)
+MODULOS_API = ('clientes', 'productos', 'facturas', 'contabilidad', 'analitica', 'usuarios')
+
+# Prefijo de la URL (primer segmento, o los dos primeros bajo /api/) -> módulo
+RUTAS = {
+    'clientes': 'web_clientes',
+    'productos': 'web_productos',
+    'facturacion': 'web_facturacion',
+    'api/clientes': 'clientes',
+    'api/productos': 'productos',
+    'api/facturas': 'facturas',
+    'api/usuarios': 'usuarios',
+    'api/analitica': 'analitica',
+}
+
+
+class Decision(NamedTuple):
+    permitido: bool
+    mensaje: str = ''
+
+
+PERMITIDO = Decision(True)
+
+
+def _mensaje_por_defecto(politica):
+    roles = politica['completo'] + politica.get('lectura', ())
+    return f"No tienes permiso para acceder a este módulo. Rol requerido: {', '.join(roles)}"
+
+
+def compilar(politicas):
+    """(módulo, método, rol) -> Decision para todas las combinaciones declaradas."""
+    tabla = {}
+    for modulo, politica in politicas.items():
+        denegado = Decision(False, politica.get('mensaje') or _mensaje_por_defecto(politica))
+        solo_lectura = Decision(False, politica.get('mensaje_lectura') or denegado.mensaje)
+        for metodo in METODOS:
+            for rol in ROLES + (None,):
+                if rol in politica['completo']:
+                    decision = PERMITIDO
+                elif rol in politica.get('lectura', ()):
+                    decision = PERMITIDO if metodo in LECTURA else solo_lectura
+                else:
+                    decision = denegado
+                tabla[modulo, metodo, rol] = decision
+    return tabla
+
+
+TABLA = compilar(POLITICAS)
+_DENEGADO = {modulo: TABLA[modulo, 'GET', None] for modulo in POLITICAS}
+
+
+def decidir(usuario, modulo, metodo):
+    """Decision para que `usuario` (autenticado) use `metodo` en `modulo`."""
+    if usuario.is_superuser:
+        return PERMITIDO
+    return TABLA.get((modulo, metodo, usuario.role)) or _DENEGADO[modulo]
+
+
+def modulos_permitidos(usuario, modulos=None):
+    """{módulo: 'completo' | 'lectura'} de los módulos a los que el usuario tiene acceso."""
+    permitidos = {}
+    for modulo in modulos or POLITICAS:
+        if decidir(usuario, modulo, 'POST').permitido:
+            permitidos[modulo] = 'completo'
+        elif decidir(usuario, modulo, 'GET').permitido:
+            permitidos[modulo] = 'lectura'
+    return permitidos
+
+
+def modulo_de_ruta(ruta):
+    """Módulo al que pertenece la ruta, o None si no está sujeta a la política."""
+    segmentos = ruta.strip('/').split('/', 2)
+    clave = '/'.join(segmentos[:2]) if segmentos[0] == 'api' else segmentos[0]
+    return RUTAS.get(clave)
+
+
+def decidir_peticion(request, modulo):
+    """
+    decidir() para el usuario y método de la petición, guardando el resultado
+    en la petición: el middleware y la vista comparten una sola decisión.
+    """
+    # En DRF se guarda en la HttpRequest original, la misma que ve el middleware
+    base = getattr(request, '_request', request)
+    decisiones = base.__dict__.setdefault('_decisiones_politica', {})
+    clave = (modulo, request.user.pk)
+    if clave not in decisiones:
+        decisiones[clave] = decidir(request.user, modulo, request.method)
+    return decisiones[clave]
+
+
+def es_creador_o_administrador(usuario, creador_id):
+    """Regla de objeto: superusuario, Administrador o creador (por id, sin consultas)."""
+    return usuario.is_superuser or usuario.role == User.ADMINISTRADOR or creador_id == usuario.pk
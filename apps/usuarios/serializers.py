@@ -1,9 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import authenticate
+from facturacion_segura.campos import CamposDinamicosMixin
 from .models import User
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer para el modelo User"""
     password = serializers.CharField(write_only=True, required=False)
     confirm_password = serializers.CharField(write_only=True, required=False)
@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from apps.clientes.models import Cliente
+from apps.productos.models import Producto
+
+from .cache import invalidar_token, invalidar_usuario
+from .bootstrap import marcar_cambio
+from .confirmacion import revocar as revocar_confirmaciones
+
+User = get_user_model()
+
+
+def _invalidar(funcion, valor):
+    """
+    Invalida ya y otra vez al confirmar la transacción, para que una petición
+    concurrente no vuelva a guardar en caché el estado anterior.
+    """
+    funcion(valor)
+    transaction.on_commit(lambda: funcion(valor))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidar_usuario_en_cache(sender, instance, **kwargs):
+    """Borra la foto en caché del usuario (estado activo, rol, etc.)."""
+    _invalidar(invalidar_usuario, instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def revocar_confirmaciones_usuario(sender, instance, update_fields=None, **kwargs):
+    """Revoca los tokens de confirmación; no al registrar solo el último acceso."""
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    revocar_confirmaciones(instance.pk)
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidar_token_en_cache(sender, instance, **kwargs):
+    """Borra el token de la caché al crearlo, rotarlo o eliminarlo."""
+    _invalidar(invalidar_token, instance.key)
+
+
+@receiver(post_save, sender=Producto)
+@receiver(post_delete, sender=Producto)
+def nueva_version_productos(sender, **kwargs):
+    """Versión nueva del catálogo de productos de /api/bootstrap/ (incluye cambios de stock)."""
+    _invalidar(marcar_cambio, 'productos')
+
+
+@receiver(post_save, sender=Cliente)
+@receiver(post_delete, sender=Cliente)
+def nueva_version_clientes(sender, **kwargs):
+    """Versión nueva del catálogo de clientes de /api/bootstrap/."""
+    _invalidar(marcar_cambio, 'clientes')
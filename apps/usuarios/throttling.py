@@ -0,0 +1,138 @@
+"""
+Control de carga para los endpoints costosos.
+
+- Throttles por usuario y tipo de endpoint (token bucket en la caché de Django):
+  validate_password (hash de la contraseña), PDFs (ReportLab) y métricas /
+  analítica (agregaciones). Las tasas se configuran en
+  REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] con el formato de DRF ('30/min').
+  Al superarlas DRF responde 429 con Retry-After.
+- LimiteConcurrencia: número máximo de generaciones simultáneas en el proceso
+  y por usuario. Si se supera responde 503 con Retry-After, en lugar de
+  dejar a los workers esperando a que termine otro PDF.
+"""
+
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.throttling import SimpleRateThrottle
+
+CONCURRENCIA_PDF = getattr(settings, 'CONCURRENCIA_PDF', 4)
+CONCURRENCIA_PDF_POR_USUARIO = getattr(settings, 'CONCURRENCIA_PDF_POR_USUARIO', 2)
+CONCURRENCIA_RETRY_AFTER = getattr(settings, 'CONCURRENCIA_RETRY_AFTER', 5)  # segundos
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Throttle por usuario con token bucket: la tasa 'N/periodo' permite ráfagas
+    de hasta N peticiones y repone N fichas por periodo de forma continua.
+    En caché se guardan solo (fichas, instante), no el historial de peticiones.
+    """
+    cache_format = 'throttle_%(scope)s_%(ident)s'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        fichas, instante = self.cache.get(self.key, (self.num_requests, self.now))
+        self.fichas = min(self.num_requests, fichas + (self.now - instante) * self.num_requests / self.duration)
+        if self.fichas < 1:
+            return self.throttle_failure()
+        self.fichas -= 1
+        self.cache.set(self.key, (self.fichas, self.now), self.duration)
+        return self.throttle_success()
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        """Segundos hasta que se repone la siguiente ficha."""
+        return (1 - self.fichas) * self.duration / self.num_requests
+
+
+class ValidarPasswordThrottle(TokenBucketThrottle):
+    scope = 'validar_password'
+
+
+class PdfThrottle(TokenBucketThrottle):
+    scope = 'pdf'
+
+
+class MetricasThrottle(TokenBucketThrottle):
+    scope = 'metricas'
+
+
+class ServicioOcupado(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'El servidor está generando demasiados documentos. Intente de nuevo en unos segundos.'
+    default_code = 'servicio_ocupado'
+
+    def __init__(self, wait, detail=None, code=None):
+        # El manejador de excepciones de DRF añade Retry-After a partir de `wait`
+        self.wait = wait
+        super().__init__(detail, code)
+
+
+class LimiteConcurrencia:
+    """
+    Máximo de operaciones simultáneas en el proceso (`maximo`) y por usuario
+    (`por_usuario`). Cada worker de gunicorn tiene su propio límite.
+    """
+
+    def __init__(self, maximo, por_usuario, retry_after):
+        self.maximo = maximo
+        self.por_usuario = por_usuario
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._total = 0
+        self._por_clave = defaultdict(int)
+
+    @contextmanager
+    def ocupar(self, clave):
+        with self._lock:
+            if self._total >= self.maximo or self._por_clave.get(clave, 0) >= self.por_usuario:
+                raise ServicioOcupado(wait=self.retry_after)
+            self._total += 1
+            self._por_clave[clave] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._total -= 1
+                self._por_clave[clave] -= 1
+                if not self._por_clave[clave]:
+                    del self._por_clave[clave]
+
+    def en_curso(self):
+        with self._lock:
+            return self._total
+
+
+limite_pdf = LimiteConcurrencia(CONCURRENCIA_PDF, CONCURRENCIA_PDF_POR_USUARIO, CONCURRENCIA_RETRY_AFTER)
+
+
+def con_limite(limite):
+    """Decorador para acciones de un ViewSet: ejecuta la acción dentro de `limite`."""
+    def decorator(func):
+        @wraps(func)
+        def _wrapped(self, request, *args, **kwargs):
+            with limite.ocupar(request.user.pk):
+                return func(self, request, *args, **kwargs)
+        return _wrapped
+    return decorator
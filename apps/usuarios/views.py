@@ -1,6 +1,6 @@
 from django.shortcuts import render
-from apps.usuarios.decorators import role_required
+from apps.usuarios.decorators import politica_requerida
 
-@role_required('Ventas', 'Administrador')
+@politica_requerida('web_inicio')
 def home(request):
     return render(request, 'home.html')
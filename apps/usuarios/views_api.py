@@ -1,13 +1,20 @@
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from django.contrib.auth import get_user_model, authenticate
+from django.db import transaction
 from .models import User
 from .serializers import UserSerializer
 from .permissions import AdminOnlyPermission
-from apps.auditorias.models import LogAuditoria
+from .authentication import contadores as contadores_cache_tokens
+from .throttling import ValidarPasswordThrottle
+from . import cache as cache_usuarios
+from . import confirmacion
+from .bootstrap import datos_arranque
+from facturacion_segura.campos import CamposDinamicosViewSetMixin
+from apps.auditorias.utils import registrar_log_eliminacion
 import logging
 from rest_framework.authtoken.models import Token
 
@@ -23,8 +30,21 @@ def me_view(request):
     return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def bootstrap_view(request):
+    """
+    Datos de arranque del frontend en una sola respuesta (ver bootstrap.py):
+    usuario, módulos permitidos, catálogo compacto y métricas del panel.
+    Con If-None-Match igual a catalogo.etag, el catálogo no se reenvía.
+    """
+    datos = datos_arranque(request.user, request.headers.get('If-None-Match'))
+    return Response({'usuario': UserSerializer(request.user).data, **datos})
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([ValidarPasswordThrottle])
 def validate_password(request):
     """
     Endpoint para validar la contraseña del usuario autenticado.
@@ -32,22 +52,31 @@ def validate_password(request):
     
     Request Body:
     {
-        "password": "contraseña_del_usuario"
+        "password": "contraseña_del_usuario",
+        "alcance": "eliminar"            (opcional)
     }
     
     Response:
-    - 200: Contraseña válida
+    - 200: Contraseña válida, con un token de confirmación para el alcance
+      (ver confirmacion.py) que evita repetir la validación en cada operación
     - 400: Datos inválidos o contraseña incorrecta
     - 401: Usuario no autenticado
     """
     try:
         password = request.data.get('password')
+        alcance = request.data.get('alcance') or confirmacion.ELIMINAR
         
         if not password:
             return Response({
                 'error': 'La contraseña es requerida',
                 'valid': False
             }, status=status.HTTP_400_BAD_REQUEST)
+
+        if alcance not in confirmacion.ALCANCES:
+            return Response({
+                'error': f"Alcance no válido. Opciones: {', '.join(confirmacion.ALCANCES)}",
+                'valid': False
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         # Validar la contraseña usando authenticate
         user = authenticate(
@@ -67,6 +96,11 @@ def validate_password(request):
                     'username': request.user.username,
                     'email': request.user.email,
                     'role': getattr(request.user, 'role', None)
+                },
+                'confirmacion': {
+                    'token': confirmacion.emitir(request.user, alcance),
+                    'alcance': alcance,
+                    'expira_en': confirmacion.STEP_UP_TTL,
                 }
             }, status=status.HTTP_200_OK)
         
@@ -87,7 +121,7 @@ def validate_password(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(CamposDinamicosViewSetMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión de usuarios.
     Solo accesible por Administradores.
@@ -97,11 +131,8 @@ class UserViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, AdminOnlyPermission]
 
     def get_queryset(self):
-        """Solo administradores pueden ver la lista de usuarios"""
-        user = self.request.user
-        if user.is_superuser or user.role == 'Administrador':
-            return User.objects.all()
-        return User.objects.none()
+        """El acceso solo de Administradores ya lo resolvió AdminOnlyPermission."""
+        return self.optimizar_campos(User.objects.all())
 
     @action(detail=True, methods=['post'])
     def toggle_active(self, request, pk=None):
@@ -142,6 +173,22 @@ class UserViewSet(viewsets.ModelViewSet):
             'roles': [{'value': choice[0], 'label': choice[1]} for choice in User.ROLE_CHOICES]
         })
 
+    @action(detail=False, methods=['get', 'delete'], url_path='cache-tokens')
+    def cache_tokens(self, request):
+        """
+        Aciertos y fallos de la caché de autenticación por token en este proceso.
+        DELETE reinicia los contadores.
+        """
+        if request.method == 'DELETE':
+            contadores_cache_tokens.reiniciar()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response({
+            **contadores_cache_tokens.resumen(),
+            'habilitada': cache_usuarios.habilitada(),
+            'ttl_token': cache_usuarios.TOKEN_CACHE_TTL,
+            'ttl_usuario': cache_usuarios.ESTADO_USUARIO_TTL,
+        })
+
     @action(detail=True, methods=['post'], url_path='eliminar-con-motivo')
     def eliminar_con_motivo(self, request, pk=None):
         """
@@ -157,15 +204,19 @@ class UserViewSet(viewsets.ModelViewSet):
         if user_to_delete == request.user:
             return Response({'error': 'No puedes eliminarte a ti mismo.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        LogAuditoria.objects.create(
-            modelo_afectado='Usuario',
-            objeto_id=user_to_delete.id,
-            descripcion_objeto=str(user_to_delete),
-            motivo=motivo,
-            usuario=request.user
-        )
+        confirmacion.verificar(request, confirmacion.ELIMINAR)
 
-        user_to_delete.delete()
+        # Si la eliminación falla, la entrada de auditoría se revierte con ella
+        with transaction.atomic():
+            registrar_log_eliminacion(
+                modelo_afectado='Usuario',
+                objeto_id=user_to_delete.id,
+                descripcion_objeto=str(user_to_delete),
+                motivo=motivo,
+                usuario=request.user
+            )
+
+            user_to_delete.delete()
         return Response({'mensaje': 'Usuario eliminado y registrado en auditoría.'}, status=status.HTTP_204_NO_CONTENT)
     
     @action(detail=True, methods=['post'], url_path='generar-token-permiso')
@@ -173,9 +224,6 @@ class UserViewSet(viewsets.ModelViewSet):
         """
         Permite al administrador asignar o cambiar rol y generar token de acceso para un usuario.
         """
-        if not request.user.is_superuser and request.user.role != User.ADMINISTRADOR:
-            return Response({'error': 'No autorizado'}, status=status.HTTP_403_FORBIDDEN)
-
         usuario_objetivo = self.get_object()
         nuevo_rol = request.data.get('role')
         if nuevo_rol is None or nuevo_rol == '':
@@ -0,0 +1,89 @@
+"""
+Benchmark: analítica de ventas con NumPy (apps/facturacion/analitica.py).
+
+Mide por separado:
+- la carga de líneas desde la base de datos (cargar_lineas), y
+- los cálculos vectorizados sobre columnas sintéticas del tamaño indicado
+  (por defecto 10 millones de líneas), sin pasar por la base de datos.
+
+Uso:
+    python benchmarks/bench_analitica.py [--facturas 20000] [--items 5] [--sinteticas 10000000]
+"""
+
+import argparse
+import time
+
+from comun import configurar_django, base_de_datos_temporal, crear_datos_base, imprimir_tabla
+
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def columnas_sinteticas(np, lineas, productos, vendedores, dias):
+    generador = np.random.default_rng(0)
+    factura_id = np.sort(generador.integers(1, lineas // 4, lineas))
+    cantidad = generador.integers(1, 10, lineas)
+    precio = generador.integers(100, 100000, productos)
+    producto_id = generador.integers(0, productos, lineas)
+    return {
+        'factura_id': factura_id,
+        'producto_id': producto_id,
+        'creador_id': (factura_id % vendedores),
+        'dia': 739000 + (factura_id % dias),
+        'cantidad': cantidad,
+        'precio_centavos': precio[producto_id],
+        'importe_centavos': cantidad * precio[producto_id],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--facturas', type=int, default=20000)
+    parser.add_argument('--items', type=int, default=5)
+    parser.add_argument('--sinteticas', type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    configurar_django()
+    import numpy as np
+    from django.utils import timezone
+    from apps.facturacion import analitica
+    from apps.facturacion.models import Factura, FacturaItem
+
+    filas = []
+    with base_de_datos_temporal():
+        usuario, cliente, productos = crear_datos_base(args.items)
+        facturas = Factura.objects.bulk_create(
+            [Factura(creador=usuario, cliente=cliente, estado='EMITIDA') for _ in range(args.facturas)],
+            batch_size=1000,
+        )
+        FacturaItem.objects.bulk_create([
+            FacturaItem(factura=factura, producto=producto, cantidad=1)
+            for factura in facturas
+            for producto in productos
+        ], batch_size=5000)
+        hoy = timezone.localdate()
+        lineas, segundos = cronometrar(lambda: analitica.cargar_lineas(hoy, hoy))
+        filas.append(('cargar_lineas (base de datos)', f"{len(lineas['cantidad']):,}", f"{segundos * 1000:.0f}"))
+
+    sinteticas, segundos = cronometrar(
+        lambda: columnas_sinteticas(np, args.sinteticas, productos=5000, vendedores=50, dias=365)
+    )
+    calculos = [
+        ('ingresos_producto_semana', lambda: analitica.ingresos_producto_semana(sinteticas, top=10)),
+        ('distribucion_canasta', lambda: analitica.distribucion_canasta(sinteticas)),
+        ('rendimiento_vendedores', lambda: analitica.rendimiento_vendedores(sinteticas, top=10)),
+    ]
+    for nombre, calcular in calculos:
+        _, segundos = cronometrar(calcular)
+        filas.append((nombre, f"{args.sinteticas:,}", f"{segundos * 1000:.0f}"))
+
+    print(f"{args.facturas} facturas con {args.items} ítems en base de datos; "
+          f"{args.sinteticas:,} líneas sintéticas para los cálculos\n")
+    imprimir_tabla(filas, ('Operación', 'líneas', 'ms'))
+
+
+if __name__ == '__main__':
+    main()
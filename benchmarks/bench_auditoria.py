@@ -0,0 +1,102 @@
+"""
+Benchmark: consulta del log de auditoría (/api/logs/) sobre varios años de registros.
+
+Mide la respuesta completa de la API (consulta, serialización y JSON) para la
+primera página, una página profunda (siguiendo el cursor) y los filtros por
+modelo, usuario, objeto, rango de fechas y texto. Cada consulta se mide con todo
+el log en la tabla y después de archivar lo anterior a --retencion días
+(apps/auditorias/archivo.py), cuando la API mezcla tabla y segmentos.
+
+Uso:
+    python benchmarks/bench_auditoria.py [--registros 300000] [--anios 3] [--page-size 50] [--retencion 90]
+"""
+
+import argparse
+import random
+import tempfile
+from datetime import timedelta
+
+from comun import configurar_django, base_de_datos_temporal, medir, imprimir_tabla
+
+MODELOS = ('Factura', 'Cliente', 'Producto', 'Usuario')
+MOTIVOS = ('Registro duplicado', 'Baja solicitada por el cliente', 'Error de digitación', 'Producto descontinuado')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--registros', type=int, default=300_000)
+    parser.add_argument('--anios', type=int, default=3)
+    parser.add_argument('--usuarios', type=int, default=20)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--repeticiones', type=int, default=20)
+    parser.add_argument('--retencion', type=int, default=90, help="Días que quedan en la tabla al archivar")
+    args = parser.parse_args()
+
+    configurar_django()
+    from django.contrib.auth import get_user_model
+    from django.test import override_settings
+    from django.utils import timezone
+    from rest_framework.test import APIClient
+    from apps.auditorias.archivo import archivar
+    from apps.auditorias.escritor import entrada_auditoria, insertar
+
+    User = get_user_model()
+    with base_de_datos_temporal():
+        usuarios = [
+            User.objects.create_user(username=f'usuario{i}', password='benchmark123', role='Administrador')
+            for i in range(args.usuarios)
+        ]
+        # Las entradas se insertan encadenadas (ver cadena.py), de la más antigua a la más reciente
+        azar = random.Random(0)
+        fin = timezone.now()
+        segundos_rango = args.anios * 365 * 86400
+        fechas = sorted(fin - timedelta(seconds=azar.randrange(segundos_rango)) for _ in range(args.registros))
+        entradas = []
+        for i, fecha in enumerate(fechas):
+            entrada = entrada_auditoria(azar.choice(usuarios), azar.choice(MODELOS), i, f'Objeto {i}', azar.choice(MOTIVOS))
+            entrada['fecha_eliminacion'] = fecha
+            entradas.append(entrada)
+        for inicio in range(0, len(entradas), 5000):
+            insertar(entradas[inicio:inicio + 5000])
+
+        client = APIClient()
+        client.force_authenticate(user=usuarios[0])
+        base = f'/api/logs/?page_size={args.page_size}'
+
+        def casos():
+            # Cursor de una página profunda: se avanza unas cuantas páginas desde el inicio
+            siguiente = client.get(base).data['next']
+            for _ in range(20):
+                siguiente = client.get(siguiente).data['next']
+            hasta = timezone.localdate()
+            desde = hasta - timedelta(days=30)
+            antiguo = hasta - timedelta(days=args.anios * 365 - 60)
+            return [
+                ('Primera página', base),
+                ('Página 21 (cursor)', siguiente),
+                ('?modelo=Cliente', f'{base}&modelo=Cliente'),
+                ('?usuario=<id>', f'{base}&usuario={usuarios[1].id}'),
+                ('?objeto=<id antiguo>', f'{base}&objeto={args.registros // 2}'),
+                ('?desde/?hasta (30 días)', f'{base}&desde={desde}&hasta={hasta}'),
+                ('?desde/?hasta (30 días, hace años)', f'{base}&desde={antiguo - timedelta(days=30)}&hasta={antiguo}'),
+                ('?q=duplicado', f'{base}&q=duplicado'),
+            ]
+
+        def medir_casos():
+            return [(nombre, medir(lambda: client.get(url), args.repeticiones)) for nombre, url in casos()]
+
+        en_tabla = medir_casos()
+        with tempfile.TemporaryDirectory() as directorio, override_settings(AUDITORIA_ARCHIVO_DIR=directorio):
+            archivadas = archivar(dias=args.retencion)
+            con_archivo = medir_casos()
+        filas = [
+            (nombre, f"{antes * 1000:.1f}", f"{despues * 1000:.1f}")
+            for (nombre, antes), (_, despues) in zip(en_tabla, con_archivo)
+        ]
+
+    print(f"{args.registros:,} registros de auditoría en {args.anios} años; páginas de {args.page_size}")
+    print(f"Archivo: {archivadas:,} entradas anteriores a {args.retencion} días\n")
+    imprimir_tabla(filas, ('Consulta', 'ms (todo en tabla)', 'ms (tabla + archivo)'))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: envío masivo de facturas por correo contra un servidor SMTP local.
+
+Compara el envío uno a uno (una conexión SMTP por factura, como send_pdf
+originalmente) con el envío en lote (una sola conexión, send_messages en lotes
+y PDFs generados en paralelo al envío).
+
+Uso:
+    python benchmarks/bench_envio_lote.py [--facturas 200] [--latencia-conexion 0.05]
+"""
+
+import argparse
+
+from comun import configurar_django, base_de_datos_temporal, crear_datos_base, imprimir_tabla
+from smtp_local import ServidorSMTPLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--facturas', type=int, default=200)
+    parser.add_argument('--items', type=int, default=5)
+    parser.add_argument('--lote', type=int, default=50)
+    parser.add_argument('--latencia-conexion', type=float, default=0.05,
+                        help="Segundos que tarda el servidor en aceptar una conexión (simula TLS + AUTH)")
+    parser.add_argument('--latencia-mensaje', type=float, default=0.0)
+    args = parser.parse_args()
+
+    configurar_django()
+    import time
+    from django.test.utils import override_settings
+    from apps.facturacion.models import Factura, FacturaItem
+    from apps.facturacion.correo import (
+        seleccionar_facturas_envio, enviar_facturas_en_lote, construir_correo_factura,
+    )
+    from apps.facturacion.documentos import preparar_datos_factura, generar_pdf_factura
+
+    servidor = ServidorSMTPLocal(
+        latencia_conexion=args.latencia_conexion, latencia_mensaje=args.latencia_mensaje
+    ).iniciar_en_segundo_plano()
+    configuracion_smtp = override_settings(
+        EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+        EMAIL_HOST='127.0.0.1', EMAIL_PORT=servidor.puerto,
+        EMAIL_USE_TLS=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+    )
+
+    with base_de_datos_temporal(), configuracion_smtp:
+        usuario, cliente, productos = crear_datos_base(args.items)
+        for _ in range(args.facturas):
+            factura = Factura.objects.create(creador=usuario, cliente=cliente)
+            for producto in productos:
+                FacturaItem.objects.create(factura=factura, producto=producto, cantidad=1)
+        Factura.objects.update(estado='EMITIDA')
+        facturas = seleccionar_facturas_envio(estado='EMITIDA')
+
+        # Uno a uno: una conexión por factura
+        servidor.reiniciar_contadores()
+        inicio = time.perf_counter()
+        for factura in facturas:
+            construir_correo_factura(factura, generar_pdf_factura(preparar_datos_factura(factura))).send()
+        uno_a_uno = time.perf_counter() - inicio
+        conexiones_uno_a_uno = servidor.conexiones
+
+        # En lote: una conexión, send_messages por lotes, PDFs en pipeline
+        servidor.reiniciar_contadores()
+        inicio = time.perf_counter()
+        enviar_facturas_en_lote(facturas, tamano_lote=args.lote)
+        en_lote = time.perf_counter() - inicio
+        conexiones_en_lote = servidor.conexiones
+
+    servidor.shutdown()
+    print(f"{args.facturas} facturas con {args.items} ítems, latencia de conexión "
+          f"{args.latencia_conexion * 1000:.0f} ms\n")
+    imprimir_tabla([
+        ('Uno a uno', conexiones_uno_a_uno, f"{uno_a_uno:.2f}", f"{args.facturas / uno_a_uno:.1f}"),
+        ('En lote', conexiones_en_lote, f"{en_lote:.2f}", f"{args.facturas / en_lote:.1f}"),
+    ], ('Modo', 'Conexiones', 'Segundos', 'msg/s'))
+
+
+if __name__ == '__main__':
+    main()
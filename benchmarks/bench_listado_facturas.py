@@ -0,0 +1,67 @@
+"""
+Benchmark: listado de facturas completo (FacturaSerializer con ítems anidados)
+frente a la vista resumen (?vista=resumen, filas de .values()).
+
+Mide la respuesta completa de la API (consulta, serialización y JSON) y el
+tamaño del cuerpo de la respuesta.
+
+Uso:
+    python benchmarks/bench_listado_facturas.py [--facturas 1000] [--items 5] [--page-size 500]
+"""
+
+import argparse
+
+from comun import configurar_django, base_de_datos_temporal, medir, crear_datos_base, imprimir_tabla
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--facturas', type=int, default=1000)
+    parser.add_argument('--items', type=int, default=5)
+    parser.add_argument('--page-size', type=int, default=500)
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    configurar_django()
+    from rest_framework.test import APIClient
+    from apps.facturacion.models import Factura, FacturaItem
+
+    with base_de_datos_temporal():
+        usuario, cliente, productos = crear_datos_base(args.items)
+        facturas = Factura.objects.bulk_create(
+            [Factura(creador=usuario, cliente=cliente) for _ in range(args.facturas)]
+        )
+        FacturaItem.objects.bulk_create([
+            FacturaItem(factura=factura, producto=producto, cantidad=1)
+            for factura in facturas
+            for producto in productos
+        ])
+
+        client = APIClient()
+        client.force_authenticate(user=usuario)
+        urls = [
+            ('FacturaSerializer', f'/api/facturas/?page_size={args.page_size}'),
+            ('Vista resumen', f'/api/facturas/?vista=resumen&page_size={args.page_size}'),
+        ]
+
+        resultados = []
+        for nombre, url in urls:
+            tamano = len(client.get(url).content)
+            segundos = medir(lambda: client.get(url), args.repeticiones)
+            resultados.append((nombre, segundos, tamano))
+
+    base_segundos, base_tamano = resultados[0][1], resultados[0][2]
+    print(f"{args.facturas} facturas con {args.items} ítems, página de {args.page_size}, "
+          f"{args.repeticiones} repeticiones\n")
+    imprimir_tabla(
+        [
+            (nombre, f"{segundos * 1000:.1f}", f"{base_segundos / segundos:.1f}x",
+             f"{tamano / 1024:.1f}", f"{tamano / base_tamano:.0%}")
+            for nombre, segundos, tamano in resultados
+        ],
+        ('Representación', 'ms/página', 'vs completo', 'KiB', 'tamaño'),
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: costo de mostrar una factura como PDF (ReportLab) frente a HTML.
+
+Uso:
+    python benchmarks/bench_render_factura.py [--items 10] [--repeticiones 50]
+"""
+
+import argparse
+
+from comun import configurar_django, base_de_datos_temporal, medir, crear_datos_base, imprimir_tabla
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=10)
+    parser.add_argument('--repeticiones', type=int, default=50)
+    args = parser.parse_args()
+
+    configurar_django()
+    from django.core.cache import cache
+    from apps.facturacion.models import Factura, FacturaItem
+    from apps.facturacion.documentos import (
+        preparar_datos_factura, generar_pdf_factura, renderizar_html_factura,
+    )
+
+    with base_de_datos_temporal():
+        usuario, cliente, productos = crear_datos_base(args.items)
+        factura = Factura.objects.create(creador=usuario, cliente=cliente)
+        for producto in productos:
+            FacturaItem.objects.create(factura=factura, producto=producto, cantidad=2)
+        Factura.objects.filter(pk=factura.pk).update(estado='EMITIDA', numero_factura='FAC-000001')
+
+        def cargar():
+            return Factura.objects.select_related('cliente').get(pk=factura.pk)
+
+        def pdf():
+            generar_pdf_factura(preparar_datos_factura(cargar()))
+
+        def html_sin_cache():
+            cache.clear()
+            renderizar_html_factura(cargar())
+
+        def html_con_cache():
+            renderizar_html_factura(cargar())
+
+        resultados = [
+            ('PDF (ReportLab)', medir(pdf, args.repeticiones)),
+            ('HTML sin caché', medir(html_sin_cache, args.repeticiones)),
+            ('HTML con caché', medir(html_con_cache, args.repeticiones)),
+        ]
+
+    base = resultados[0][1]
+    print(f"Factura con {args.items} ítems, {args.repeticiones} repeticiones\n")
+    imprimir_tabla(
+        [(nombre, f"{segundos * 1000:.2f}", f"{base / segundos:.1f}x") for nombre, segundos in resultados],
+        ('Formato', 'ms/factura', 'vs PDF'),
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: verificación de la cadena de hashes del log de auditoría (apps/auditorias/cadena.py).
+
+Crea un historial encadenado de varios años y lo verifica completo una vez,
+lo que marca los puntos de control. Después añade la actividad de un día y
+compara:
+- la verificación incremental (desde el último punto de control verificado);
+- la verificación del último día (--desde);
+- la verificación completa.
+
+Uso:
+    python benchmarks/bench_verificacion_auditoria.py [--registros 300000] [--anios 3] [--dia 300]
+"""
+
+import argparse
+import random
+from datetime import timedelta
+
+from comun import configurar_django, base_de_datos_temporal, medir, imprimir_tabla
+
+MODELOS = ('Factura', 'Cliente', 'Producto', 'Usuario')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--registros', type=int, default=300_000)
+    parser.add_argument('--anios', type=int, default=3)
+    parser.add_argument('--dia', type=int, default=300, help="Entradas registradas en el último día")
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    configurar_django()
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+    from apps.auditorias.cadena import AUDITORIA_PUNTO_CONTROL, verificar
+    from apps.auditorias.escritor import entrada_auditoria, insertar
+
+    def registrar(usuario, fechas):
+        azar = random.Random(len(fechas))
+        entradas = []
+        for i, fecha in enumerate(fechas):
+            entrada = entrada_auditoria(usuario, azar.choice(MODELOS), i, f'Objeto {i}', 'Registro duplicado')
+            entrada['fecha_eliminacion'] = fecha
+            entradas.append(entrada)
+        for inicio in range(0, len(entradas), 5000):
+            insertar(entradas[inicio:inicio + 5000])
+
+    with base_de_datos_temporal():
+        usuario = get_user_model().objects.create_user(username='benchmark', password='benchmark123', role='Administrador')
+        ahora = timezone.now()
+        paso = timedelta(days=args.anios * 365) / args.registros
+        registrar(usuario, [ahora - timedelta(days=1) - paso * i for i in reversed(range(args.registros))])
+        verificar()
+
+        registrar(usuario, [ahora - timedelta(hours=23) + timedelta(seconds=i) for i in range(args.dia)])
+        ayer = ahora - timedelta(days=1)
+        filas = []
+        for nombre, funcion, repeticiones in [
+            ('Incremental (último punto verificado)', verificar, args.repeticiones),
+            ('Último día (--desde)', lambda: verificar(desde=ayer), args.repeticiones),
+            ('Completa (--completa)', lambda: verificar(completa=True), 1),
+        ]:
+            resultado = funcion()
+            assert resultado.correcta, resultado.errores
+            segundos = medir(funcion, repeticiones)
+            filas.append((nombre, f"{resultado.entradas:,}", f"{segundos * 1000:.1f}"))
+
+    print(f"{args.registros:,} entradas en {args.anios} años + {args.dia} del último día; "
+          f"punto de control cada {AUDITORIA_PUNTO_CONTROL}\n")
+    imprimir_tabla(filas, ('Verificación', 'Entradas recalculadas', 'ms'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Utilidades compartidas por los scripts de benchmark.
+
+Cada benchmark crea una base de datos de prueba temporal (igual que el
+runner de tests de Django), carga sus propios datos y la destruye al final,
+por lo que nunca toca la base de datos real.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+RAIZ_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def configurar_django():
+    sys.path.insert(0, RAIZ_PROYECTO)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'facturacion_segura.settings')
+    try:
+        import pymysql
+        pymysql.install_as_MySQLdb()
+    except ImportError:
+        pass
+    import django
+    django.setup()
+
+
+@contextmanager
+def base_de_datos_temporal():
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    nombre_original = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(nombre_original, verbosity=0)
+        teardown_test_environment()
+
+
+def medir(funcion, repeticiones):
+    """Ejecuta la función varias veces y retorna el tiempo medio por llamada (segundos)."""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def crear_datos_base(num_productos=20):
+    """Crea un usuario, un cliente y productos con stock amplio. Retorna (usuario, cliente, productos)."""
+    from decimal import Decimal
+    from django.contrib.auth import get_user_model
+    from apps.clientes.models import Cliente
+    from apps.productos.models import Producto
+
+    usuario = get_user_model().objects.create_user(
+        username='benchmark', password='benchmark123', role='Administrador'
+    )
+    cliente = Cliente.objects.create(nombre='Cliente Benchmark', email='benchmark@test.com')
+    productos = [
+        Producto.objects.create(nombre=f'Producto {i}', precio=Decimal('9.99') + i, stock=10 ** 9)
+        for i in range(num_productos)
+    ]
+    return usuario, cliente, productos
+
+
+def imprimir_tabla(filas, encabezados):
+    anchos = [max(len(str(fila[i])) for fila in [encabezados] + filas) for i in range(len(encabezados))]
+    for fila in [encabezados] + filas:
+        print("  ".join(str(valor).ljust(ancho) for valor, ancho in zip(fila, anchos)))
@@ -0,0 +1,99 @@
+"""
+Servidor SMTP local mínimo para benchmarks (descarta los mensajes).
+
+Sirve como sustituto de un servidor real: acepta HELO/EHLO, MAIL, RCPT, DATA,
+RSET, NOOP y QUIT, cuenta conexiones y mensajes y puede simular la latencia
+de abrir una conexión (handshake TCP/TLS + autenticación) y de cada mensaje.
+
+Uso independiente:
+    python benchmarks/smtp_local.py --puerto 2525
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+
+
+class _ManejadorSMTP(socketserver.StreamRequestHandler):
+
+    def _responder(self, texto):
+        self.wfile.write(texto.encode() + b'\r\n')
+
+    def handle(self):
+        servidor = self.server
+        with servidor.bloqueo:
+            servidor.conexiones += 1
+        time.sleep(servidor.latencia_conexion)
+        self._responder('220 localhost SMTP local')
+
+        en_datos = False
+        while True:
+            linea = self.rfile.readline()
+            if not linea:
+                break
+            if en_datos:
+                if linea.rstrip(b'\r\n') == b'.':
+                    en_datos = False
+                    time.sleep(servidor.latencia_mensaje)
+                    with servidor.bloqueo:
+                        servidor.mensajes += 1
+                    self._responder('250 OK mensaje aceptado')
+                continue
+
+            comando = linea[:4].upper()
+            if comando == b'EHLO':
+                self._responder('250-localhost')
+                self._responder('250 8BITMIME')
+            elif comando in (b'HELO', b'MAIL', b'RCPT', b'RSET', b'NOOP'):
+                self._responder('250 OK')
+            elif comando == b'DATA':
+                en_datos = True
+                self._responder('354 Termine con <CRLF>.<CRLF>')
+            elif comando == b'QUIT':
+                self._responder('221 Adiós')
+                break
+            else:
+                self._responder('502 Comando no implementado')
+
+
+class ServidorSMTPLocal(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, puerto=0, latencia_conexion=0.0, latencia_mensaje=0.0):
+        super().__init__(('127.0.0.1', puerto), _ManejadorSMTP)
+        self.latencia_conexion = latencia_conexion
+        self.latencia_mensaje = latencia_mensaje
+        self.bloqueo = threading.Lock()
+        self.conexiones = 0
+        self.mensajes = 0
+
+    @property
+    def puerto(self):
+        return self.server_address[1]
+
+    def iniciar_en_segundo_plano(self):
+        hilo = threading.Thread(target=self.serve_forever, daemon=True)
+        hilo.start()
+        return self
+
+    def reiniciar_contadores(self):
+        with self.bloqueo:
+            self.conexiones = 0
+            self.mensajes = 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--puerto', type=int, default=2525)
+    parser.add_argument('--latencia-conexion', type=float, default=0.0)
+    parser.add_argument('--latencia-mensaje', type=float, default=0.0)
+    args = parser.parse_args()
+
+    servidor = ServidorSMTPLocal(args.puerto, args.latencia_conexion, args.latencia_mensaje)
+    print(f"SMTP local escuchando en 127.0.0.1:{servidor.puerto}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{servidor.conexiones} conexión(es), {servidor.mensajes} mensaje(s)")
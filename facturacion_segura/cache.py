@@ -0,0 +1,76 @@
+"""
+Caché de resultados costosos con protección contra estampidas.
+
+obtener_o_calcular() guarda el valor junto con el momento en que se calculó:
+- Mientras tiene menos de `ttl` segundos y no fue invalidado, se devuelve tal cual.
+- Al vencer, solo una petición lo recalcula (un cerrojo con cache.add); las demás
+  reciben el valor anterior mientras tanto, en lugar de recalcular todas a la vez.
+- invalidar(grupo) marca como vencidos todos los valores del grupo calculados
+  antes de ese momento (p. ej. al emitir una factura).
+
+Con varios procesos (gunicorn) el backend de caché debe ser compartido
+(Redis/Memcached); con LocMemCache cada proceso tiene su propia copia.
+"""
+
+import time
+
+from django.core.cache import cache
+
+# Cuántos ttl se conserva un valor vencido para servirlo mientras se recalcula
+FACTOR_CONSERVACION = 10
+# Segundos máximos que se considera tomado el cerrojo (por si el proceso muere)
+BLOQUEO_RECALCULO = 30
+
+
+def _clave_invalidacion(grupo):
+    return f"invalidado:{grupo}"
+
+
+def invalidar(grupo):
+    """Vence todos los valores del grupo calculados hasta ahora."""
+    cache.set(_clave_invalidacion(grupo), time.time(), None)
+
+
+def obtener_o_calcular(clave, calcular, ttl, grupo=None, espera=5.0):
+    """
+    Retorna (valor, edad_en_segundos). `calcular()` se llama como máximo
+    una vez a la vez por clave, salvo que no exista ningún valor previo y el
+    cálculo en curso tarde más de `espera` segundos.
+    """
+    claves = [clave] + ([_clave_invalidacion(grupo)] if grupo else [])
+    guardado = cache.get_many(claves)
+    entrada = guardado.get(clave)
+    invalidado = guardado.get(_clave_invalidacion(grupo), 0) if grupo else 0
+
+    ahora = time.time()
+    if entrada is not None:
+        edad = ahora - entrada['calculado']
+        if edad < ttl and entrada['calculado'] > invalidado:
+            return entrada['valor'], edad
+
+    cerrojo = f"{clave}:recalculando"
+    if cache.add(cerrojo, 1, BLOQUEO_RECALCULO):
+        try:
+            return _recalcular(clave, calcular, ttl), 0.0
+        finally:
+            cache.delete(cerrojo)
+
+    # Otra petición está recalculando: se sirve el valor anterior si lo hay
+    if entrada is not None:
+        return entrada['valor'], ahora - entrada['calculado']
+
+    limite = ahora + espera
+    while time.time() < limite:
+        time.sleep(0.05)
+        entrada = cache.get(clave)
+        if entrada is not None:
+            return entrada['valor'], time.time() - entrada['calculado']
+    return _recalcular(clave, calcular, ttl), 0.0
+
+
+def _recalcular(clave, calcular, ttl):
+    # Se toma el momento antes de calcular: una invalidación durante el cálculo lo vence
+    inicio = time.time()
+    valor = calcular()
+    cache.set(clave, {'valor': valor, 'calculado': inicio}, ttl * FACTOR_CONSERVACION)
+    return valor
@@ -0,0 +1,135 @@
+"""
+Campos dinámicos para los serializers de la API (sparse fieldsets).
+
+- ?fields=id,nombre     devuelve solo esos campos.
+- ?expand=cliente       reemplaza el id de una relación por el objeto anidado
+                        (solo las relaciones declaradas en Meta.expandibles).
+
+Los parámetros solo se aplican en lecturas (GET/HEAD/OPTIONS) y al serializer
+principal de la vista. La vista usa optimizar_queryset() para que la consulta
+lea únicamente las columnas y relaciones de los campos seleccionados.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _lista_parametro(request, nombre):
+    valor = request.query_params.get(nombre)
+    if not valor:
+        return []
+    return [campo.strip() for campo in valor.split(',') if campo.strip()]
+
+
+class CamposDinamicosMixin:
+    """
+    Mixin para ModelSerializer.
+
+    Opciones en Meta:
+    - expandibles: {campo: (SerializerClass, kwargs)} relaciones que admite ?expand=.
+    - prefetch_campos: {campo: [lookups]} relaciones que consulta un campo que no
+      es una columna (p. ej. un SerializerMethodField que recorre un M2M).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._expandidos = set()
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+
+        expandibles = getattr(self.Meta, 'expandibles', {})
+        for nombre in _lista_parametro(request, 'expand'):
+            if nombre not in expandibles:
+                raise ValidationError({'expand': f"No se puede expandir '{nombre}'"})
+            serializer_class, opciones = expandibles[nombre]
+            self.fields[nombre] = serializer_class(read_only=True, **opciones)
+            self._expandidos.add(nombre)
+
+        campos = _lista_parametro(request, 'fields')
+        if campos:
+            desconocidos = set(campos) - set(self.fields)
+            if desconocidos:
+                raise ValidationError({'fields': f"Campos no válidos: {', '.join(sorted(desconocidos))}"})
+            for nombre in set(self.fields) - set(campos):
+                self.fields.pop(nombre)
+
+    def optimizar_queryset(self, queryset, columnas_extra=()):
+        """
+        Aplica only(), select_related() y prefetch_related() según los campos
+        seleccionados. `columnas_extra` son columnas que la vista necesita aunque
+        no se serialicen (p. ej. las del orden de paginación).
+        """
+        select, prefetch = self._relaciones_necesarias(queryset.model)
+        columnas = self._columnas_necesarias(queryset.model)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        if columnas is not None:
+            queryset = queryset.only(*columnas, *select, *columnas_extra)
+        return queryset
+
+    def _campos_leidos(self):
+        return {nombre: campo for nombre, campo in self.fields.items() if not campo.write_only}
+
+    def _relaciones_necesarias(self, modelo, prefijo=''):
+        """Retorna (select_related, prefetch_related) para los campos seleccionados."""
+        select, prefetch = [], []
+        prefetch_campos = getattr(self.Meta, 'prefetch_campos', {})
+        for nombre, campo in self._campos_leidos().items():
+            if nombre in prefetch_campos:
+                prefetch.extend(prefijo + lookup for lookup in prefetch_campos[nombre])
+            elif nombre in self._expandidos:
+                select.append(prefijo + campo.source)
+                if isinstance(campo, CamposDinamicosMixin):
+                    relacionado = modelo._meta.get_field(campo.source).related_model
+                    _, anidados = campo._relaciones_necesarias(relacionado, f"{prefijo}{campo.source}__")
+                    prefetch.extend(anidados)
+            else:
+                campo_modelo = self._campo_modelo(modelo, campo.source)
+                if campo_modelo is not None and (campo_modelo.many_to_many or campo_modelo.one_to_many):
+                    prefetch.append(prefijo + campo.source)
+        return select, prefetch
+
+    def _columnas_necesarias(self, modelo):
+        """
+        Columnas a cargar con only(), o None si algún campo no se puede traducir
+        a columnas (en ese caso se cargan todas por seguridad).
+        """
+        columnas = {modelo._meta.pk.name}
+        prefetch_campos = getattr(self.Meta, 'prefetch_campos', {})
+        for nombre, campo in self._campos_leidos().items():
+            if nombre in prefetch_campos or nombre in self._expandidos:
+                continue
+            campo_modelo = self._campo_modelo(modelo, campo.source)
+            if campo_modelo is None:
+                return None
+            if campo_modelo.concrete and not campo_modelo.many_to_many:
+                columnas.add(campo_modelo.name)
+        return columnas
+
+    @staticmethod
+    def _campo_modelo(modelo, source):
+        if not source or '.' in source or source == '*':
+            return None
+        try:
+            return modelo._meta.get_field(source)
+        except FieldDoesNotExist:
+            return None
+
+
+class CamposDinamicosViewSetMixin:
+    """
+    Mixin para ViewSets cuyo serializer usa CamposDinamicosMixin: en lecturas,
+    optimiza el queryset para los campos pedidos con ?fields= / ?expand=.
+    """
+    # Columnas que siempre se cargan (p. ej. las del orden de la paginación keyset)
+    columnas_requeridas = ()
+
+    def optimizar_campos(self, queryset):
+        if self.request.method not in SAFE_METHODS or self.action not in ('list', 'retrieve'):
+            return queryset
+        serializer = self.get_serializer()
+        return serializer.optimizar_queryset(queryset, columnas_extra=self.columnas_requeridas)
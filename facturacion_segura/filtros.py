@@ -0,0 +1,33 @@
+"""
+Lectura de parámetros de filtro de la API (query params).
+
+Los backends de filtros de cada app (facturas, log de auditoría) validan sus
+parámetros con estas funciones, de modo que un valor inválido responde siempre
+400 con el mismo mensaje, bajo el nombre del parámetro.
+"""
+
+from datetime import date, datetime, timedelta
+
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+
+def parametro_entero(parametros, nombre):
+    try:
+        return int(parametros[nombre])
+    except ValueError:
+        raise ValidationError({nombre: "Debe ser un número entero"})
+
+
+def parametro_inicio_dia(parametros, nombre):
+    """Inicio (hora local) del día YYYY-MM-DD indicado en el parámetro."""
+    try:
+        dia = date.fromisoformat(parametros[nombre])
+    except ValueError:
+        raise ValidationError({nombre: "Formato de fecha inválido, use YYYY-MM-DD"})
+    return timezone.make_aware(datetime.combine(dia, datetime.min.time()))
+
+
+def parametro_fin_dia(parametros, nombre):
+    """Fin exclusivo (inicio del día siguiente) del día indicado: el rango incluye todo ese día."""
+    return parametro_inicio_dia(parametros, nombre) + timedelta(days=1)
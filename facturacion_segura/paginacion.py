@@ -0,0 +1,209 @@
+"""
+Clases de paginación para la API.
+
+- PaginacionLimitOffset: paginación por OFFSET, opcional (solo se activa si el
+  cliente envía ?limit=). Adecuada para tablas pequeñas de administración.
+- PaginacionKeyset: paginación por cursor sobre columnas ordenadas (keyset).
+  Cada página se obtiene con un WHERE sobre el último registro visto en lugar
+  de un OFFSET, por lo que el costo es el mismo en la página 1 y en la 10.000,
+  siempre que exista un índice compuesto sobre las columnas de orden.
+"""
+
+import base64
+import json
+from collections import OrderedDict
+from functools import reduce
+from operator import or_
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class _CodificadorCursor(DjangoJSONEncoder):
+    """DjangoJSONEncoder recorta las fechas a milisegundos; el cursor necesita el valor exacto."""
+
+    def default(self, o):
+        if hasattr(o, 'isoformat'):
+            return o.isoformat()
+        return super().default(o)
+
+
+class PaginacionLimitOffset(LimitOffsetPagination):
+    """
+    Paginación por OFFSET opcional: sin ?limit= se devuelve la lista completa
+    (compatibilidad con los clientes actuales).
+    """
+    max_limit = 1000
+
+
+class PaginacionKeyset(BasePagination):
+    """
+    Paginación keyset genérica.
+    Las subclases definen `ordering`: tupla de campos ('-campo' para descendente)
+    cuyo último elemento debe ser único (normalmente el id) para que el orden sea estable.
+    """
+    ordering = ('-id',)
+    page_size = 50
+    max_page_size = 1000
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Cursor inválido'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        campos = [(campo.lstrip('-'), campo.startswith('-')) for campo in self.ordering]
+        modelo = queryset.model
+
+        valores, reverso = self.decode_cursor(request, modelo, campos)
+        # Al ir hacia atrás se recorre el orden invertido y luego se da vuelta la página
+        resultados = self.consultar(queryset, campos, valores, reverso, self.page_size + 1)
+        hay_mas = len(resultados) > self.page_size
+        resultados = resultados[:self.page_size]
+        if reverso:
+            resultados.reverse()
+
+        if reverso:
+            self.has_next = True
+            self.has_previous = hay_mas
+        else:
+            self.has_next = hay_mas
+            self.has_previous = valores is not None
+        self.primero = self._valores(resultados[0], campos) if resultados else None
+        self.ultimo = self._valores(resultados[-1], campos) if resultados else None
+        if not resultados and valores is not None:
+            # Página vacía: se conserva la posición para poder volver atrás
+            self.primero = self.ultimo = valores
+            self.has_next, self.has_previous = reverso, not reverso
+        return resultados
+
+    def get_page_size(self, request):
+        try:
+            solicitado = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(solicitado, self.max_page_size))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.ultimo, reverso=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.primero, reverso=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    # --- Cursor -----------------------------------------------------------
+
+    def encode_cursor(self, valores, reverso):
+        contenido = json.dumps({'v': valores, 'r': reverso}, cls=_CodificadorCursor)
+        cursor = base64.urlsafe_b64encode(contenido.encode()).decode().rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, modelo, campos):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            relleno = '=' * (-len(cursor) % 4)
+            contenido = json.loads(base64.urlsafe_b64decode(cursor + relleno).decode())
+            crudos = contenido['v']
+            if len(crudos) != len(campos):
+                raise ValueError
+            valores = [
+                modelo._meta.get_field(nombre).to_python(valor)
+                for (nombre, _), valor in zip(campos, crudos)
+            ]
+            return valores, bool(contenido.get('r'))
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    # --- Consulta ---------------------------------------------------------
+
+    def consultar(self, queryset, campos, valores, reverso, limite):
+        """Hasta `limite` registros a continuación de `valores`, en el orden de recorrido."""
+        if valores is not None:
+            queryset = queryset.filter(self._condicion_siguiente(campos, valores, reverso))
+        orden = [self._orden(nombre, descendente != reverso) for nombre, descendente in campos]
+        return list(queryset.order_by(*orden)[:limite])
+
+    @staticmethod
+    def _orden(nombre, descendente):
+        return f"-{nombre}" if descendente else nombre
+
+    @staticmethod
+    def _valores(objeto, campos):
+        # Admite instancias del modelo y filas de .values()
+        if isinstance(objeto, dict):
+            return [objeto[nombre] for nombre, _ in campos]
+        return [getattr(objeto, nombre) for nombre, _ in campos]
+
+    @staticmethod
+    def _condicion_siguiente(campos, valores, reverso):
+        """
+        Construye (a, b, ...) > (va, vb, ...) respetando la dirección de cada campo:
+        a > va  OR  (a = va AND b > vb)  OR ...
+        Se añade además una condición de rango sobre el primer campo para que el
+        motor pueda recorrer el índice compuesto directamente.
+        """
+        alternativas = []
+        for posicion, (nombre, descendente) in enumerate(campos):
+            hacia_abajo = descendente != reverso
+            condicion = Q(**{f"{nombre}__{'lt' if hacia_abajo else 'gt'}": valores[posicion]})
+            for anterior, valor in zip(campos[:posicion], valores[:posicion]):
+                condicion &= Q(**{anterior[0]: valor})
+            alternativas.append(condicion)
+
+        primero, descendente = campos[0]
+        hacia_abajo = descendente != reverso
+        rango = Q(**{f"{primero}__{'lte' if hacia_abajo else 'gte'}": valores[0]})
+        return rango & reduce(or_, alternativas)
+
+
+def recorrer_por_bloques(queryset, campos, chunk_size, clave=None):
+    """
+    Itera el queryset en orden ascendente de `campos` (el último único, normalmente
+    el id) con consultas de `chunk_size` filas, cada una a continuación de la última
+    fila del bloque anterior. A diferencia de QuerySet.iterator(), que en MySQL trae
+    el resultado completo al cliente, en memoria solo hay un bloque. Los
+    prefetch_related del queryset se aplican a cada bloque.
+
+    `clave(fila)` retorna los valores de `campos` de una fila; por defecto se leen
+    como atributos (instancias) o claves (filas de .values()).
+    """
+    orden = [(nombre, False) for nombre in campos]
+    queryset = queryset.order_by(*campos)
+    if clave is None:
+        def clave(fila):
+            return PaginacionKeyset._valores(fila, orden)
+    bloque = list(queryset[:chunk_size])
+    while bloque:
+        yield from bloque
+        if len(bloque) < chunk_size:
+            return
+        siguiente = PaginacionKeyset._condicion_siguiente(orden, list(clave(bloque[-1])), False)
+        bloque = list(queryset.filter(siguiente)[:chunk_size])
@@ -59,15 +59,37 @@ WSGI_APPLICATION = 'facturacion_segura.wsgi.application'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        # TokenAuthentication con caché de tokens y usuarios (apps/usuarios/cache.py)
+        'apps.usuarios.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    # 'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    # 'PAGE_SIZE': 10,
+    # Paginación por OFFSET opcional (?limit=&offset=) para tablas pequeñas.
+    # Los listados grandes (facturas) definen su propia paginación keyset.
+    'DEFAULT_PAGINATION_CLASS': 'facturacion_segura.paginacion.PaginacionLimitOffset',
+    # Tasas por usuario de los endpoints costosos (apps/usuarios/throttling.py).
+    # El CRUD no tiene throttle.
+    'DEFAULT_THROTTLE_RATES': {
+        'validar_password': '10/min',   # hash de la contraseña
+        'pdf': '30/min',                # view_pdf, download_pdf, estado-cuenta y envíos
+        'metricas': '60/min',           # metrics y analítica
+    },
 }
 
+# Auditoría: las entradas se insertan por lotes desde un búfer respaldado por un WAL
+# (apps/auditorias/escritor.py). Con AUDITORIA_SINCRONA se insertan en el momento.
+AUDITORIA_SINCRONA = config('AUDITORIA_SINCRONA', default=False, cast=bool)
+AUDITORIA_WAL_DIR = config('AUDITORIA_WAL_DIR', default=str(BASE_DIR / 'auditoria_wal'))
+# Las entradas más antiguas que la retención se mueven a segmentos comprimidos
+# (apps/auditorias/archivo.py, comando archivar_auditoria)
+AUDITORIA_RETENCION_DIAS = config('AUDITORIA_RETENCION_DIAS', default=365, cast=int)
+AUDITORIA_ARCHIVO_DIR = config('AUDITORIA_ARCHIVO_DIR', default=str(BASE_DIR / 'auditoria_archivo'))
+
+# Generaciones de PDF simultáneas por proceso y por usuario (503 + Retry-After al superarlas)
+CONCURRENCIA_PDF = config('CONCURRENCIA_PDF', default=4, cast=int)
+CONCURRENCIA_PDF_POR_USUARIO = config('CONCURRENCIA_PDF_POR_USUARIO', default=2, cast=int)
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
 ]
@@ -87,6 +109,29 @@ DATABASES = {
     }
 }
 
+# Caché compartida entre los procesos (workers de gunicorn) en Redis: REDIS_URL=redis://host:6379/0.
+# Sin REDIS_URL cada proceso usa su propia LocMemCache.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+# Caché de usuarios y tokens (apps/usuarios/cache.py). Sus invalidaciones tienen que llegar
+# a todos los procesos, así que por defecto solo se activa con la caché compartida.
+CACHE_USUARIOS = config('CACHE_USUARIOS', default=bool(REDIS_URL), cast=bool)
+# Catálogo versionado con ETag de /api/bootstrap/ (apps/usuarios/bootstrap.py): por lo mismo,
+# sus versiones tienen que cambiar en todos los procesos.
+CACHE_CATALOGO = config('CACHE_CATALOGO', default=bool(REDIS_URL), cast=bool)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
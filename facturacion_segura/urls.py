@@ -12,8 +12,8 @@ from apps.auditorias.views_api import LogAuditoriaViewSet
 from rest_framework import routers
 from apps.clientes.views_api import ClienteViewSet
 from apps.productos.views_api import ProductoViewSet
-from apps.facturacion.views_api import FacturaViewSet
-from apps.usuarios.views_api import me_view, UserViewSet, validate_password
+from apps.facturacion.views_api import FacturaViewSet, AnaliticaViewSet
+from apps.usuarios.views_api import me_view, bootstrap_view, UserViewSet, validate_password
 
 from rest_framework.authtoken.views import obtain_auth_token
 
@@ -24,6 +24,7 @@ router.register(r'api/productos', ProductoViewSet)
 router.register(r'api/facturas', FacturaViewSet)
 router.register(r'api/usuarios', UserViewSet)  # Solo para administradores
 router.register(r'api/logs', LogAuditoriaViewSet)
+router.register(r'api/analitica', AnaliticaViewSet, basename='analitica')  # Solo para administradores
 
 urlpatterns = [
     # Admin
@@ -45,6 +46,9 @@ urlpatterns = [
     # Endpoint para obtener datos del usuario autenticado
     path('api/me/', me_view, name='api_me'),
 
+    # Datos de arranque del frontend (usuario, módulos, catálogo y métricas)
+    path('api/bootstrap/', bootstrap_view, name='api_bootstrap'),
+
     # Endpoint para validar contraseña del usuario autenticado
     path('api/auth/validate-password/', validate_password, name='validate_password'),
 
@@ -0,0 +1,157 @@
+import importlib.util
+import unittest
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.facturacion import analitica
+from apps.facturacion.models import Factura, FacturaItem
+from apps.clientes.models import Cliente
+from apps.productos.models import Producto
+
+User = get_user_model()
+
+NUMPY_INSTALADO = importlib.util.find_spec('numpy') is not None
+
+
+class TestAnaliticaVentas(TestCase):
+    """
+    Tests para la analítica de ventas con NumPy (/api/analitica/).
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@test.com', password='testpass123', role='Administrador'
+        )
+        self.vendedor = User.objects.create_user(
+            username='ventas', email='ventas@test.com', password='testpass123', role='Ventas'
+        )
+        self.cliente = Cliente.objects.create(nombre='Cliente Test', email='cliente@test.com')
+        self.producto_a = Producto.objects.create(nombre='Producto A', precio=Decimal('10.00'), stock=1000)
+        self.producto_b = Producto.objects.create(nombre='Producto B', precio=Decimal('2.50'), stock=1000)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        self.hoy = timezone.localdate()
+
+        # admin: 2 facturas esta semana (2xA = 20.00; 1xA + 4xB = 20.00) y 1 hace dos semanas (1xB = 2.50)
+        # ventas: 1 factura (3xA = 30.00); además un borrador que no cuenta
+        self._factura(self.admin, [(self.producto_a, 2)])
+        self._factura(self.admin, [(self.producto_a, 1), (self.producto_b, 4)])
+        antigua = self._factura(self.admin, [(self.producto_b, 1)])
+        Factura.objects.filter(id=antigua.id).update(fecha=timezone.now() - timedelta(days=14))
+        self._factura(self.vendedor, [(self.producto_a, 3)])
+        self._factura(self.vendedor, [(self.producto_a, 50)], estado='BORRADOR')
+
+    def _factura(self, creador, lineas, estado='EMITIDA'):
+        factura = Factura.objects.create(creador=creador, cliente=self.cliente, estado=estado)
+        for producto, cantidad in lineas:
+            FacturaItem.objects.create(factura=factura, producto=producto, cantidad=cantidad)
+        return factura
+
+    def _rango(self):
+        return {'desde': (self.hoy - timedelta(days=20)).isoformat(), 'hasta': self.hoy.isoformat()}
+
+    @unittest.skipUnless(NUMPY_INSTALADO, "NumPy no está instalado")
+    def test_cargar_lineas(self):
+        lineas = analitica.cargar_lineas(self.hoy - timedelta(days=20), self.hoy)
+        self.assertEqual(len(lineas['cantidad']), 5)
+        self.assertEqual(int(lineas['importe_centavos'].sum()), 7250)
+        # Bloques pequeños producen el mismo resultado
+        por_bloques = analitica.cargar_lineas(self.hoy - timedelta(days=20), self.hoy, chunk_size=2)
+        self.assertEqual(sorted(por_bloques['importe_centavos'].tolist()), sorted(lineas['importe_centavos'].tolist()))
+
+        solo_hoy = analitica.cargar_lineas(self.hoy, self.hoy)
+        self.assertEqual(len(solo_hoy['cantidad']), 4)
+
+    @unittest.skipUnless(NUMPY_INSTALADO, "NumPy no está instalado")
+    def test_factura_emitida_entre_las_dos_lecturas(self):
+        # Se emite una factura justo después de leer las facturas y antes de leer las líneas
+        leer = analitica._leer_por_bloques
+
+        def leer_y_emitir(np, filas, columnas, *args):
+            resultado = leer(np, filas, columnas, *args)
+            if columnas[1] == 'dia':
+                self._factura(self.admin, [(self.producto_b, 2)])
+            return resultado
+
+        with mock.patch.object(analitica, '_leer_por_bloques', side_effect=leer_y_emitir):
+            lineas = analitica.cargar_lineas(self.hoy - timedelta(days=20), self.hoy)
+        self.assertEqual(len(lineas['cantidad']), 5)
+        self.assertEqual(int(lineas['importe_centavos'].sum()), 7250)
+        self.assertEqual(len(lineas['dia']), 5)
+
+    @unittest.skipUnless(NUMPY_INSTALADO, "NumPy no está instalado")
+    def test_productos_semana(self):
+        response = self.client.get('/api/analitica/productos-semana/', self._rango())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        resultado = response.data['resultado']
+        self.assertEqual(response.data['lineas'], 5)
+        self.assertEqual(len(resultado['semanas']), 2)
+
+        producto_a, producto_b = resultado['productos']
+        self.assertEqual(producto_a['nombre'], 'Producto A')
+        self.assertEqual(producto_a['unidades'], 6)
+        self.assertEqual(producto_a['ingresos'], '60.00')
+        self.assertEqual(producto_a['ingresos_por_semana'][-1], '60.00')
+        self.assertEqual(producto_b['ingresos'], '12.50')
+        self.assertEqual(producto_b['ingresos_por_semana'], ['2.50', '10.00'])
+
+        response = self.client.get('/api/analitica/productos-semana/', {**self._rango(), 'top': 1})
+        self.assertEqual([p['nombre'] for p in response.data['resultado']['productos']], ['Producto A'])
+
+    @unittest.skipUnless(NUMPY_INSTALADO, "NumPy no está instalado")
+    def test_canasta(self):
+        response = self.client.get('/api/analitica/canasta/', self._rango())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        resultado = response.data['resultado']
+        self.assertEqual(resultado['facturas'], 4)
+        # Importes por factura: 20.00, 20.00, 2.50, 30.00
+        self.assertEqual(resultado['promedio']['importe'], '18.13')
+        self.assertEqual(resultado['percentiles']['p50']['importe'], '20.00')
+        self.assertEqual(resultado['percentiles']['p50']['unidades'], 2.5)
+        self.assertEqual(
+            resultado['histograma_lineas'],
+            [{'lineas': 1, 'facturas': 3}, {'lineas': 2, 'facturas': 1}],
+        )
+
+    @unittest.skipUnless(NUMPY_INSTALADO, "NumPy no está instalado")
+    def test_vendedores(self):
+        response = self.client.get('/api/analitica/vendedores/', self._rango())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        admin, ventas = response.data['resultado']
+        self.assertEqual(admin['nombre'], 'admin')
+        self.assertEqual(admin['facturas'], 3)
+        self.assertEqual(admin['ingresos'], '42.50')
+        self.assertEqual(admin['ticket_promedio'], '14.17')
+        self.assertEqual(admin['ticket_p50'], '20.00')
+        self.assertEqual(ventas['facturas'], 1)
+        self.assertEqual(ventas['ticket_p90'], '30.00')
+
+    @unittest.skipUnless(NUMPY_INSTALADO, "NumPy no está instalado")
+    def test_rango_sin_lineas(self):
+        rango = {'desde': '2000-01-01', 'hasta': '2000-01-31'}
+        for ruta in ('productos-semana', 'canasta', 'vendedores'):
+            response = self.client.get(f'/api/analitica/{ruta}/', rango)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['lineas'], 0)
+
+    def test_sin_numpy_responde_503(self):
+        with mock.patch.object(analitica, '_numpy', side_effect=analitica.AnaliticaNoDisponible("sin NumPy")):
+            response = self.client.get('/api/analitica/canasta/')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.data['error'], "sin NumPy")
+
+    def test_solo_administradores(self):
+        self.client.force_authenticate(user=self.vendedor)
+        response = self.client.get('/api/analitica/canasta/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_parametros_invalidos(self):
+        response = self.client.get('/api/analitica/canasta/', {'desde': '2025-13-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,152 @@
+import gzip
+import json
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.auditorias import archivo
+from apps.auditorias.escritor import entrada_auditoria, insertar
+from apps.auditorias.models import LogAuditoria
+
+User = get_user_model()
+
+
+class TestArchivoAuditoria(TestCase):
+    """
+    Tests para el archivado del log de auditoría en segmentos (apps/auditorias/archivo.py)
+    y la consulta conjunta de tabla y archivo en /api/logs/.
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = Path(self.directorio.name)
+        ajustes = override_settings(AUDITORIA_ARCHIVO_DIR=self.directorio.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.addCleanup(self.directorio.cleanup)
+
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@test.com', password='testpass123', role='Administrador'
+        )
+        self.bodega = User.objects.create_user(
+            username='bodega', email='bodega@test.com', password='testpass123', role='Bodega'
+        )
+        ahora = timezone.now()
+        # 40 entradas, una cada 5 días hacia atrás: 34 quedan fuera de una retención de 30 días.
+        # Se insertan por el escritor (encadenadas), de la más antigua a la más reciente.
+        entradas = []
+        for i in reversed(range(40)):
+            entrada = entrada_auditoria(
+                self.bodega if i % 3 else self.admin,
+                'Producto' if i % 2 else 'Cliente',
+                100 + i,
+                f'Objeto {i}',
+                'Registro duplicado' if i % 5 == 0 else 'Baja solicitada',
+            )
+            entrada['fecha_eliminacion'] = ahora - timedelta(days=5 * i, minutes=1)
+            entradas.append(entrada)
+        insertar(entradas)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def _recorrer(self, url):
+        vistos = []
+        response = self.client.get(url)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            vistos.extend(response.data['results'])
+            if not response.data['next']:
+                return vistos
+            response = self.client.get(response.data['next'])
+
+    def test_archivar_mueve_entradas_antiguas_a_segmentos(self):
+        self.assertEqual(archivo.archivar(dias=30, tamano=10), 34)
+        self.assertEqual(LogAuditoria.objects.count(), 6)
+
+        indices = sorted(self.ruta.glob('auditoria-*.json'))
+        self.assertEqual(len(indices), 4)
+        self.assertEqual(len(list(self.ruta.glob('auditoria-*.jsonl.gz'))), 4)
+        indice = json.loads(indices[0].read_text())
+        self.assertTrue(indice['confirmado'])
+        self.assertEqual(indice['total'], 10)
+        self.assertEqual(indice['modelos'], {'Cliente': 5, 'Producto': 5})
+        # Las entradas más antiguas van primero: objetos 139..130, separados por modelo
+        self.assertEqual(indice['objetos'], {'Cliente': [[130, 130], [132, 132], [134, 134], [136, 136], [138, 138]],
+                                             'Producto': [[131, 131], [133, 133], [135, 135], [137, 137], [139, 139]]})
+        with gzip.open(self.ruta / indice['archivo'], 'rt') as segmento:
+            self.assertEqual(len(segmento.readlines()), 10)
+
+        # Un segundo archivado sin nada nuevo no crea segmentos
+        self.assertEqual(archivo.archivar(dias=30, tamano=10), 0)
+        self.assertEqual(len(list(self.ruta.glob('auditoria-*.json'))), 4)
+
+    def test_listado_y_filtros_iguales_antes_y_despues(self):
+        consultas = [
+            '/api/logs/?page_size=7',
+            '/api/logs/?page_size=4&modelo=Producto',
+            f'/api/logs/?page_size=5&usuario={self.admin.id}',
+            '/api/logs/?page_size=3&objeto=133',
+            '/api/logs/?page_size=6&q=duplicado',
+            f'/api/logs/?page_size=5&desde={timezone.localdate() - timedelta(days=90)}'
+            f'&hasta={timezone.localdate() - timedelta(days=20)}',
+        ]
+        antes = [self._recorrer(url) for url in consultas]
+        archivo.archivar(dias=30, tamano=10)
+        despues = [self._recorrer(url) for url in consultas]
+        self.assertEqual(despues, antes)
+        self.assertEqual(len(despues[0]), 40)
+        self.assertEqual([log['objeto_id'] for log in despues[3]], [133])
+
+    def test_paginas_hacia_atras_cruzan_tabla_y_archivo(self):
+        archivo.archivar(dias=30, tamano=10)
+        response = self.client.get('/api/logs/?page_size=4')
+        paginas = [response.data['results']]
+        for _ in range(3):
+            response = self.client.get(response.data['next'])
+            paginas.append(response.data['results'])
+        # Vuelve desde la cuarta página a la segunda (la frontera tabla/archivo queda en la segunda)
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(response.data['results'], paginas[2])
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(response.data['results'], paginas[1])
+
+    def test_consulta_descarta_segmentos_por_indice(self):
+        archivo.archivar(dias=30, tamano=10)
+        archivo._leer_segmento.cache_clear()
+        # La primera página sale casi entera de la tabla: solo se lee el segmento más reciente
+        self.client.get('/api/logs/?page_size=8')
+        self.assertEqual(archivo._leer_segmento.cache_info().currsize, 1)
+
+        archivo._leer_segmento.cache_clear()
+        self.client.get('/api/logs/?objeto=139')  # entrada más antigua: primer segmento
+        self.assertEqual(archivo._leer_segmento.cache_info().currsize, 1)
+
+    def test_detalle_de_entrada_archivada(self):
+        antigua = LogAuditoria.objects.order_by('fecha_eliminacion').first()
+        archivo.archivar(dias=30, tamano=10)
+        response = self.client.get(f'/api/logs/{antigua.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['uuid'], str(antigua.uuid))
+        self.assertEqual(response.data['usuario'], str(antigua.usuario))
+        self.assertEqual(self.client.get('/api/logs/999999/').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_archivado_interrumpido_se_completa(self):
+        with mock.patch.object(archivo, '_confirmar', side_effect=RuntimeError('caída')):
+            with self.assertRaises(RuntimeError):
+                archivo.archivar(dias=30, tamano=10)
+        # Segmento escrito pero sin confirmar: sus entradas siguen en la tabla y la API no lo usa
+        self.assertEqual(LogAuditoria.objects.count(), 40)
+        self.assertEqual(len(self._recorrer('/api/logs/?page_size=50')), 40)
+
+        out = mock.MagicMock()
+        call_command('archivar_auditoria', dias=30, tamano=10, stdout=out)
+        self.assertEqual(LogAuditoria.objects.count(), 6)
+        self.assertEqual(len(list(self.ruta.glob('auditoria-*.json'))), 4)
+        self.assertEqual(len(self._recorrer('/api/logs/?page_size=50')), 40)
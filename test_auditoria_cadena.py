@@ -0,0 +1,145 @@
+import tempfile
+from datetime import timedelta
+from unittest import mock
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from apps.auditorias import cadena
+from apps.auditorias.archivo import archivar
+from apps.auditorias.escritor import entrada_auditoria, insertar
+from apps.auditorias.models import CadenaAuditoria, LogAuditoria, PuntoControlAuditoria
+
+User = get_user_model()
+
+
+@mock.patch.object(cadena, 'AUDITORIA_PUNTO_CONTROL', 5)
+class TestCadenaAuditoria(TestCase):
+    """
+    Tests para la cadena de hashes del log de auditoría (apps/auditorias/cadena.py).
+    Puntos de control cada 5 entradas.
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@test.com', password='testpass123', role='Administrador'
+        )
+
+    def _insertar(self, cantidad, usuario=None, fecha=None):
+        entradas = []
+        for i in range(cantidad):
+            entrada = entrada_auditoria(usuario or self.admin, 'Cliente', i, f'Cliente {i}', 'Prueba')
+            if fecha is not None:
+                entrada['fecha_eliminacion'] = fecha
+            entradas.append(entrada)
+        insertar(entradas)
+        return entradas
+
+    def test_entradas_encadenadas_y_puntos_de_control(self):
+        self._insertar(7)
+        self._insertar(5)
+        logs = list(LogAuditoria.objects.order_by('secuencia'))
+        self.assertEqual([log.secuencia for log in logs], list(range(1, 13)))
+        self.assertEqual(logs[0].hash_anterior, cadena.GENESIS)
+        for anterior, log in zip(logs, logs[1:]):
+            self.assertEqual(log.hash_anterior, anterior.hash)
+            self.assertEqual(log.hash, cadena.calcular_hash(log, anterior.hash))
+
+        self.assertEqual(list(PuntoControlAuditoria.objects.values_list('secuencia', flat=True)), [5, 10])
+        cabeza = CadenaAuditoria.objects.get()
+        self.assertEqual((cabeza.secuencia, cabeza.hash), (12, logs[-1].hash))
+        self.assertTrue(cadena.firma_valida(cabeza.secuencia, cabeza.hash, cabeza.firma))
+
+    def test_reinsertar_no_duplica_ni_rompe_la_cadena(self):
+        entradas = self._insertar(3)
+        self.assertEqual(insertar(entradas + [entrada_auditoria(self.admin, 'Cliente', 9, 'Cliente 9', 'Prueba')]), 1)
+        self.assertEqual(LogAuditoria.objects.count(), 4)
+        self.assertTrue(cadena.verificar(completa=True).correcta)
+
+    def test_verificacion_incremental(self):
+        self._insertar(12)
+        resultado = cadena.verificar()
+        self.assertTrue(resultado.correcta)
+        self.assertEqual((resultado.inicio, resultado.entradas, resultado.puntos), (1, 12, 2))
+
+        # Solo se recalcula lo posterior al último punto de control verificado (10)
+        self._insertar(4)
+        resultado = cadena.verificar()
+        self.assertTrue(resultado.correcta)
+        self.assertEqual((resultado.inicio, resultado.fin, resultado.entradas), (11, 16, 6))
+        self.assertEqual(PuntoControlAuditoria.objects.filter(verificado_en__isnull=False).count(), 3)
+
+        # Con --desde se parte del último punto de control anterior a las entradas de esa fecha
+        LogAuditoria.objects.filter(secuencia__lte=7).update(fecha_eliminacion=timezone.now() - timedelta(days=2))
+        LogAuditoria.objects.filter(secuencia__lte=7).update(hash='')  # no se recalculan
+        resultado = cadena.verificar(desde=timezone.now() - timedelta(days=1))
+        self.assertEqual((resultado.inicio, resultado.entradas), (6, 11))
+
+    def test_detecta_entrada_modificada(self):
+        self._insertar(8)
+        LogAuditoria.objects.filter(secuencia=3).update(motivo='Otro motivo')
+        errores = cadena.verificar(completa=True).errores
+        self.assertIn("Entrada 3: el contenido no coincide con su hash", errores)
+        # Con errores antes de él, el punto de control 5 no queda verificado
+        self.assertFalse(PuntoControlAuditoria.objects.filter(verificado_en__isnull=False).exists())
+
+    def test_detecta_entrada_borrada(self):
+        self._insertar(8)
+        LogAuditoria.objects.filter(secuencia=6).delete()
+        self.assertIn("Faltan las entradas 6 a 6", cadena.verificar(completa=True).errores)
+
+        LogAuditoria.objects.filter(secuencia=8).delete()
+        self.assertIn("La cadena termina en la entrada 7 y la cabeza indica 8", cadena.verificar(completa=True).errores)
+
+    def test_detecta_cadena_reescrita_sin_la_clave(self):
+        self._insertar(8)
+        # Se altera una entrada y se recalculan todos los hashes siguientes y la cabeza,
+        # pero sin SECRET_KEY no se pueden rehacer las firmas
+        logs = list(LogAuditoria.objects.order_by('secuencia'))
+        logs[1].motivo = 'Reescrito'
+        anterior = logs[0].hash
+        for log in logs[1:]:
+            log.hash_anterior = anterior
+            log.hash = anterior = cadena.calcular_hash(log, anterior)
+        LogAuditoria.objects.bulk_update(logs, ['motivo', 'hash_anterior', 'hash'])
+        CadenaAuditoria.objects.update(hash=anterior)
+
+        errores = cadena.verificar(completa=True).errores
+        self.assertIn("Firma inválida en la cabeza de la cadena", errores)
+        self.assertIn("El punto de control 5 no coincide con la cadena", errores)
+
+    def test_usuario_eliminado_no_rompe_la_cadena(self):
+        otro = User.objects.create_user(username='otro', email='otro@test.com', password='testpass123')
+        self._insertar(3, usuario=otro)
+        otro.delete()
+        self.assertTrue(cadena.verificar(completa=True).correcta)
+
+        LogAuditoria.objects.filter(secuencia=2).update(usuario=self.admin)
+        self.assertIn("Entrada 2: el usuario no coincide con el registrado", cadena.verificar(completa=True).errores)
+
+    def test_archivado_conserva_un_tramo_verificable(self):
+        self._insertar(7, fecha=timezone.now() - timedelta(days=60))
+        self._insertar(2)
+        self.assertEqual(cadena.verificar().puntos, 1)
+        with tempfile.TemporaryDirectory() as directorio, override_settings(AUDITORIA_ARCHIVO_DIR=directorio):
+            self.assertEqual(archivar(dias=30), 7)
+        self.assertEqual(LogAuditoria.objects.order_by('secuencia').first().secuencia, 8)
+
+        # El último punto verificado (5) ya está archivado: se parte de la primera entrada de la tabla
+        resultado = cadena.verificar()
+        self.assertTrue(resultado.correcta, resultado.errores)
+        self.assertEqual((resultado.inicio, resultado.entradas), (8, 2))
+        self.assertTrue(cadena.verificar(completa=True).correcta)
+
+    def test_comando(self):
+        self._insertar(6)
+        out = mock.MagicMock()
+        call_command('verificar_auditoria', stdout=out)
+
+        LogAuditoria.objects.filter(secuencia=6).update(objeto_id=99)
+        with self.assertRaises(CommandError):
+            call_command('verificar_auditoria', completa=True, stdout=out, stderr=out)
+        with self.assertRaises(CommandError):
+            call_command('verificar_auditoria', desde='ayer', stdout=out)
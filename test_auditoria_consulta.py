@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+from django.db import connection
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.auditorias.filtros import consulta_fulltext, filtrar_logs
+from apps.auditorias.models import LogAuditoria
+
+User = get_user_model()
+
+
+class TestConsultaAuditoria(TestCase):
+    """
+    Tests para el listado paginado y filtrado de /api/logs/.
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@test.com', password='testpass123', role='Administrador'
+        )
+        self.bodega = User.objects.create_user(
+            username='bodega', email='bodega@test.com', password='testpass123', role='Bodega'
+        )
+        inicio = timezone.make_aware(datetime(2025, 3, 1, 12, 0))
+        LogAuditoria.objects.bulk_create([
+            LogAuditoria(
+                modelo_afectado='Producto' if i % 2 else 'Cliente',
+                objeto_id=i,
+                descripcion_objeto=f'Objeto {i}',
+                motivo='Registro duplicado' if i % 5 == 0 else 'Baja solicitada',
+                usuario=self.bodega if i % 2 else self.admin,
+                fecha_eliminacion=inicio + timedelta(days=i // 3),
+            )
+            for i in range(30)
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def test_paginacion_keyset_recorre_todo_sin_repetir(self):
+        vistos = []
+        url = '/api/logs/?page_size=7'
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            vistos.extend(log['id'] for log in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        esperados = list(LogAuditoria.objects.order_by('-fecha_eliminacion', '-id').values_list('id', flat=True))
+        self.assertEqual(vistos, esperados)
+
+    def test_usuario_sin_consultas_por_fila(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/logs/?page_size=30')
+        self.assertEqual({log['usuario'] for log in response.data['results']}, {'admin (Administrador)', 'bodega (Bodega)'})
+
+    def test_filtros(self):
+        response = self.client.get(f'/api/logs/?modelo=Producto&usuario={self.bodega.id}&page_size=100')
+        self.assertEqual(len(response.data['results']), 15)
+
+        response = self.client.get('/api/logs/?desde=2025-03-02&hasta=2025-03-03&page_size=100')
+        self.assertEqual(sorted(log['objeto_id'] for log in response.data['results']), list(range(3, 9)))
+
+        response = self.client.get('/api/logs/?q=duplicado&page_size=100')
+        self.assertEqual(sorted(log['objeto_id'] for log in response.data['results']), [0, 5, 10, 15, 20, 25])
+
+        self.assertEqual(self.client.get('/api/logs/?desde=marzo').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/logs/?usuario=x').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_consulta_fulltext(self):
+        self.assertEqual(consulta_fulltext('registro  duplicado'), '+registro* +duplicado*')
+        self.assertEqual(consulta_fulltext('-(x) "y"*'), '+x* +y*')
+        self.assertEqual(consulta_fulltext('+-*'), '')
+
+    def test_filtros_usan_indices(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("Plan de consulta comprobado con SQLite")
+        for parametros, indice in [
+            ({}, 'log_fecha_id_idx'),
+            ({'modelo': 'Cliente'}, 'log_modelo_fecha_idx'),
+            ({'usuario': str(self.admin.id)}, 'log_usuario_fecha_idx'),
+            ({'objeto': '4'}, 'log_objeto_fecha_idx'),
+        ]:
+            queryset = filtrar_logs(LogAuditoria.objects.all(), parametros).order_by('-fecha_eliminacion', '-id')
+            sql, params = queryset[:50].query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                plan = ' '.join(str(fila) for fila in cursor.fetchall())
+            self.assertIn(indice, plan)
+            self.assertNotIn('TEMP B-TREE', plan)
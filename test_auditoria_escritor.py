@@ -0,0 +1,150 @@
+import fcntl
+import json
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.auditorias import escritor as escritor_auditoria
+from apps.auditorias.escritor import EscritorAuditoria, entrada_auditoria, recuperar_huerfanos
+from apps.auditorias.models import LogAuditoria
+from apps.clientes.models import Cliente
+
+User = get_user_model()
+
+
+class TestEscritorAuditoria(TestCase):
+    """
+    Tests para el escritor de auditoría con búfer y WAL (apps/auditorias/escritor.py).
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = Path(self.directorio.name)
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@test.com', password='testpass123', role='Administrador'
+        )
+        # Lote e intervalo grandes: el hilo no vacía por su cuenta durante la prueba
+        self.escritor = EscritorAuditoria(self.ruta, lote=1000, intervalo=3600)
+
+    def tearDown(self):
+        self.escritor.detener()
+        self.directorio.cleanup()
+
+    def _entrada(self, objeto_id=1, usuario=None):
+        return entrada_auditoria(usuario or self.admin, 'Cliente', objeto_id, f'Cliente {objeto_id}', 'Prueba')
+
+    def test_registrar_y_vaciar_por_lotes(self):
+        anterior = timezone.now() - timedelta(minutes=5)
+        with mock.patch('apps.auditorias.escritor.timezone.now', return_value=anterior):
+            entradas = [self._entrada(i) for i in range(3)]
+        for entrada in entradas:
+            self.escritor.registrar(entrada)
+
+        self.assertEqual(self.escritor.pendientes(), 3)
+        self.assertEqual(LogAuditoria.objects.count(), 0)
+        wal = self.ruta / f'{self.escritor._pid}-actual.wal'
+        self.assertEqual(len(wal.read_text().splitlines()), 3)
+
+        # Usuarios, cabeza de la cadena, uuids ya insertados, bulk_create y cabeza (más el savepoint)
+        with self.assertNumQueries(7):
+            self.assertEqual(self.escritor.vaciar(), 3)
+        self.assertEqual(LogAuditoria.objects.count(), 3)
+        log = LogAuditoria.objects.get(objeto_id=1)
+        self.assertEqual(log.usuario, self.admin)
+        self.assertEqual(log.fecha_eliminacion, anterior)
+        self.assertEqual([ruta.name for ruta in self.ruta.glob('*.wal')], [wal.name])
+        self.assertEqual(wal.read_text(), '')
+
+    def test_fallo_al_insertar_se_reintenta(self):
+        self.escritor.registrar(self._entrada())
+        with mock.patch('apps.auditorias.escritor.insertar', side_effect=RuntimeError('BD caída')):
+            with self.assertRaises(RuntimeError):
+                self.escritor.vaciar()
+        self.assertEqual(self.escritor.pendientes(), 1)
+        self.assertEqual(len(list(self.ruta.glob('*-0*.wal'))), 1)
+
+        self.escritor.registrar(self._entrada(2))
+        self.assertEqual(self.escritor.vaciar(), 2)
+        self.assertEqual(LogAuditoria.objects.count(), 2)
+        self.assertEqual(list(self.ruta.glob('*-0*.wal')), [])
+
+    def test_recupera_wal_de_proceso_terminado(self):
+        entradas = [self._entrada(1), self._entrada(2)]
+        lineas = ''.join(json.dumps(entrada) + '\n' for entrada in entradas)
+        (self.ruta / '99999-actual.wal').write_text(lineas + '{"uuid": "incompl')
+        (self.ruta / '99999.lock').touch()
+
+        self.assertEqual(recuperar_huerfanos(self.ruta), 2)
+        self.assertEqual(LogAuditoria.objects.count(), 2)
+        self.assertEqual(list(self.ruta.iterdir()), [])
+
+        # Reinsertar entradas ya guardadas no las duplica
+        (self.ruta / '99999-000001.wal').write_text(lineas)
+        recuperar_huerfanos(self.ruta)
+        self.assertEqual(LogAuditoria.objects.count(), 2)
+
+    def test_no_toca_wal_de_proceso_vivo(self):
+        (self.ruta / '88888-actual.wal').write_text(json.dumps(self._entrada()) + '\n')
+        with open(self.ruta / '88888.lock', 'a') as bloqueo:
+            fcntl.flock(bloqueo, fcntl.LOCK_EX)
+            self.assertEqual(recuperar_huerfanos(self.ruta), 0)
+        self.assertTrue((self.ruta / '88888-actual.wal').exists())
+
+        out = mock.MagicMock()
+        call_command('vaciar_auditoria', directorio=str(self.ruta), stdout=out)
+        self.assertEqual(LogAuditoria.objects.count(), 1)
+
+    def test_usuario_eliminado_antes_de_vaciar(self):
+        otro = User.objects.create_user(username='otro', email='otro@test.com', password='testpass123')
+        self.escritor.registrar(self._entrada(usuario=otro))
+        otro.delete()
+        self.escritor.vaciar()
+        self.assertIsNone(LogAuditoria.objects.get().usuario)
+
+    def test_detener_vacia_y_limpia(self):
+        self.escritor.registrar(self._entrada())
+        self.escritor.detener()
+        self.assertEqual(LogAuditoria.objects.count(), 1)
+        self.assertEqual(list(self.ruta.iterdir()), [])
+
+    def test_eliminar_con_motivo_usa_el_escritor(self):
+        cliente = Cliente.objects.create(nombre='Cliente Test', email='cliente@test.com')
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+        with mock.patch.object(escritor_auditoria, 'escritor', self.escritor):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = client.post(f'/api/clientes/{cliente.id}/eliminar-con-motivo/', {'motivo': 'Duplicado'})
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(LogAuditoria.objects.count(), 0)
+        self.assertEqual(self.escritor.pendientes(), 1)
+
+        self.escritor.vaciar()
+        log = LogAuditoria.objects.get()
+        self.assertEqual((log.modelo_afectado, log.objeto_id, log.motivo), ('Cliente', cliente.id, 'Duplicado'))
+
+    @override_settings(AUDITORIA_SINCRONA=True)
+    def test_modo_sincrono(self):
+        cliente = Cliente.objects.create(nombre='Cliente Test', email='cliente@test.com')
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+        client.post(f'/api/clientes/{cliente.id}/eliminar-con-motivo/', {'motivo': 'Duplicado'})
+        self.assertEqual(LogAuditoria.objects.get().usuario, self.admin)
+
+    @override_settings(AUDITORIA_SINCRONA=True)
+    def test_eliminacion_fallida_no_deja_registro(self):
+        cliente = Cliente.objects.create(nombre='Cliente Test', email='cliente@test.com')
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+        with mock.patch.object(Cliente, 'delete', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                client.post(f'/api/clientes/{cliente.id}/eliminar-con-motivo/', {'motivo': 'Duplicado'})
+        self.assertFalse(LogAuditoria.objects.exists())
+        self.assertTrue(Cliente.objects.filter(pk=cliente.pk).exists())
@@ -0,0 +1,95 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.clientes.models import Cliente
+from apps.productos.models import Producto
+
+User = get_user_model()
+
+
+class TestBootstrap(TestCase):
+    """
+    Tests para /api/bootstrap/ (datos de arranque del frontend).
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        cache.clear()
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@test.com', password='testpass123', role='Administrador'
+        )
+        self.vendedor = User.objects.create_user(
+            username='ventas', email='ventas@test.com', password='testpass123', role='Ventas'
+        )
+        self.bodega = User.objects.create_user(
+            username='bodega', email='bodega@test.com', password='testpass123', role='Bodega'
+        )
+        self.producto = Producto.objects.create(nombre='Producto Test', precio='10.50', stock=5)
+        self.cliente = Cliente.objects.create(nombre='Cliente Test', email='cliente@test.com')
+
+    def _cliente(self, usuario):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=usuario).key}')
+        return client
+
+    def test_ventas(self):
+        response = self._cliente(self.vendedor).get('/api/bootstrap/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['usuario']['username'], 'ventas')
+        self.assertEqual(response.data['modulos'], {'clientes': 'lectura', 'productos': 'lectura', 'facturas': 'completo'})
+        self.assertNotIn('roles', response.data)
+
+        catalogo = response.data['catalogo']
+        self.assertFalse(catalogo['sin_cambios'])
+        self.assertEqual(catalogo['productos']['campos'], ['id', 'nombre', 'precio', 'stock'])
+        self.assertEqual(catalogo['productos']['filas'][0][1], 'Producto Test')
+        self.assertEqual(catalogo['clientes']['filas'][0][2], 'cliente@test.com')
+        self.assertIn('por_estado', response.data['metricas'])
+
+    def test_partes_segun_rol(self):
+        response = self._cliente(self.bodega).get('/api/bootstrap/')
+        self.assertEqual(response.data['modulos'], {'productos': 'completo'})
+        self.assertIn('productos', response.data['catalogo'])
+        self.assertNotIn('clientes', response.data['catalogo'])
+        self.assertIsNone(response.data['metricas'])
+
+        response = self._cliente(self.admin).get('/api/bootstrap/')
+        self.assertIn('roles', response.data)
+        self.assertEqual(response.data['modulos']['contabilidad'], 'completo')
+
+    @override_settings(CACHE_USUARIOS=True, CACHE_CATALOGO=True)
+    def test_etag_y_cache(self):
+        client = self._cliente(self.vendedor)
+        etag = client.get('/api/bootstrap/').data['catalogo']['etag']
+
+        # Con el token, el usuario, el catálogo y las métricas en caché no hay consultas
+        with self.assertNumQueries(0):
+            response = client.get('/api/bootstrap/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.data['catalogo'], {'etag': etag, 'sin_cambios': True})
+
+        # Un cambio de stock invalida el catálogo de productos
+        with self.captureOnCommitCallbacks(execute=True):
+            self.producto.stock = 4
+            self.producto.save()
+        response = client.get('/api/bootstrap/', HTTP_IF_NONE_MATCH=etag)
+        self.assertNotEqual(response.data['catalogo']['etag'], etag)
+        self.assertEqual(response.data['catalogo']['productos']['filas'][0][3], 4)
+
+    @override_settings(CACHE_CATALOGO=False)
+    def test_sin_cache_compartida_no_hay_etag(self):
+        # Sin caché compartida un cambio hecho en otro proceso no cambiaría la versión:
+        # no se envía ETag y las filas se leen siempre de la base de datos
+        client = self._cliente(self.vendedor)
+        response = client.get('/api/bootstrap/')
+        self.assertIsNone(response.data['catalogo']['etag'])
+
+        Producto.objects.filter(pk=self.producto.pk).update(stock=4)
+        response = client.get('/api/bootstrap/', HTTP_IF_NONE_MATCH='"cualquiera"')
+        self.assertFalse(response.data['catalogo']['sin_cambios'])
+        self.assertEqual(response.data['catalogo']['productos']['filas'][0][3], 4)
+
+    def test_requiere_autenticacion(self):
+        self.assertEqual(APIClient().get('/api/bootstrap/').status_code, status.HTTP_401_UNAUTHORIZED)
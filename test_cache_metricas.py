@@ -0,0 +1,112 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.facturacion.models import Factura, FacturaItem
+from apps.clientes.models import Cliente
+from apps.productos.models import Producto
+from facturacion_segura.cache import invalidar, obtener_o_calcular
+
+User = get_user_model()
+
+
+class TestCacheConRecalculo(SimpleTestCase):
+    """
+    Tests para obtener_o_calcular: ttl, invalidación y recálculo único.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.llamadas = 0
+
+    def _calcular(self, demora=0):
+        def calcular():
+            self.llamadas += 1
+            time.sleep(demora)
+            return self.llamadas
+        return calcular
+
+    def test_reutiliza_mientras_no_vence(self):
+        self.assertEqual(obtener_o_calcular('k', self._calcular(), ttl=60), (1, 0.0))
+        valor, edad = obtener_o_calcular('k', self._calcular(), ttl=60)
+        self.assertEqual(valor, 1)
+        self.assertGreaterEqual(edad, 0)
+        self.assertEqual(self.llamadas, 1)
+
+    def test_invalidar_grupo(self):
+        obtener_o_calcular('k', self._calcular(), ttl=60, grupo='g')
+        invalidar('g')
+        valor, _ = obtener_o_calcular('k', self._calcular(), ttl=60, grupo='g')
+        self.assertEqual(valor, 2)
+
+    def test_valor_vencido_mientras_otro_recalcula(self):
+        obtener_o_calcular('k', self._calcular(), ttl=60, grupo='g')
+        invalidar('g')
+        # Simula otra petición recalculando en este momento
+        cache.add('k:recalculando', 1, 30)
+        valor, _ = obtener_o_calcular('k', self._calcular(), ttl=60, grupo='g')
+        self.assertEqual(valor, 1)
+        self.assertEqual(self.llamadas, 1)
+
+    def test_un_solo_recalculo_con_peticiones_concurrentes(self):
+        obtener_o_calcular('k', self._calcular(), ttl=60, grupo='g')
+        invalidar('g')
+
+        resultados = []
+        calcular = self._calcular(demora=0.2)
+        hilos = [
+            threading.Thread(target=lambda: resultados.append(
+                obtener_o_calcular('k', calcular, ttl=60, grupo='g')[0]
+            ))
+            for _ in range(10)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(self.llamadas, 2)
+        self.assertEqual(sorted(set(resultados)), [1, 2])
+
+
+class TestMetricasEnCache(TestCase):
+    """
+    Tests para la caché del endpoint de métricas.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='admin', email='admin@test.com', password='testpass123', role='Administrador'
+        )
+        self.cliente = Cliente.objects.create(nombre='Cliente Test', email='cliente@test.com')
+        self.producto = Producto.objects.create(nombre='Producto', precio=Decimal('10.00'), stock=100)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _emitir_factura(self):
+        factura = Factura.objects.create(creador=self.user, cliente=self.cliente)
+        FacturaItem.objects.create(factura=factura, producto=self.producto, cantidad=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/facturas/{factura.id}/emitir/')
+
+    def test_metricas_cacheadas_e_invalidadas_al_emitir(self):
+        self._emitir_factura()
+        response = self.client.get('/api/facturas/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['cache_edad'], 0.0)
+        self.assertEqual(response.data['por_estado']['EMITIDA']['facturas'], 1)
+
+        # Segunda petición: sin consultas a los resúmenes
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/facturas/metrics/')
+        self.assertIn('cache_edad', response.data)
+
+        self._emitir_factura()
+        response = self.client.get('/api/facturas/metrics/')
+        self.assertEqual(response.data['por_estado']['EMITIDA']['facturas'], 2)
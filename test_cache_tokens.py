@@ -0,0 +1,118 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.usuarios.authentication import contadores
+
+User = get_user_model()
+
+
+@override_settings(CACHE_USUARIOS=True)
+class TestCachedTokenAuthentication(TestCase):
+    """
+    Tests para CachedTokenAuthentication y /api/usuarios/cache-tokens/.
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        cache.clear()
+        contadores.reiniciar()
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@test.com', password='testpass123', role='Administrador'
+        )
+        self.vendedor = User.objects.create_user(
+            username='ventas', email='ventas@test.com', password='testpass123', role='Ventas'
+        )
+        self.token_admin = Token.objects.create(user=self.admin)
+        self.token_vendedor = Token.objects.create(user=self.vendedor)
+
+    def _cliente(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
+
+    def test_sin_consultas_tras_el_primer_uso(self):
+        client = self._cliente(self.token_vendedor)
+        with self.assertNumQueries(1):
+            response = client.get('/api/me/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            response = client.get('/api/me/')
+        self.assertEqual(response.data['username'], 'ventas')
+        self.assertEqual(response.data['role'], 'Ventas')
+        self.assertEqual(contadores.resumen()['aciertos'], 1)
+        self.assertEqual(contadores.resumen()['fallos'], 1)
+
+    def test_desactivar_usuario_invalida(self):
+        client = self._cliente(self.token_vendedor)
+        client.get('/api/me/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self._cliente(self.token_admin).post(f'/api/usuarios/{self.vendedor.id}/toggle_active/')
+
+        response = client.get('/api/me/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cambio_de_rol_invalida(self):
+        client = self._cliente(self.token_vendedor)
+        client.get('/api/me/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self._cliente(self.token_admin).post(
+                f'/api/usuarios/{self.vendedor.id}/generar-token-permiso/', {'role': 'Bodega'}
+            )
+        self.assertEqual(client.get('/api/me/').data['role'], 'Bodega')
+
+    def test_token_rotado_deja_de_valer(self):
+        client = self._cliente(self.token_vendedor)
+        client.get('/api/me/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token_vendedor.delete()
+        self.assertEqual(client.get('/api/me/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+        nuevo = Token.objects.create(user=self.vendedor)
+        self.assertEqual(self._cliente(nuevo).get('/api/me/').status_code, status.HTTP_200_OK)
+
+    def test_usuario_en_cache_puede_guardarse(self):
+        client = self._cliente(self.token_vendedor)
+        client.get('/api/me/')
+        client.get('/api/me/')
+        # La foto no incluye la contraseña; guardar el usuario no la borra
+        usuario = client.get('/api/me/').wsgi_request.user
+        usuario.first_name = 'Vendedor'
+        usuario.save()
+        self.vendedor.refresh_from_db()
+        self.assertEqual(self.vendedor.first_name, 'Vendedor')
+        self.assertTrue(self.vendedor.check_password('testpass123'))
+
+    def test_contadores_solo_administradores(self):
+        self._cliente(self.token_admin).get('/api/me/')
+        response = self._cliente(self.token_admin).get('/api/usuarios/cache-tokens/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('tasa_aciertos', response.data)
+
+        response = self._cliente(self.token_vendedor).get('/api/usuarios/cache-tokens/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self._cliente(self.token_admin).delete('/api/usuarios/cache-tokens/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(contadores.resumen()['fallos'], 0)
+
+    @override_settings(CACHE_USUARIOS=False)
+    def test_sin_cache_compartida_consulta_siempre(self):
+        # Sin backend compartido la invalidación no llegaría a los demás procesos:
+        # no se guarda nada y cada petición lee token y usuario de la base de datos
+        client = self._cliente(self.token_vendedor)
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                response = client.get('/api/me/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(cache.get(f"usuario:foto:{self.vendedor.pk}"))
+
+        User.objects.filter(pk=self.vendedor.pk).update(is_active=False)
+        response = client.get('/api/me/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self._cliente(self.token_admin).get('/api/usuarios/cache-tokens/')
+        self.assertFalse(response.data['habilitada'])
@@ -0,0 +1,97 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.facturacion.models import Factura, FacturaItem
+from apps.clientes.models import Cliente, Role
+from apps.productos.models import Producto
+
+User = get_user_model()
+
+
+class TestCamposDinamicos(TestCase):
+    """
+    Tests para ?fields= y ?expand= en los serializers de la API.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='admin',
+            email='admin@test.com',
+            password='testpass123',
+            role='Administrador'
+        )
+        rol = Role.objects.create(name='Ventas')
+        cls.producto = Producto.objects.create(nombre='Producto', precio=Decimal('10.00'), stock=1000)
+        for i in range(20):
+            cliente = Cliente.objects.create(nombre=f'Cliente {i}', email=f'cliente{i}@test.com')
+            cliente.roles.add(rol)
+            factura = Factura.objects.create(creador=cls.user, cliente=cliente)
+            FacturaItem.objects.create(factura=factura, producto=cls.producto, cantidad=1)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _get(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, consultas
+
+    def test_fields_reduce_campos_y_columnas(self):
+        response, consultas = self._get('/api/facturas/?fields=id,total')
+
+        for factura in response.data['results']:
+            self.assertEqual(set(factura), {'id', 'total'})
+        # Sin ítems no hay prefetch, y solo se leen las columnas pedidas (más la del orden)
+        self.assertEqual(len(consultas), 1)
+        sql = consultas[0]['sql']
+        self.assertIn('"total"', sql)
+        self.assertNotIn('"iva"', sql)
+
+    def test_expand_cliente_sin_consultas_por_fila(self):
+        response, consultas = self._get('/api/facturas/?fields=id,cliente&expand=cliente')
+
+        cliente = response.data['results'][0]['cliente']
+        self.assertEqual(cliente['roles'], [{'name': 'Ventas'}])
+        self.assertIn('email', cliente)
+        # Facturas con cliente (JOIN) + roles de los clientes
+        self.assertEqual(len(consultas), 2)
+
+    def test_expand_no_permitido(self):
+        response = self.client.get('/api/facturas/?expand=items')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_campo_desconocido(self):
+        response = self.client.get('/api/clientes/?fields=id,no_existe')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_clientes_sin_roles_no_consulta_roles(self):
+        response, consultas = self._get('/api/clientes/?fields=id,nombre')
+        self.assertEqual(set(response.data[0]), {'id', 'nombre'})
+        self.assertEqual(len(consultas), 1)
+
+    def test_clientes_roles_precargados(self):
+        response, consultas = self._get('/api/clientes/')
+        self.assertEqual(len(response.data), 20)
+        self.assertEqual(len(consultas), 2)
+
+    def test_productos_y_usuarios(self):
+        response, _ = self._get(f'/api/productos/{self.producto.id}/?fields=nombre,stock')
+        self.assertEqual(response.data, {'nombre': 'Producto', 'stock': 980})
+
+        response, _ = self._get('/api/usuarios/?fields=id,username')
+        self.assertEqual(response.data, [{'id': self.user.id, 'username': 'admin'}])
+
+    def test_escritura_ignora_fields(self):
+        response = self.client.post('/api/productos/?fields=id', {
+            'nombre': 'Nuevo', 'precio': '5.00', 'stock': 3
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['nombre'], 'Nuevo')
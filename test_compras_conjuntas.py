@@ -0,0 +1,117 @@
+import io
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.facturacion.models import Factura, FacturaItem
+from apps.clientes.models import Cliente
+from apps.productos.models import CompraConjunta, Producto
+
+User = get_user_model()
+
+
+def contenido_indice():
+    return sorted(CompraConjunta.objects.values_list('producto_id', 'relacionado_id', 'veces'))
+
+
+class TestComprasConjuntas(TestCase):
+    """
+    Tests para el índice de compras conjuntas y /api/productos/{id}/relacionados/.
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        self.user = User.objects.create_user(
+            username='admin', email='admin@test.com', password='testpass123', role='Administrador'
+        )
+        self.cliente = Cliente.objects.create(nombre='Cliente Test', email='cliente@test.com')
+        self.a, self.b, self.c, self.d = [
+            Producto.objects.create(nombre=f'Producto {letra}', precio=Decimal('5.00'), stock=1000)
+            for letra in 'ABCD'
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _factura(self, *productos):
+        factura = Factura.objects.create(creador=self.user, cliente=self.cliente)
+        for producto in productos:
+            FacturaItem.objects.create(factura=factura, producto=producto, cantidad=1)
+        return factura
+
+    def _emitir(self, factura):
+        response = self.client.post(f'/api/facturas/{factura.id}/emitir/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_borradores_no_cuentan(self):
+        self._factura(self.a, self.b)
+        self.assertFalse(CompraConjunta.objects.exists())
+
+    def test_emitir_guarda_ambas_direcciones(self):
+        self._emitir(self._factura(self.a, self.b, self.b))
+        self.assertEqual(contenido_indice(), [(self.a.id, self.b.id, 1), (self.b.id, self.a.id, 1)])
+
+    def test_factura_creada_por_la_api_cuenta_al_emitir(self):
+        # estado es de solo lectura: la factura se crea en borrador con sus ítems
+        response = self.client.post('/api/facturas/', {
+            'cliente': self.cliente.id, 'estado': 'EMITIDA',
+            'items': [{'producto': self.a.id, 'cantidad': 1}, {'producto': self.c.id, 'cantidad': 2}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(CompraConjunta.objects.exists())
+
+        self._emitir(Factura.objects.get(pk=response.data['id']))
+        self.assertEqual(contenido_indice(), [(self.a.id, self.c.id, 1), (self.c.id, self.a.id, 1)])
+
+    def test_anular_y_eliminar_restan(self):
+        primera = self._factura(self.a, self.b)
+        segunda = self._factura(self.a, self.b, self.c)
+        self._emitir(primera)
+        self._emitir(segunda)
+        self.assertEqual(CompraConjunta.objects.get(producto=self.a, relacionado=self.b).veces, 2)
+
+        self.client.post(f'/api/facturas/{segunda.id}/anular_factura/')
+        self.assertEqual(contenido_indice(), [(self.a.id, self.b.id, 1), (self.b.id, self.a.id, 1)])
+
+        # Pagar no cambia el índice; eliminar una factura de venta lo vacía
+        self.client.post(f'/api/facturas/{primera.id}/marcar_pagada/')
+        self.assertEqual(CompraConjunta.objects.get(producto=self.a, relacionado=self.b).veces, 1)
+        Factura.objects.get(pk=primera.pk).delete()
+        self.assertFalse(CompraConjunta.objects.exists())
+
+    def test_reconstruir_coincide_con_incremental(self):
+        combinaciones = [(self.a, self.b), (self.a, self.b, self.c), (self.c, self.d), (self.a,), (self.b, self.d)]
+        facturas = [self._factura(*productos) for productos in combinaciones]
+        for factura in facturas:
+            self._emitir(factura)
+        self.client.post(f'/api/facturas/{facturas[2].id}/anular_factura/')
+        incremental = contenido_indice()
+
+        salida = io.StringIO()
+        call_command('construir_compras_conjuntas', '--chunk', '2', stdout=salida)
+        self.assertEqual(contenido_indice(), incremental)
+        self.assertIn('4 pares, 8 filas', salida.getvalue())
+
+    def test_relacionados(self):
+        for productos in [(self.a, self.b), (self.a, self.b, self.c), (self.a, self.c), (self.a, self.b, self.d)]:
+            self._emitir(self._factura(*productos))
+
+        response = self.client.get(f'/api/productos/{self.a.id}/relacionados/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(p['nombre'], p['veces']) for p in response.data],
+            [('Producto B', 3), ('Producto C', 2), ('Producto D', 1)],
+        )
+
+        response = self.client.get(f'/api/productos/{self.a.id}/relacionados/?limite=1')
+        self.assertEqual([p['id'] for p in response.data], [self.b.id])
+
+        # Tiempo constante: las mismas consultas sin importar cuántas facturas haya
+        with self.assertNumQueries(2):
+            self.client.get(f'/api/productos/{self.d.id}/relacionados/')
+
+    def test_relacionados_producto_inexistente(self):
+        response = self.client.get('/api/productos/9999/relacionados/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
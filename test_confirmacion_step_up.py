@@ -0,0 +1,112 @@
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.clientes.models import Cliente
+from apps.productos.models import Producto
+from apps.usuarios import confirmacion
+
+User = get_user_model()
+
+
+class TestConfirmacionStepUp(TestCase):
+    """
+    Tests para el token de confirmación emitido por /api/auth/validate-password/.
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        cache.clear()
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@test.com', password='testpass123', role='Administrador'
+        )
+        self.otro_admin = User.objects.create_user(
+            username='admin2', email='admin2@test.com', password='testpass123', role='Administrador'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def _confirmar(self, **extra):
+        response = self.client.post('/api/auth/validate-password/', {'password': 'testpass123', **extra})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['confirmacion']['token']
+
+    def _eliminar_cliente(self, token=None, **extra):
+        cliente = Cliente.objects.create(nombre='Cliente Test', email=f'c{Cliente.objects.count()}@test.com')
+        datos = {'motivo': 'Duplicado'}
+        if token:
+            datos['confirmacion'] = token
+        return self.client.post(f'/api/clientes/{cliente.id}/eliminar-con-motivo/', datos, **extra)
+
+    def test_validar_emite_token_con_alcance(self):
+        response = self.client.post('/api/auth/validate-password/', {'password': 'testpass123'})
+        self.assertTrue(response.data['valid'])
+        self.assertEqual(response.data['confirmacion']['alcance'], 'eliminar')
+        self.assertEqual(response.data['confirmacion']['expira_en'], confirmacion.STEP_UP_TTL)
+
+        response = self.client.post('/api/auth/validate-password/', {'password': 'testpass123', 'alcance': 'otro'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post('/api/auth/validate-password/', {'password': 'incorrecta'})
+        self.assertNotIn('confirmacion', response.data)
+
+    def test_token_sirve_para_varias_operaciones_sin_hash(self):
+        token = self._confirmar()
+        with mock.patch('django.contrib.auth.hashers.check_password') as check_password:
+            for _ in range(3):
+                response = self._eliminar_cliente(token)
+                self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+            response = self._eliminar_cliente(HTTP_X_CONFIRMACION=token)
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        check_password.assert_not_called()
+
+    def test_token_invalido_se_rechaza(self):
+        response = self._eliminar_cliente('no-es-un-token')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data['detail'].code, 'confirmacion_invalida')
+
+        # Token de otro usuario
+        otro = confirmacion.emitir(self.otro_admin)
+        self.assertEqual(self._eliminar_cliente(otro).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Cliente.objects.count(), 2)
+
+    def test_nueva_validacion_reemplaza_el_token(self):
+        anterior = self._confirmar()
+        nuevo = self._confirmar()
+        self.assertEqual(self._eliminar_cliente(anterior).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self._eliminar_cliente(nuevo).status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_token_no_depende_de_la_cache(self):
+        # Otro proceso (con su propia LocMemCache) acepta el token emitido en este
+        token = self._confirmar()
+        cache.clear()
+        self.assertEqual(self._eliminar_cliente(token).status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_cambio_de_contrasena_revoca(self):
+        token = self._confirmar()
+        self.admin.set_password('nueva-clave-123')
+        self.admin.save()
+        self.assertEqual(self._eliminar_cliente(token).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_token_caducado(self):
+        token = self._confirmar()
+        with mock.patch.object(confirmacion, 'STEP_UP_TTL', -1):
+            self.assertEqual(self._eliminar_cliente(token).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_obligatorio_segun_configuracion(self):
+        self.assertEqual(self._eliminar_cliente().status_code, status.HTTP_204_NO_CONTENT)
+
+        producto = Producto.objects.create(nombre='Producto', precio='10.00', stock=5)
+        with mock.patch.object(confirmacion, 'STEP_UP_REQUERIDO', True):
+            response = self.client.post(f'/api/productos/{producto.id}/eliminar-con-motivo/', {'motivo': 'Baja'})
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+            self.assertEqual(response.data['detail'].code, 'confirmacion_requerida')
+            self.assertTrue(Producto.objects.filter(pk=producto.pk).exists())
+
+            response = self.client.post(
+                f'/api/productos/{producto.id}/eliminar-con-motivo/',
+                {'motivo': 'Baja', 'confirmacion': self._confirmar()},
+            )
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
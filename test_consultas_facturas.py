@@ -0,0 +1,127 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.facturacion.models import Factura, FacturaItem
+from apps.clientes.models import Cliente
+from apps.productos.models import Producto
+
+User = get_user_model()
+
+
+class TestConsultasFacturas(TestCase):
+    """
+    Tests que fijan el número de consultas de FacturaViewSet:
+    no debe crecer con la cantidad de facturas ni de ítems (sin N+1).
+    """
+
+    # Facturas + ítems precargados (force_authenticate no consulta el usuario)
+    CONSULTAS_LISTADO = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='admin',
+            email='admin@test.com',
+            password='testpass123',
+            role='Administrador'
+        )
+        cls.cliente = Cliente.objects.create(nombre='Cliente Test', email='cliente@test.com')
+        cls.productos = [
+            Producto.objects.create(nombre=f'Producto {i}', precio=Decimal('10.00'), stock=100000)
+            for i in range(3)
+        ]
+        # bulk_create no pasa por save(), así que no descuenta stock: basta para medir consultas
+        facturas = Factura.objects.bulk_create(
+            [Factura(creador=cls.user, cliente=cls.cliente) for _ in range(1000)]
+        )
+        FacturaItem.objects.bulk_create([
+            FacturaItem(factura=factura, producto=producto, cantidad=1)
+            for factura in facturas
+            for producto in cls.productos
+        ])
+        cls.factura = facturas[0]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _contar(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(consultas)
+
+    def test_listado_con_consultas_constantes(self):
+        for tamano in (10, 100, 1000):
+            with self.subTest(page_size=tamano):
+                response, consultas = self._contar(f'/api/facturas/?page_size={tamano}')
+                self.assertEqual(len(response.data['results']), tamano)
+                self.assertEqual(len(response.data['results'][0]['items']), 3)
+                self.assertEqual(consultas, self.CONSULTAS_LISTADO)
+
+    def test_detalle_precarga_items(self):
+        response, consultas = self._contar(f'/api/facturas/{self.factura.id}/')
+        self.assertEqual(len(response.data['items']), 3)
+        self.assertEqual(consultas, 2)
+
+    def test_pdf_precarga_cliente_y_productos(self):
+        # Factura con cliente + ítems + productos
+        _, consultas = self._contar(f'/api/facturas/{self.factura.id}/view_pdf/')
+        self.assertEqual(consultas, 3)
+
+    def _lecturas(self, consultas):
+        return sum(consulta['sql'].startswith('SELECT') for consulta in consultas.captured_queries)
+
+    def test_anular_no_consulta_por_item(self):
+        Factura.objects.filter(pk=self.factura.pk).update(estado='EMITIDA')
+        # Lecturas: factura, ítems y productos. El resto son escrituras con sus savepoints:
+        # stock de cada producto, la factura, los resúmenes diarios y las compras conjuntas
+        with self.assertNumQueries(45) as consultas:
+            response = self.client.post(f'/api/facturas/{self.factura.id}/anular_factura/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._lecturas(consultas), 3)
+        self.assertEqual(len(response.data['stock_restituido']), 3)
+        for producto in self.productos:
+            producto.refresh_from_db()
+            self.assertEqual(producto.stock, 100001)
+
+    def test_eliminar_no_consulta_por_item(self):
+        # Lecturas: factura con cliente, ítems y productos. Escrituras: stock de cada
+        # producto y los DELETE de ítems, correos y factura, con sus savepoints
+        with self.assertNumQueries(13) as consultas:
+            response = self.client.delete(f'/api/facturas/{self.factura.id}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self._lecturas(consultas), 3)
+        for producto in self.productos:
+            producto.refresh_from_db()
+            self.assertEqual(producto.stock, 100001)
+
+    def test_vista_resumen_una_consulta(self):
+        response, consultas = self._contar('/api/facturas/?vista=resumen&page_size=1000')
+        self.assertEqual(len(response.data['results']), 1000)
+        self.assertEqual(consultas, 1)
+
+    def test_vista_resumen_coincide_con_el_listado_completo(self):
+        completo, _ = self._contar('/api/facturas/?page_size=5')
+        resumen, _ = self._contar('/api/facturas/?vista=resumen&page_size=5')
+
+        for fila, factura in zip(resumen.data['results'], completo.data['results']):
+            self.assertEqual(
+                set(fila), {'id', 'numero_factura', 'cliente', 'cliente_nombre', 'fecha', 'estado', 'total'}
+            )
+            for campo in ('id', 'numero_factura', 'cliente', 'fecha', 'estado', 'total'):
+                self.assertEqual(fila[campo], factura[campo])
+            self.assertEqual(fila['cliente_nombre'], 'Cliente Test')
+
+        # El cursor de la vista resumen recorre las mismas páginas
+        siguiente = self.client.get(resumen.data['next'])
+        siguiente_completo = self.client.get(completo.data['next'])
+        self.assertEqual(
+            [f['id'] for f in siguiente.data['results']],
+            [f['id'] for f in siguiente_completo.data['results']],
+        )
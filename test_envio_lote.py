@@ -0,0 +1,150 @@
+from django.utils import timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.facturacion.models import Factura, FacturaItem, CorreoPendiente
+from apps.facturacion.correo import seleccionar_facturas_envio, enviar_facturas_en_lote
+from apps.clientes.models import Cliente
+from apps.productos.models import Producto
+
+User = get_user_model()
+
+
+class BackendContador(EmailBackend):
+    """Backend locmem que cuenta cuántas conexiones y llamadas a send_messages se hacen."""
+    aperturas = 0
+    llamadas = 0
+
+    def open(self):
+        BackendContador.aperturas += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        BackendContador.llamadas += 1
+        return super().send_messages(messages)
+
+
+class TestEnvioLote(TestCase):
+    """
+    Tests para el envío masivo de facturas por correo.
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        BackendContador.aperturas = 0
+        BackendContador.llamadas = 0
+        self.user = User.objects.create_user(
+            username='ventas',
+            email='ventas@test.com',
+            password='testpass123',
+            role='Ventas'
+        )
+        self.cliente = Cliente.objects.create(nombre='Cliente Test', email='cliente@test.com')
+        producto = Producto.objects.create(nombre='Producto Test', precio=Decimal('10.00'), stock=1000)
+        self.facturas = []
+        for _ in range(7):
+            factura = Factura.objects.create(creador=self.user, cliente=self.cliente)
+            FacturaItem.objects.create(factura=factura, producto=producto, cantidad=1)
+            self.facturas.append(factura)
+        Factura.objects.update(estado='EMITIDA')
+        # Un borrador del mismo día no debe enviarse por defecto
+        Factura.objects.create(creador=self.user, cliente=self.cliente)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_seleccion_por_defecto_solo_emitidas(self):
+        facturas = seleccionar_facturas_envio(fecha=timezone.localdate())
+        self.assertEqual(facturas.count(), 7)
+
+    def test_seleccion_requiere_filtro(self):
+        with self.assertRaises(ValueError):
+            seleccionar_facturas_envio()
+
+    @override_settings(EMAIL_BACKEND='test_envio_lote.BackendContador')
+    def test_envio_en_lote_una_conexion(self):
+        facturas = seleccionar_facturas_envio(estado='EMITIDA')
+        with self.assertNumQueries(3):
+            resultado = enviar_facturas_en_lote(facturas, tamano_lote=3)
+
+        self.assertEqual(resultado['enviados'], 7)
+        self.assertEqual(resultado['lotes'], 3)
+        self.assertGreater(resultado['mensajes_por_segundo'], 0)
+        self.assertEqual(BackendContador.aperturas, 1)
+        self.assertEqual(BackendContador.llamadas, 3)
+        self.assertEqual(len(mail.outbox), 7)
+        self.assertTrue(all(m.attachments[0][1].startswith(b'%PDF') for m in mail.outbox))
+
+    @override_settings(EMAIL_BACKEND='test_envio_lote.BackendContador')
+    def test_envio_en_lote_lee_las_facturas_al_ritmo_del_envio(self):
+        leidas = []
+
+        def facturas():
+            for factura in seleccionar_facturas_envio(estado='EMITIDA').iterator(chunk_size=2):
+                leidas.append(factura.id)
+                yield factura
+
+        adelantadas = []
+        send_messages = BackendContador.send_messages
+
+        def contar(backend, messages):
+            adelantadas.append(len(leidas) - len(mail.outbox))
+            return send_messages(backend, messages)
+
+        with mock.patch.object(BackendContador, 'send_messages', contar):
+            resultado = enviar_facturas_en_lote(facturas(), tamano_lote=1)
+        self.assertEqual(resultado['enviados'], 7)
+        # Lote en curso + cola acotada (2 * tamano_lote) + el que se está construyendo
+        self.assertLessEqual(max(adelantadas), 4)
+
+    def test_seleccion_por_ids_excluye_borradores_y_anuladas(self):
+        borrador = Factura.objects.get(estado='BORRADOR')
+        Factura.objects.filter(pk=self.facturas[1].pk).update(estado='ANULADA', anulada=True)
+        ids = [borrador.id, self.facturas[0].id, self.facturas[1].id]
+
+        self.assertEqual(list(seleccionar_facturas_envio(ids=ids)), [self.facturas[0]])
+        with self.assertRaises(ValueError):
+            seleccionar_facturas_envio(ids=ids, estado='BORRADOR')
+
+    def test_comando_enviar_facturas_lote(self):
+        salida = StringIO()
+        ids = ','.join(str(f.id) for f in self.facturas[:2])
+        call_command('enviar_facturas_lote', ids=ids, stdout=salida)
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(CorreoPendiente.objects.filter(estado='ENVIADO').count(), 2)
+        self.assertIn('msg/s', salida.getvalue())
+
+        # Repetir el comando no reenvía lo ya enviado
+        call_command('enviar_facturas_lote', ids=ids, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(CorreoPendiente.objects.count(), 2)
+
+    def test_comando_enviar_facturas_lote_solo_encolar(self):
+        call_command('enviar_facturas_lote', fecha=timezone.localdate().isoformat(),
+                     solo_encolar=True, stdout=StringIO())
+
+        self.assertEqual(CorreoPendiente.objects.filter(estado='PENDIENTE').count(), 7)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_endpoint_enviar_lote_encola(self):
+        response = self.client.post('/api/facturas/enviar-lote/', {
+            'fecha': timezone.localdate().isoformat(), 'estado': 'EMITIDA'
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['encolados'], 7)
+        self.assertEqual(CorreoPendiente.objects.count(), 7)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_endpoint_enviar_lote_sin_filtro(self):
+        response = self.client.post('/api/facturas/enviar-lote/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,130 @@
+import tempfile
+from io import StringIO
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.facturacion.models import Factura, FacturaItem
+from apps.facturacion.documentos import consultar_estados_cuenta, rango_periodo
+from apps.clientes.models import Cliente
+from apps.productos.models import Producto
+
+User = get_user_model()
+
+
+class TestEstadoCuenta(TestCase):
+    """
+    Tests para los estados de cuenta mensuales por cliente.
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        self.user = User.objects.create_user(
+            username='ventas',
+            email='ventas@test.com',
+            password='testpass123',
+            role='Ventas'
+        )
+        self.cliente = Cliente.objects.create(nombre='Cliente A', email='a@test.com')
+        self.otro_cliente = Cliente.objects.create(nombre='Cliente B', email='b@test.com')
+        self.producto = Producto.objects.create(nombre='Producto', precio=Decimal('10.00'), stock=100)
+
+        fecha = timezone.make_aware(datetime(2025, 3, 15, 12, 0))
+        self.emitida = self._crear_factura(self.cliente, 'EMITIDA', 2, fecha)
+        self.pagada = self._crear_factura(self.cliente, 'PAGADA', 1, fecha)
+        self.anulada = self._crear_factura(self.cliente, 'ANULADA', 3, fecha)
+        self._crear_factura(self.cliente, 'BORRADOR', 1, fecha)
+        self._crear_factura(self.otro_cliente, 'EMITIDA', 1, fecha)
+        # Factura de otro periodo, no debe aparecer
+        self._crear_factura(self.cliente, 'EMITIDA', 1, timezone.make_aware(datetime(2025, 4, 1, 0, 0)))
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _crear_factura(self, cliente, estado, cantidad, fecha):
+        factura = Factura.objects.create(creador=self.user, cliente=cliente)
+        FacturaItem.objects.create(factura=factura, producto=self.producto, cantidad=cantidad)
+        # fecha es auto_now_add, se ajusta con update()
+        Factura.objects.filter(pk=factura.pk).update(estado=estado, fecha=fecha)
+        return factura
+
+    def test_rango_periodo(self):
+        inicio, fin = rango_periodo('2025-12')
+        self.assertEqual((inicio.year, inicio.month), (2025, 12))
+        self.assertEqual((fin.year, fin.month), (2026, 1))
+        with self.assertRaises(ValueError):
+            rango_periodo('2025-13')
+
+    def test_una_sola_consulta_para_todos_los_clientes(self):
+        with self.assertNumQueries(1):
+            estados = consultar_estados_cuenta('2025-03')
+        self.assertEqual(len(estados), 2)
+
+    def test_totales_excluyen_anuladas_y_borradores(self):
+        estado = consultar_estados_cuenta('2025-03', cliente_ids=[self.cliente.id])[0]
+        self.assertEqual(len(estado['facturas']), 3)
+        totales = estado['totales']
+        self.assertEqual(totales['subtotal'], Decimal('30.00'))
+        self.assertEqual(totales['total'], Decimal('34.50'))
+        self.assertEqual(totales['pagado'], Decimal('11.50'))
+        self.assertEqual(totales['pendiente'], Decimal('23.00'))
+        self.assertEqual(totales['anuladas'], 1)
+
+    def test_endpoint_estado_cuenta_pdf(self):
+        response = self.client.get('/api/facturas/estado-cuenta/', {
+            'cliente': self.cliente.id, 'periodo': '2025-03'
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(response.content.startswith(b'%PDF'))
+
+    def test_endpoint_estado_cuenta_sin_facturas(self):
+        response = self.client.get('/api/facturas/estado-cuenta/', {
+            'cliente': self.cliente.id, 'periodo': '2024-01'
+        })
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_endpoint_estado_cuenta_periodo_invalido(self):
+        response = self.client.get('/api/facturas/estado-cuenta/', {
+            'cliente': self.cliente.id, 'periodo': 'marzo'
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'El periodo debe tener el formato YYYY-MM')
+
+    def test_endpoint_estado_cuenta_cliente_invalido(self):
+        response = self.client.post('/api/facturas/enviar-estado-cuenta/', {
+            'cliente': 'abc', 'periodo': '2025-03'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # No se expone el mensaje interno de int()
+        self.assertEqual(response.data['error'], 'El cliente debe ser un número entero')
+
+    def test_enviar_estado_cuenta(self):
+        response = self.client.post('/api/facturas/enviar-estado-cuenta/', {
+            'cliente': self.cliente.id, 'periodo': '2025-03'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(len(mail.outbox), 0)
+
+        call_command('procesar_correos', una_vez=True, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['a@test.com'])
+        self.assertEqual(mail.outbox[0].attachments[0][0], f'estado_cuenta_{self.cliente.id}_2025-03.pdf')
+
+    def test_comando_genera_y_envia_estados(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            call_command('generar_estados_cuenta', periodo='2025-03', procesos=1,
+                         salida=directorio, enviar=True, stdout=StringIO())
+            archivos = sorted(p.name for p in Path(directorio).iterdir())
+        self.assertEqual(archivos, [
+            f'estado_cuenta_{self.cliente.id}_2025-03.pdf',
+            f'estado_cuenta_{self.otro_cliente.id}_2025-03.pdf',
+        ])
+        self.assertEqual(len(mail.outbox), 2)
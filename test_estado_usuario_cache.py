@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.usuarios import cache as cache_usuarios
+from apps.usuarios.middleware import CheckUserIsActiveMiddleware
+
+User = get_user_model()
+
+
+@override_settings(CACHE_USUARIOS=True)
+class TestEstadoUsuarioCache(TestCase):
+    """
+    Tests para la caché del estado de usuario usada por CheckUserIsActiveMiddleware.
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        cache.clear()
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@test.com', password='testpass123', role='Administrador'
+        )
+        self.vendedor = User.objects.create_user(
+            username='ventas', email='ventas@test.com', password='testpass123', role='Ventas'
+        )
+        self.middleware = CheckUserIsActiveMiddleware(lambda request: HttpResponse('ok'))
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def _peticion(self, usuario, ruta='/api/facturas/'):
+        request = RequestFactory().get(ruta)
+        request.user = usuario
+        request.session = SessionStore()
+        return self.middleware(request)
+
+    def test_consulta_una_vez_por_usuario(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self._peticion(self.vendedor).status_code, 200)
+        with self.assertNumQueries(0):
+            for _ in range(5):
+                self.assertEqual(self._peticion(self.vendedor).status_code, 200)
+
+    def test_toggle_active_se_aplica_de_inmediato(self):
+        self._peticion(self.vendedor)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/usuarios/{self.vendedor.id}/toggle_active/')
+        self.assertFalse(response.data['is_active'])
+
+        response = self._peticion(self.vendedor)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn(b'USER_INACTIVE', response.content)
+
+        # Petición web: redirige al login
+        response = self._peticion(self.vendedor, ruta='/facturacion/')
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('inactive=1', response['Location'])
+
+    def test_eliminar_con_motivo_se_aplica_de_inmediato(self):
+        self._peticion(self.vendedor)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f'/api/usuarios/{self.vendedor.id}/eliminar-con-motivo/', {'motivo': 'Baja'}
+            )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self._peticion(self.vendedor)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn(b'USER_DELETED', response.content)
+
+    def test_guardar_usuario_invalida(self):
+        self.assertEqual(cache_usuarios.estado_usuario(self.vendedor.pk), cache_usuarios.ACTIVO)
+        self.vendedor.is_active = False
+        self.vendedor.save()
+        self.assertEqual(cache_usuarios.estado_usuario(self.vendedor.pk), cache_usuarios.INACTIVO)
+
+    def test_update_requiere_invalidar(self):
+        self.assertEqual(cache_usuarios.estado_usuario(self.vendedor.pk), cache_usuarios.ACTIVO)
+        User.objects.filter(pk=self.vendedor.pk).update(is_active=False)
+        self.assertEqual(cache_usuarios.estado_usuario(self.vendedor.pk), cache_usuarios.ACTIVO)
+        cache_usuarios.invalidar_usuario(self.vendedor.pk)
+        self.assertEqual(cache_usuarios.estado_usuario(self.vendedor.pk), cache_usuarios.INACTIVO)
@@ -0,0 +1,160 @@
+import csv
+import gzip
+import io
+import shutil
+import tempfile
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.facturacion.models import Factura, FacturaItem
+from apps.facturacion.contabilidad import exportar_contabilidad, leer_manifest
+from apps.clientes.models import Cliente
+from apps.productos.models import Producto
+
+User = get_user_model()
+
+
+def leer_csv_gz(ruta):
+    with gzip.open(ruta, 'rt', encoding='utf-8', newline='') as archivo:
+        return list(csv.DictReader(archivo))
+
+
+class TestExportacionContabilidad(TestCase):
+    """
+    Tests para la exportación contable incremental.
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        self.directorio = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directorio, ignore_errors=True)
+
+        self.user = User.objects.create_user(
+            username='admin', email='admin@test.com', password='testpass123', role='Administrador'
+        )
+        self.cliente = Cliente.objects.create(nombre='Cliente Test', email='cliente@test.com')
+        self.producto = Producto.objects.create(nombre='Producto', precio=Decimal('10.00'), stock=100)
+
+        self.facturas = {}
+        for dia, cantidad in ((3, 2), (3, 1), (10, 4)):
+            factura = Factura.objects.create(creador=self.user, cliente=self.cliente)
+            FacturaItem.objects.create(factura=factura, producto=self.producto, cantidad=cantidad)
+            factura.save()
+            fecha = timezone.make_aware(datetime(2025, 3, dia, 12, 0))
+            Factura.objects.filter(pk=factura.pk).update(fecha=fecha)
+            self.facturas.setdefault(dia, []).append(factura)
+
+    def test_exporta_particiones_por_dia(self):
+        resumen = exportar_contabilidad('2025-03', directorio=self.directorio)
+        self.assertEqual(resumen['escritos'], ['2025-03-03', '2025-03-10'])
+
+        manifest = leer_manifest(self.directorio)
+        particion = manifest['particiones']['2025-03-03']
+        self.assertEqual(particion['huella']['facturas'], 2)
+        self.assertEqual(particion['archivos']['lineas']['filas'], 2)
+
+        facturas = leer_csv_gz(self.directorio / 'facturas-2025-03-03.csv.gz')
+        self.assertEqual([f['total'] for f in facturas], ['23.00', '11.50'])
+        lineas = leer_csv_gz(self.directorio / 'lineas-2025-03-10.csv.gz')
+        self.assertEqual(lineas[0]['subtotal'], '40.00')
+
+    def test_incremental_solo_reescribe_dias_modificados(self):
+        exportar_contabilidad('2025-03', directorio=self.directorio)
+        antes = (self.directorio / 'facturas-2025-03-10.csv.gz').stat().st_mtime_ns
+
+        resumen = exportar_contabilidad('2025-03', directorio=self.directorio)
+        self.assertEqual(resumen['escritos'], [])
+        self.assertEqual(resumen['sin_cambios'], ['2025-03-03', '2025-03-10'])
+
+        # Un cambio en una factura del día 3 solo reescribe ese día
+        factura = self.facturas[3][0]
+        factura.refresh_from_db()
+        factura.estado = 'EMITIDA'
+        factura.save()
+        resumen = exportar_contabilidad('2025-03', directorio=self.directorio)
+        self.assertEqual(resumen['escritos'], ['2025-03-03'])
+        self.assertEqual((self.directorio / 'facturas-2025-03-10.csv.gz').stat().st_mtime_ns, antes)
+
+        estados = [f['estado'] for f in leer_csv_gz(self.directorio / 'facturas-2025-03-03.csv.gz')]
+        self.assertIn('EMITIDA', estados)
+
+    def test_cambio_de_precio_o_cliente_reescribe_sus_dias(self):
+        otro = Producto.objects.create(nombre='Otro', precio=Decimal('5.00'), stock=100)
+        factura = self.facturas[10][0]
+        factura.refresh_from_db()
+        FacturaItem.objects.create(factura=factura, producto=otro, cantidad=2)
+        exportar_contabilidad('2025-03', directorio=self.directorio)
+
+        # El precio exportado es el actual: cambia la huella de los días donde aparece el producto
+        otro.precio = Decimal('7.50')
+        otro.save()
+        resumen = exportar_contabilidad('2025-03', directorio=self.directorio)
+        self.assertEqual(resumen['escritos'], ['2025-03-10'])
+        lineas = leer_csv_gz(self.directorio / 'lineas-2025-03-10.csv.gz')
+        self.assertIn('15.00', [linea['subtotal'] for linea in lineas])
+
+        self.cliente.nombre = 'Cliente Renombrado'
+        self.cliente.save()
+        resumen = exportar_contabilidad('2025-03', directorio=self.directorio)
+        self.assertEqual(resumen['escritos'], ['2025-03-03', '2025-03-10'])
+        facturas = leer_csv_gz(self.directorio / 'facturas-2025-03-03.csv.gz')
+        self.assertEqual({f['cliente'] for f in facturas}, {'Cliente Renombrado'})
+
+    def test_venta_nueva_no_reescribe_dias_anteriores(self):
+        exportar_contabilidad('2025-03', directorio=self.directorio)
+        # La venta baja el stock del producto, que no se exporta
+        factura = Factura.objects.create(creador=self.user, cliente=self.cliente)
+        FacturaItem.objects.create(factura=factura, producto=self.producto, cantidad=1)
+        Factura.objects.filter(pk=factura.pk).update(fecha=timezone.make_aware(datetime(2025, 3, 20, 12, 0)))
+
+        resumen = exportar_contabilidad('2025-03', directorio=self.directorio)
+        self.assertEqual(resumen['escritos'], ['2025-03-20'])
+        self.assertEqual(resumen['sin_cambios'], ['2025-03-03', '2025-03-10'])
+
+    def test_dia_sin_facturas_se_elimina(self):
+        exportar_contabilidad('2025-03', directorio=self.directorio)
+        Factura.objects.filter(pk=self.facturas[10][0].pk).delete()
+
+        resumen = exportar_contabilidad('2025-03', directorio=self.directorio)
+        self.assertEqual(resumen['eliminados'], ['2025-03-10'])
+        self.assertFalse((self.directorio / 'facturas-2025-03-10.csv.gz').exists())
+        self.assertNotIn('2025-03-10', leer_manifest(self.directorio)['particiones'])
+
+    def test_comando(self):
+        salida = io.StringIO()
+        call_command('exportar_contabilidad', '--periodo', '2025-03',
+                     '--salida', str(self.directorio), stdout=salida)
+        self.assertIn('2 día(s) escritos', salida.getvalue())
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        with override_settings(CONTABILIDAD_DIR=self.directorio):
+            response = client.post('/api/facturas/exportar-contabilidad/', {'periodo': '2025-03'}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['escritos']), 2)
+
+            response = client.get('/api/facturas/exportar-contabilidad/')
+            self.assertIn('2025-03-03', response.data['particiones'])
+
+            response = client.get('/api/facturas/exportar-contabilidad/?archivo=lineas-2025-03-03.csv.gz')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            contenido = gzip.decompress(b''.join(response.streaming_content)).decode()
+            self.assertTrue(contenido.startswith('id,factura_id'))
+
+            response = client.get('/api/facturas/exportar-contabilidad/?archivo=../settings.py')
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_endpoint_solo_administradores(self):
+        vendedor = User.objects.create_user(username='ventas', password='testpass123', role='Ventas')
+        client = APIClient()
+        client.force_authenticate(user=vendedor)
+        response = client.get('/api/facturas/exportar-contabilidad/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.facturacion.models import Factura, FacturaItem
+from apps.facturacion.exportacion import facturas_exportacion, generar_ndjson
+from apps.clientes.models import Cliente
+from apps.productos.models import Producto
+
+User = get_user_model()
+
+
+class TestExportacionFacturas(TestCase):
+    """
+    Tests para la exportación de facturas en NDJSON y CSV.
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        self.user = User.objects.create_user(
+            username='admin', email='admin@test.com', password='testpass123', role='Administrador'
+        )
+        self.cliente = Cliente.objects.create(nombre='Cliente Test', email='cliente@test.com')
+        self.producto_a = Producto.objects.create(nombre='Producto A', precio=Decimal('10.00'), stock=100)
+        self.producto_b = Producto.objects.create(nombre='Producto B', precio=Decimal('5.00'), stock=100)
+        for i in range(5):
+            factura = Factura.objects.create(creador=self.user, cliente=self.cliente)
+            FacturaItem.objects.create(factura=factura, producto=self.producto_a, cantidad=1)
+            FacturaItem.objects.create(factura=factura, producto=self.producto_b, cantidad=2)
+            factura.save()
+        Factura.objects.filter(pk=factura.pk).update(estado='EMITIDA')
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _contenido(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_exportar_ndjson(self):
+        response = self.client.get('/api/facturas/exportar/')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        lineas = self._contenido(response).splitlines()
+        self.assertEqual(len(lineas), 5)
+        factura = json.loads(lineas[0])
+        self.assertEqual(factura['cliente']['nombre'], 'Cliente Test')
+        self.assertEqual(factura['total'], '23.00')
+        self.assertEqual(
+            [(i['producto'], i['cantidad']) for i in factura['items']],
+            [('Producto A', 1), ('Producto B', 2)],
+        )
+
+    def test_exportar_csv_con_filtros(self):
+        response = self.client.get('/api/facturas/exportar/?formato=csv&estado=EMITIDA')
+        self.assertIn('text/csv', response['Content-Type'])
+        self.assertIn('facturas.csv', response['Content-Disposition'])
+
+        filas = list(csv.DictReader(io.StringIO(self._contenido(response))))
+        # Una fila por ítem de la única factura emitida
+        self.assertEqual(len(filas), 2)
+        self.assertEqual({f['estado'] for f in filas}, {'EMITIDA'})
+        self.assertEqual(filas[1]['subtotal_linea'], '10.00')
+
+    def test_formato_no_soportado(self):
+        response = self.client.get('/api/facturas/exportar/?formato=xml')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_items_precargados_por_bloques(self):
+        with CaptureQueriesContext(connection) as consultas:
+            lineas = list(generar_ndjson(facturas_exportacion(Factura.objects.all(), chunk_size=2)))
+        self.assertEqual(len(lineas), 5)
+        # Bloques keyset de 2 (2, 2 y 1 facturas): facturas + ítems + productos por bloque
+        self.assertEqual(len(consultas), 3 * 3)
+        self.assertEqual([json.loads(linea)['id'] for linea in lineas],
+                         list(Factura.objects.order_by('fecha', 'id').values_list('id', flat=True)))
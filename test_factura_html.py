@@ -0,0 +1,83 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.facturacion.models import Factura, FacturaItem
+from apps.facturacion.documentos import preparar_datos_factura, renderizar_html_factura
+from apps.clientes.models import Cliente
+from apps.productos.models import Producto
+
+User = get_user_model()
+
+
+class TestFacturaHTML(TestCase):
+    """
+    Tests para la vista HTML imprimible de facturas.
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='admin',
+            email='admin@test.com',
+            password='testpass123',
+            role='Administrador'
+        )
+        self.cliente = Cliente.objects.create(nombre='Cliente Test', email='cliente@test.com')
+        self.producto = Producto.objects.create(nombre='Producto HTML', precio=Decimal('100.00'), stock=50)
+        self.factura = Factura.objects.create(creador=self.user, cliente=self.cliente)
+        FacturaItem.objects.create(factura=self.factura, producto=self.producto, cantidad=2)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_view_html_endpoint(self):
+        response = self.client.get(f'/api/facturas/{self.factura.id}/view_html/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('text/html', response['Content-Type'])
+        contenido = response.content.decode()
+        self.assertIn('Producto HTML', contenido)
+        self.assertIn('$230.00', contenido)
+        self.assertIn('window.print()', contenido)
+
+    def test_html_y_pdf_comparten_datos(self):
+        datos = preparar_datos_factura(self.factura)
+        self.assertEqual(datos['subtotal'], Decimal('200.00'))
+        self.assertEqual(datos['total'], Decimal('230.00'))
+        self.assertEqual(datos['lineas'][0]['descripcion'], 'Producto HTML')
+
+    def test_factura_emitida_usa_fragmento_cacheado(self):
+        Factura.objects.filter(pk=self.factura.pk).update(estado='EMITIDA', numero_factura='FAC-000010')
+        factura = Factura.objects.select_related('cliente').get(pk=self.factura.pk)
+
+        primera = renderizar_html_factura(factura)
+        # Con el fragmento en caché solo se consulta su versión, no los ítems
+        with self.assertNumQueries(1):
+            segunda = renderizar_html_factura(factura)
+        self.assertEqual(primera, segunda)
+        self.assertIn('FAC-000010', segunda)
+
+    def test_editar_cliente_o_producto_renueva_el_fragmento(self):
+        Factura.objects.filter(pk=self.factura.pk).update(estado='EMITIDA')
+        url = f'/api/facturas/{self.factura.id}/view_html/'
+        self.client.get(url)
+
+        self.cliente.nombre = 'Cliente Renombrado'
+        self.cliente.save()
+        self.assertIn('Cliente Renombrado', self.client.get(url).content.decode())
+
+        self.producto.precio = Decimal('150.00')
+        self.producto.save()
+        self.assertIn('$150.00', self.client.get(url).content.decode())
+
+    def test_borrador_no_se_cachea(self):
+        renderizar_html_factura(self.factura)
+        self.producto.nombre = 'Producto Renombrado'
+        self.producto.save()
+
+        self.assertIn('Producto Renombrado', renderizar_html_factura(self.factura))
@@ -0,0 +1,123 @@
+import json
+import unittest
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.facturacion.models import Factura
+from apps.facturacion.filtros import filtrar_facturas
+from apps.clientes.models import Cliente
+
+User = get_user_model()
+
+
+# Motores cuyo plan de ejecución sabe leer usa_indice()
+MOTORES_EXPLAIN = ('sqlite', 'mysql')
+
+
+def _tablas_plan(nodo):
+    """
+    Nodos de tabla de un plan EXPLAIN FORMAT=JSON de MySQL, a cualquier profundidad:
+    con ORDER BY la tabla queda bajo ordering_operation, con joins bajo nested_loop.
+    """
+    if isinstance(nodo, dict):
+        if 'table_name' in nodo:
+            yield nodo
+        for valor in nodo.values():
+            yield from _tablas_plan(valor)
+    elif isinstance(nodo, list):
+        for valor in nodo:
+            yield from _tablas_plan(valor)
+
+
+def usa_indice(queryset):
+    """
+    Indica si el plan de ejecución accede a facturacion_factura por un índice
+    (y no con un recorrido completo de la tabla).
+    """
+    if connection.vendor == 'sqlite':
+        plan = queryset.explain()
+        lineas = [l for l in plan.splitlines() if 'facturacion_factura' in l]
+        return bool(lineas) and all('USING' in l and 'INDEX' in l for l in lineas)
+    plan = json.loads(queryset.explain(format='json'))
+    tablas = [t for t in _tablas_plan(plan) if t['table_name'] == 'facturacion_factura']
+    return bool(tablas) and all(t.get('access_type') != 'ALL' for t in tablas)
+
+
+class TestFiltrosFacturas(TestCase):
+    """
+    Tests para los filtros del listado de facturas.
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@test.com', password='testpass123', role='Administrador'
+        )
+        self.vendedor = User.objects.create_user(
+            username='ventas', email='ventas@test.com', password='testpass123', role='Ventas'
+        )
+        self.cliente_a = Cliente.objects.create(nombre='Cliente A', email='a@test.com')
+        self.cliente_b = Cliente.objects.create(nombre='Cliente B', email='b@test.com')
+
+        ahora = timezone.now()
+        datos = [
+            (self.admin, self.cliente_a, 'EMITIDA', 'FAC-000101', 0),
+            (self.admin, self.cliente_b, 'PAGADA', 'FAC-000102', 1),
+            (self.vendedor, self.cliente_a, 'EMITIDA', 'FAC-000210', 5),
+            (self.vendedor, self.cliente_b, 'BORRADOR', None, 10),
+        ]
+        self.facturas = []
+        for creador, cliente, estado, numero, dias in datos:
+            factura = Factura.objects.create(creador=creador, cliente=cliente)
+            Factura.objects.filter(pk=factura.pk).update(
+                estado=estado, numero_factura=numero, fecha=ahora - timedelta(days=dias)
+            )
+            self.facturas.append(factura.pk)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def _ids(self, consulta):
+        response = self.client.get(f'/api/facturas/?{consulta}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(f['id'] for f in response.data['results'])
+
+    def test_filtros(self):
+        f1, f2, f3, f4 = self.facturas
+        hace_3_dias = (timezone.localdate() - timedelta(days=3)).isoformat()
+
+        self.assertEqual(self._ids('estado=EMITIDA'), [f1, f3])
+        self.assertEqual(self._ids(f'cliente={self.cliente_b.id}'), [f2, f4])
+        self.assertEqual(self._ids(f'creador={self.vendedor.id}'), [f3, f4])
+        self.assertEqual(self._ids(f'fecha_desde={hace_3_dias}'), [f1, f2])
+        self.assertEqual(self._ids(f'fecha_hasta={hace_3_dias}'), [f3, f4])
+        self.assertEqual(self._ids('numero=FAC-0001'), [f1, f2])
+        self.assertEqual(self._ids(f'estado=emitida&creador={self.admin.id}'), [f1])
+
+    def test_filtros_en_vista_resumen(self):
+        self.assertEqual(self._ids('vista=resumen&estado=PAGADA'), [self.facturas[1]])
+
+    def test_parametros_invalidos(self):
+        for consulta in ('estado=CERRADA', 'cliente=abc', 'fecha_desde=15-03-2025'):
+            with self.subTest(consulta=consulta):
+                response = self.client.get(f'/api/facturas/?{consulta}')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @unittest.skipUnless(connection.vendor in MOTORES_EXPLAIN, "Plan de ejecución no soportado")
+    def test_cada_filtro_usa_un_indice(self):
+        filtros = {
+            'estado': {'estado': 'EMITIDA'},
+            'cliente': {'cliente': str(self.cliente_a.id)},
+            'creador': {'creador': str(self.admin.id)},
+            'rango de fechas': {'fecha_desde': '2025-01-01', 'fecha_hasta': '2025-01-31'},
+            'número': {'numero': 'FAC-0001'},
+        }
+        for nombre, parametros in filtros.items():
+            with self.subTest(filtro=nombre):
+                queryset = filtrar_facturas(Factura.objects.all(), parametros).order_by('-fecha', '-id')
+                self.assertTrue(usa_indice(queryset), queryset.explain())
@@ -0,0 +1,196 @@
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.facturacion.models import Factura, FacturaItem, CorreoPendiente
+from apps.facturacion import outbox
+from apps.facturacion.outbox import CircuitBreaker, procesar_lote, OUTBOX_MAX_INTENTOS
+from apps.clientes.models import Cliente
+from apps.productos.models import Producto
+
+User = get_user_model()
+
+
+class BackendFallido(BaseEmailBackend):
+    """Backend de correo que simula un servidor SMTP que rechaza todos los envíos."""
+
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError("Servidor SMTP no disponible")
+
+
+class BackendCaido(BaseEmailBackend):
+    """Backend de correo que simula un servidor SMTP que no acepta conexiones."""
+
+    def open(self):
+        raise ConnectionRefusedError("Servidor SMTP no disponible")
+
+    def send_messages(self, email_messages):
+        raise AssertionError("No debería enviarse nada sin conexión")
+
+
+class TestOutboxCorreos(TestCase):
+    """
+    Tests para la bandeja de salida de correos y el worker procesar_correos.
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        self.user = User.objects.create_user(
+            username='ventas',
+            email='ventas@test.com',
+            password='testpass123',
+            role='Ventas'
+        )
+        self.cliente = Cliente.objects.create(nombre='Cliente Test', email='cliente@test.com')
+        producto = Producto.objects.create(nombre='Producto Test', precio=Decimal('100.00'), stock=50)
+        self.factura = Factura.objects.create(creador=self.user, cliente=self.cliente, estado='EMITIDA')
+        FacturaItem.objects.create(factura=self.factura, producto=producto, cantidad=2)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_send_pdf_encola_y_responde_202(self):
+        response = self.client.post(f'/api/facturas/{self.factura.id}/send_pdf/')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        correo = CorreoPendiente.objects.get(pk=response.data['correo_id'])
+        self.assertEqual(correo.estado, 'PENDIENTE')
+        self.assertEqual(correo.destinatario, 'cliente@test.com')
+        # Nada se envía dentro de la petición
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_worker_envia_correo_pendiente(self):
+        self.client.post(f'/api/facturas/{self.factura.id}/send_pdf/')
+
+        call_command('procesar_correos', una_vez=True, stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['cliente@test.com'])
+        self.assertEqual(mail.outbox[0].attachments[0][2], 'application/pdf')
+        correo = CorreoPendiente.objects.get()
+        self.assertEqual(correo.estado, 'ENVIADO')
+        self.assertEqual(correo.intentos, 1)
+        self.assertIsNotNone(correo.enviado)
+
+    def test_correo_ya_enviado_no_se_reclama_de_nuevo(self):
+        self.client.post(f'/api/facturas/{self.factura.id}/send_pdf/')
+        procesar_lote()
+        resultado = procesar_lote()
+
+        self.assertEqual(resultado['reclamados'], 0)
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(EMAIL_BACKEND='test_outbox_correos.BackendFallido')
+    def test_fallo_reprograma_con_backoff(self):
+        self.client.post(f'/api/facturas/{self.factura.id}/send_pdf/')
+
+        resultado = procesar_lote(breaker=CircuitBreaker(umbral=100))
+
+        self.assertEqual(resultado['fallidos'], 1)
+        correo = CorreoPendiente.objects.get()
+        self.assertEqual(correo.estado, 'PENDIENTE')
+        self.assertEqual(correo.intentos, 1)
+        self.assertIn('no disponible', correo.ultimo_error)
+        self.assertGreater(correo.proximo_intento, timezone.now())
+
+    @override_settings(EMAIL_BACKEND='test_outbox_correos.BackendFallido')
+    def test_agotar_intentos_marca_fallido(self):
+        self.client.post(f'/api/facturas/{self.factura.id}/send_pdf/')
+        for _ in range(OUTBOX_MAX_INTENTOS):
+            CorreoPendiente.objects.update(proximo_intento=timezone.now())
+            procesar_lote(breaker=CircuitBreaker(umbral=100))
+
+        correo = CorreoPendiente.objects.get()
+        self.assertEqual(correo.estado, 'FALLIDO')
+        self.assertEqual(correo.intentos, OUTBOX_MAX_INTENTOS)
+
+    def test_bloqueo_vencido_cuenta_intento(self):
+        self.client.post(f'/api/facturas/{self.factura.id}/send_pdf/')
+        for intento in range(1, OUTBOX_MAX_INTENTOS + 1):
+            # El worker reclama el correo y muere sin marcarlo; el bloqueo vence
+            self.assertEqual(len(outbox.reclamar_lote(10)), 1)
+            self.assertEqual(CorreoPendiente.objects.get().intentos, intento)
+            CorreoPendiente.objects.update(proximo_intento=timezone.now())
+
+        self.assertEqual(outbox.reclamar_lote(10), [])
+        correo = CorreoPendiente.objects.get()
+        self.assertEqual(correo.estado, 'FALLIDO')
+        self.assertEqual(correo.intentos, OUTBOX_MAX_INTENTOS)
+
+    @override_settings(EMAIL_BACKEND='test_outbox_correos.BackendFallido')
+    def test_circuit_breaker_detiene_el_lote(self):
+        for _ in range(5):
+            self.client.post(f'/api/facturas/{self.factura.id}/send_pdf/')
+
+        breaker = CircuitBreaker(umbral=2, espera=60)
+        resultado = procesar_lote(breaker=breaker)
+
+        self.assertEqual(breaker.estado, 'abierto')
+        self.assertEqual(resultado['fallidos'], 2)
+        self.assertEqual(resultado['reprogramados'], 3)
+        # Los correos no intentados no consumen intentos
+        self.assertEqual(CorreoPendiente.objects.filter(intentos=0).count(), 3)
+        # Con el circuito abierto no se reclama nada
+        self.assertEqual(procesar_lote(breaker=breaker)['reclamados'], 0)
+
+    @override_settings(EMAIL_BACKEND='test_outbox_correos.BackendCaido')
+    def test_servidor_caido_no_consume_intentos(self):
+        self.client.post(f'/api/facturas/{self.factura.id}/send_pdf/')
+
+        resultado = procesar_lote(breaker=CircuitBreaker(umbral=100))
+
+        self.assertEqual(resultado['reprogramados'], 1)
+        correo = CorreoPendiente.objects.get()
+        self.assertEqual(correo.estado, 'PENDIENTE')
+        self.assertEqual(correo.intentos, 0)
+
+    def test_circuit_breaker_semiabierto_se_cierra_con_exito(self):
+        ahora = [0]
+        breaker = CircuitBreaker(umbral=1, espera=10, reloj=lambda: ahora[0])
+        breaker.registrar_fallo()
+        self.assertFalse(breaker.permite())
+
+        ahora[0] = 11
+        self.assertEqual(breaker.estado, 'semiabierto')
+        breaker.registrar_exito()
+        self.assertEqual(breaker.estado, 'cerrado')
+
+    def test_factura_eliminada_falla_sin_reintentos(self):
+        self.client.post(f'/api/facturas/{self.factura.id}/send_pdf/')
+        correo = CorreoPendiente.objects.get()
+        CorreoPendiente.objects.filter(pk=correo.pk).update(factura=None)
+
+        procesar_lote()
+
+        correo.refresh_from_db()
+        self.assertEqual(correo.estado, 'FALLIDO')
+
+    def test_error_al_construir_mensaje_cuenta_intento_y_sigue_el_lote(self):
+        self.client.post(f'/api/facturas/{self.factura.id}/send_pdf/')
+        self.client.post(f'/api/facturas/{self.factura.id}/send_pdf/')
+        primero, segundo = CorreoPendiente.objects.order_by('id')
+        construir = outbox.construir_mensaje
+
+        def construir_con_fallo(correo, **kwargs):
+            if correo.id == primero.id:
+                raise RuntimeError('Error de ReportLab')
+            return construir(correo, **kwargs)
+
+        with mock.patch.object(outbox, 'construir_mensaje', side_effect=construir_con_fallo):
+            resultado = procesar_lote()
+
+        self.assertEqual((resultado['fallidos'], resultado['enviados']), (1, 1))
+        primero.refresh_from_db()
+        self.assertEqual(primero.estado, 'PENDIENTE')
+        self.assertEqual(primero.intentos, 1)
+        self.assertIn('ReportLab', primero.ultimo_error)
+        segundo.refresh_from_db()
+        self.assertEqual(segundo.estado, 'ENVIADO')
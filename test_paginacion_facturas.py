@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.facturacion.models import Factura
+from apps.clientes.models import Cliente
+
+User = get_user_model()
+
+
+class TestPaginacionFacturas(TestCase):
+    """
+    Tests para la paginación keyset del listado de facturas.
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        self.user = User.objects.create_user(
+            username='admin',
+            email='admin@test.com',
+            password='testpass123',
+            role='Administrador'
+        )
+        self.cliente = Cliente.objects.create(nombre='Cliente Test', email='cliente@test.com')
+        ahora = timezone.now()
+        self.facturas = []
+        for i in range(7):
+            factura = Factura.objects.create(creador=self.user, cliente=self.cliente)
+            # Dos facturas por fecha para comprobar el desempate por id
+            Factura.objects.filter(pk=factura.pk).update(fecha=ahora - timedelta(days=i // 2))
+            self.facturas.append(factura.pk)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _ids(self, response):
+        return [factura['id'] for factura in response.data['results']]
+
+    def test_recorrido_completo_sin_duplicados(self):
+        esperado = list(
+            Factura.objects.order_by('-fecha', '-id').values_list('id', flat=True)
+        )
+        vistos = []
+        url = '/api/facturas/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            vistos.extend(self._ids(response))
+            url = response.data['next']
+
+        self.assertEqual(vistos, esperado)
+
+    def test_enlace_previous_devuelve_pagina_anterior(self):
+        primera = self.client.get('/api/facturas/?page_size=3')
+        self.assertIsNone(primera.data['previous'])
+
+        segunda = self.client.get(primera.data['next'])
+        self.assertIsNotNone(segunda.data['previous'])
+
+        vuelta = self.client.get(segunda.data['previous'])
+        self.assertEqual(self._ids(vuelta), self._ids(primera))
+        self.assertIsNone(vuelta.data['previous'])
+
+    def test_tamano_de_pagina_limitado(self):
+        response = self.client.get('/api/facturas/?page_size=0')
+        self.assertEqual(len(response.data['results']), 1)
+
+        response = self.client.get('/api/facturas/')
+        self.assertEqual(len(response.data['results']), 7)
+        self.assertIsNone(response.data['next'])
+
+    def test_cursor_invalido(self):
+        response = self.client.get('/api/facturas/?cursor=no-es-un-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_otros_listados_paginan_solo_con_limit(self):
+        response = self.client.get('/api/clientes/')
+        self.assertIsInstance(response.data, list)
+
+        response = self.client.get('/api/clientes/?limit=1')
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(len(response.data['results']), 1)
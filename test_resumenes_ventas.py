@@ -0,0 +1,156 @@
+import io
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.facturacion.models import (
+    Factura, FacturaItem,
+    ResumenDiarioEstado, ResumenDiarioProducto, ResumenDiarioCliente, ResumenDiarioCreador,
+)
+from apps.facturacion.resumenes import metricas
+from apps.clientes.models import Cliente
+from apps.productos.models import Producto
+
+User = get_user_model()
+
+
+def contenido_resumenes():
+    """Filas no vacías de todas las tablas de resumen, para comparar."""
+    return {
+        'estado': sorted(ResumenDiarioEstado.objects.exclude(facturas=0).values_list('dia', 'estado', 'facturas', 'total')),
+        'producto': sorted(ResumenDiarioProducto.objects.exclude(facturas=0).values_list('dia', 'producto_id', 'cantidad', 'facturas', 'total')),
+        'cliente': sorted(ResumenDiarioCliente.objects.exclude(facturas=0).values_list('dia', 'cliente_id', 'facturas', 'total')),
+        'creador': sorted(ResumenDiarioCreador.objects.exclude(facturas=0).values_list('dia', 'creador_id', 'facturas', 'total')),
+    }
+
+
+class TestResumenesVentas(TestCase):
+    """
+    Tests para los resúmenes diarios de ventas y las métricas.
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='admin', email='admin@test.com', password='testpass123', role='Administrador'
+        )
+        self.cliente = Cliente.objects.create(nombre='Cliente Test', email='cliente@test.com')
+        self.producto_a = Producto.objects.create(nombre='Producto A', precio=Decimal('10.00'), stock=1000)
+        self.producto_b = Producto.objects.create(nombre='Producto B', precio=Decimal('4.00'), stock=1000)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.hoy = timezone.localdate()
+
+    def _crear_factura(self, cantidad_a=1, cantidad_b=0):
+        factura = Factura.objects.create(creador=self.user, cliente=self.cliente)
+        FacturaItem.objects.create(factura=factura, producto=self.producto_a, cantidad=cantidad_a)
+        if cantidad_b:
+            FacturaItem.objects.create(factura=factura, producto=self.producto_b, cantidad=cantidad_b)
+        return factura
+
+    def _emitir(self, factura):
+        response = self.client.post(f'/api/facturas/{factura.id}/emitir/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_borradores_no_cuentan(self):
+        self._crear_factura()
+        self.assertFalse(ResumenDiarioEstado.objects.exists())
+
+    def test_ciclo_de_vida(self):
+        factura = self._crear_factura(cantidad_a=2, cantidad_b=3)
+        self._emitir(factura)
+
+        estado = ResumenDiarioEstado.objects.get(dia=self.hoy, estado='EMITIDA')
+        self.assertEqual((estado.facturas, estado.total), (1, Decimal('36.80')))
+        producto = ResumenDiarioProducto.objects.get(dia=self.hoy, producto=self.producto_b)
+        self.assertEqual((producto.cantidad, producto.total), (3, Decimal('12.00')))
+        self.assertEqual(ResumenDiarioCliente.objects.get(cliente=self.cliente).total, Decimal('36.80'))
+        self.assertEqual(ResumenDiarioCreador.objects.get(creador=self.user).facturas, 1)
+
+        self.client.post(f'/api/facturas/{factura.id}/marcar_pagada/')
+        self.assertEqual(ResumenDiarioEstado.objects.get(estado='EMITIDA').facturas, 0)
+        self.assertEqual(ResumenDiarioEstado.objects.get(estado='PAGADA').facturas, 1)
+        self.assertEqual(ResumenDiarioProducto.objects.get(producto=self.producto_b).cantidad, 3)
+
+        self.client.post(f'/api/facturas/{factura.id}/anular_factura/')
+        self.assertEqual(ResumenDiarioEstado.objects.get(estado='PAGADA').facturas, 0)
+        self.assertEqual(ResumenDiarioEstado.objects.get(estado='ANULADA').facturas, 1)
+        self.assertEqual(ResumenDiarioProducto.objects.get(producto=self.producto_b).cantidad, 0)
+        self.assertEqual(ResumenDiarioCliente.objects.get(cliente=self.cliente).total, Decimal('0'))
+
+        Factura.objects.get(pk=factura.pk).delete()
+        self.assertEqual(ResumenDiarioEstado.objects.get(estado='ANULADA').facturas, 0)
+
+    def test_eliminar_factura_emitida(self):
+        factura = self._crear_factura(cantidad_a=1)
+        factura.emitir()
+        Factura.objects.get(pk=factura.pk).delete()
+        self.assertEqual(contenido_resumenes()['estado'], [])
+        self.assertEqual(contenido_resumenes()['producto'], [])
+
+    def test_crear_con_estado_emitida_queda_en_borrador(self):
+        response = self.client.post('/api/facturas/', {
+            'cliente': self.cliente.id, 'estado': 'EMITIDA',
+            'items': [{'producto': self.producto_a.id, 'cantidad': 2}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['estado'], 'BORRADOR')
+        self.assertEqual(contenido_resumenes()['producto'], [])
+
+        self._emitir(Factura.objects.get(pk=response.data['id']))
+        self.assertEqual(contenido_resumenes()['producto'], [(self.hoy, self.producto_a.id, 2, 1, Decimal('20.00'))])
+        incremental = contenido_resumenes()
+        call_command('reconstruir_resumenes', stdout=io.StringIO())
+        self.assertEqual(contenido_resumenes(), incremental)
+
+    def test_reconstruir_coincide_con_incremental(self):
+        facturas = [self._crear_factura(cantidad_a=i + 1, cantidad_b=i) for i in range(4)]
+        for factura in facturas:
+            self._emitir(factura)
+        self.client.post(f'/api/facturas/{facturas[0].id}/marcar_pagada/')
+        self.client.post(f'/api/facturas/{facturas[1].id}/anular_factura/')
+        incremental = contenido_resumenes()
+
+        call_command('reconstruir_resumenes', stdout=io.StringIO())
+        self.assertEqual(contenido_resumenes(), incremental)
+
+    def test_metricas_desde_resumenes(self):
+        for i in range(3):
+            self._emitir(self._crear_factura(cantidad_a=1, cantidad_b=5 * i))
+
+        response = self.client.get(f'/api/facturas/metrics/?desde={self.hoy}&hasta={self.hoy}&top=1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['facturas_por_dia']['data'], [3])
+        self.assertEqual(response.data['por_estado']['EMITIDA']['facturas'], 3)
+        # 3 x 10 + 15 x 4 = 90 sin IVA; 103.50 con IVA
+        self.assertEqual(response.data['ingresos'], '103.50')
+        self.assertEqual(len(response.data['top_productos']), 1)
+        self.assertEqual(response.data['top_productos'][0]['nombre'], 'Producto B')
+        self.assertEqual(response.data['top_clientes'][0]['facturas'], 3)
+
+        ayer = self.hoy - timedelta(days=1)
+        response = self.client.get(f'/api/facturas/metrics/?desde={ayer}&hasta={ayer}')
+        self.assertEqual(response.data['facturas_por_dia']['data'], [])
+
+    def test_metricas_no_dependen_del_volumen(self):
+        self._emitir(self._crear_factura())
+        with self.assertNumQueries(4):
+            metricas(self.hoy - timedelta(days=30), self.hoy)
+
+        for _ in range(10):
+            self._emitir(self._crear_factura())
+        with self.assertNumQueries(4):
+            metricas(self.hoy - timedelta(days=30), self.hoy)
+
+    def test_metricas_parametros_invalidos(self):
+        response = self.client.get('/api/facturas/metrics/?desde=2025-02-10&hasta=2025-02-01')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/facturas/metrics/?desde=ayer')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
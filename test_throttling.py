@@ -0,0 +1,123 @@
+import threading
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.facturacion.models import Factura, FacturaItem
+from apps.clientes.models import Cliente
+from apps.productos.models import Producto
+from apps.usuarios.throttling import (
+    LimiteConcurrencia, MetricasThrottle, PdfThrottle, ServicioOcupado, ValidarPasswordThrottle, limite_pdf,
+)
+
+User = get_user_model()
+
+
+class TestThrottling(TestCase):
+    """
+    Tests para los throttles de endpoints costosos y el límite de PDFs simultáneos.
+    """
+
+    def setUp(self):
+        """Configurar datos de prueba"""
+        cache.clear()
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@test.com', password='testpass123', role='Administrador'
+        )
+        self.vendedor = User.objects.create_user(
+            username='ventas', email='ventas@test.com', password='testpass123', role='Ventas'
+        )
+        cliente = Cliente.objects.create(nombre='Cliente Test', email='cliente@test.com')
+        producto = Producto.objects.create(nombre='Producto Test', precio=100.00, stock=50)
+        self.factura = Factura.objects.create(creador=self.vendedor, cliente=cliente, estado='EMITIDA')
+        FacturaItem.objects.create(factura=self.factura, producto=producto, cantidad=1)
+
+    def _cliente(self, usuario):
+        client = APIClient()
+        client.force_authenticate(user=usuario)
+        return client
+
+    def test_validar_password_por_usuario(self):
+        with mock.patch.object(ValidarPasswordThrottle, 'THROTTLE_RATES', {'validar_password': '3/min'}):
+            client = self._cliente(self.vendedor)
+            for _ in range(3):
+                response = client.post('/api/auth/validate-password/', {'password': 'testpass123'})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response = client.post('/api/auth/validate-password/', {'password': 'testpass123'})
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertIn(int(response['Retry-After']), range(1, 21))
+
+            # Otro usuario tiene su propio límite
+            response = self._cliente(self.admin).post('/api/auth/validate-password/', {'password': 'testpass123'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_fichas_se_reponen(self):
+        with mock.patch.object(PdfThrottle, 'THROTTLE_RATES', {'pdf': '2/min'}), \
+                mock.patch.object(PdfThrottle, 'timer') as reloj:
+            reloj.return_value = 1000.0
+            client = self._cliente(self.vendedor)
+            url = f'/api/facturas/{self.factura.id}/view_pdf/'
+            self.assertEqual(client.get(url).status_code, status.HTTP_200_OK)
+            self.assertEqual(client.get(url).status_code, status.HTTP_200_OK)
+            self.assertEqual(client.get(url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+            # Media ficha no alcanza; una ficha cada 30 segundos
+            reloj.return_value = 1015.0
+            self.assertEqual(client.get(url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            reloj.return_value = 1030.0
+            self.assertEqual(client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_crud_sin_throttle(self):
+        with mock.patch.object(MetricasThrottle, 'THROTTLE_RATES', {'metricas': '1/min'}):
+            client = self._cliente(self.admin)
+            self.assertEqual(client.get('/api/facturas/metrics/').status_code, status.HTTP_200_OK)
+            self.assertEqual(client.get('/api/facturas/metrics/').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            for _ in range(5):
+                self.assertEqual(client.get('/api/facturas/').status_code, status.HTTP_200_OK)
+
+    def test_limite_concurrencia(self):
+        limite = LimiteConcurrencia(maximo=2, por_usuario=1, retry_after=5)
+        with limite.ocupar(1):
+            with self.assertRaises(ServicioOcupado):
+                with limite.ocupar(1):
+                    pass
+            with limite.ocupar(2):
+                self.assertEqual(limite.en_curso(), 2)
+                with self.assertRaises(ServicioOcupado):
+                    with limite.ocupar(3):
+                        pass
+        self.assertEqual(limite.en_curso(), 0)
+
+    def test_pdf_ocupado_responde_503(self):
+        client = self._cliente(self.vendedor)
+        url = f'/api/facturas/{self.factura.id}/download_pdf/'
+        generando, liberar = threading.Event(), threading.Event()
+
+        # Ocupa todos los turnos del usuario desde otros hilos
+        def ocupar():
+            with limite_pdf.ocupar(self.vendedor.pk):
+                generando.set()
+                liberar.wait(5)
+
+        hilos = [threading.Thread(target=ocupar) for _ in range(limite_pdf.por_usuario)]
+        for hilo in hilos:
+            hilo.start()
+        try:
+            generando.wait(5)
+            while limite_pdf.en_curso() < limite_pdf.por_usuario:
+                pass
+            response = client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertEqual(response['Retry-After'], str(limite_pdf.retry_after))
+
+            # Otro usuario todavía puede generar
+            response = self._cliente(self.admin).get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        finally:
+            liberar.set()
+            for hilo in hilos:
+                hilo.join()
+
+        self.assertEqual(client.get(url).status_code, status.HTTP_200_OK)